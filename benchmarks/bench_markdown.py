@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for Markdown preprocessing.
+
+Times the single-pass MarkdownRewriter against the previous chain of
+regex rewrites (mermaid extraction, two image passes, code blocks, inline
+code) on generated documents of increasing size. Time per MB should stay
+flat as documents grow.
+
+Usage:
+    python benchmarks/bench_markdown.py [--sizes 1M,2M,4M,8M] [--repeat 3]
+"""
+
+import argparse
+import hashlib
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.drive_sync.markdown_rewriter import MarkdownRewriter  # noqa: E402
+
+
+SECTION = """## Section {n}
+
+Some prose with `inline code`, a `call()` and a [link](#section-{n}).
+The screenshot `shot.png` and ![diagram](shot.png) are local images.
+
+```python
+def handler_{n}(event):
+    return event['body']
+```
+
+```mermaid
+graph TD
+    A{n} --> B{n}
+```
+
+- item one
+- item two
+
+"""
+
+
+def parse_size(text: str) -> int:
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.strip().upper()
+    if text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def legacy_rewrite(md_content: str, source_dir: Path) -> str:
+    """The previous implementation: five regex passes over the document"""
+    def replace_mermaid(match):
+        code = match.group(1).strip()
+        return f"\n[DIAGRAM:mermaid_{hashlib.md5(code.encode()).hexdigest()[:8]}]\n"
+
+    def replace_md_image(match):
+        full_path = (source_dir / match.group(2)).resolve()
+        if full_path.exists():
+            return f"\n[IMAGE:image_{hashlib.md5(str(full_path).encode()).hexdigest()[:8]}]\n"
+        return match.group(0)
+
+    def replace_inline_image(match):
+        full_path = (source_dir / match.group(1).strip()).resolve()
+        if full_path.exists():
+            return f"[IMAGE:image_{hashlib.md5(str(full_path).encode()).hexdigest()[:8]}]"
+        return match.group(0)
+
+    def replace_code_block(match):
+        language = match.group(1) or ''
+        if language.lower() == 'mermaid':
+            return match.group(0)
+        header = f"═══ CODE ({language.upper()}) ═══" if language else "═══ CODE ═══"
+        indented_code = '\n'.join('    ' + line for line in match.group(2).split('\n'))
+        return f"\n{header}\n{indented_code}\n{'═' * len(header)}\n"
+
+    md_content = re.sub(r'```mermaid\n(.*?)```', replace_mermaid, md_content, flags=re.DOTALL)
+    md_content = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', replace_md_image, md_content)
+    md_content = re.sub(r'`([^`]+\.(?:png|jpg|jpeg|gif|webp))`', replace_inline_image, md_content,
+                        flags=re.IGNORECASE)
+    md_content = re.sub(r'```(\w+)?\n(.*?)```', replace_code_block, md_content, flags=re.DOTALL)
+    return re.sub(r'`([^`]+)`', r'⟨ \1 ⟩', md_content)
+
+
+def single_pass(md_content: str, source_file: Path) -> str:
+    return MarkdownRewriter(source_file).rewrite(md_content)
+
+
+def best_of(repeat: int, func, *args) -> float:
+    """Fastest of several runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1M,2M,4M,8M', help='Document sizes (comma separated)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='bench_markdown_'))
+    try:
+        (workdir / 'shot.png').write_bytes(b'png')
+        source_file = workdir / 'doc.md'
+
+        print(f"{'size':>8}  {'legacy ms':>10}  {'ms/MB':>7}  {'single-pass ms':>14}  {'ms/MB':>7}")
+        for size in (parse_size(s) for s in args.sizes.split(',')):
+            sections = []
+            total = 0
+            while total < size:
+                sections.append(SECTION.format(n=len(sections)))
+                total += len(sections[-1])
+            md_content = ''.join(sections)
+            mb = len(md_content.encode('utf-8')) / (1024 * 1024)
+
+            legacy = best_of(args.repeat, legacy_rewrite, md_content, workdir)
+            single = best_of(args.repeat, single_pass, md_content, source_file)
+            print(f"{size:>8}  {legacy * 1000:>10.1f}  {legacy * 1000 / mb:>7.1f}  "
+                  f"{single * 1000:>14.1f}  {single * 1000 / mb:>7.1f}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
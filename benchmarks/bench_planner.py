@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for change-set planning.
+
+Builds a tree of small markdown files, records them all in a sync cache,
+and times planning a sync of the unchanged tree (the no-op case, which
+should only stat files) and of the tree with a fraction of files edited.
+
+Usage:
+    python benchmarks/bench_planner.py [--files 5000] [--dirs 50] [--changed 0.01]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.drive_sync.cache import SyncCache  # noqa: E402
+from src.drive_sync.planner import plan_changes  # noqa: E402
+
+
+def build_tree(root: Path, count: int, dirs: int):
+    files = []
+    for i in range(count):
+        folder = root / f"section_{i % dirs}"
+        folder.mkdir(exist_ok=True)
+        path = folder / f"doc_{i}.md"
+        path.write_text(f"# Document {i}\n\nSome content.\n")
+        files.append(path)
+    return files
+
+
+def timed_plan(root: Path, cache: SyncCache, workers: int):
+    start = time.perf_counter()
+    files = [f for f in root.glob('**/*') if f.is_file()]
+    plan = plan_changes(root, files, cache, workers)
+    return time.perf_counter() - start, plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=5000, help='Files in the tree')
+    parser.add_argument('--dirs', type=int, default=50, help='Directories the files are spread over')
+    parser.add_argument('--changed', type=float, default=0.01, help='Fraction of files edited')
+    parser.add_argument('--workers', type=int, default=4, help='Hashing threads')
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='bench_planner_'))
+    try:
+        root = workdir / 'docs'
+        root.mkdir()
+        files = build_tree(root, args.files, args.dirs)
+        cache = SyncCache(cache_file=str(workdir / 'cache.json'))
+        for path in files:
+            cache.update(path, 'drive-id')
+
+        seconds, plan = timed_plan(root, cache, args.workers)
+        print(f"No-op plan of {args.files} files:  {seconds * 1000:8.1f} ms  ({plan.summary()})")
+
+        for path in files[::max(1, int(1 / args.changed))]:
+            path.write_text(path.read_text() + "Edited.\n")
+        seconds, plan = timed_plan(root, cache, args.workers)
+        print(f"Plan with edits:            {seconds * 1000:8.1f} ms  ({plan.summary()}, "
+              f"{len(plan.folders())} folders needed)")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
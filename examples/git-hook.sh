@@ -6,6 +6,13 @@
 # Usage:
 #   cp examples/git-hook.sh .git/hooks/post-commit
 #   chmod +x .git/hooks/post-commit
+#
+# SYNC_SCAN_MODE=git makes the sync ask git what changed since the last
+# synced commit (honouring .gitignore) instead of walking and checking the
+# whole tree, so a sync after a small commit takes about as long as the
+# files it uploads.
+
+export SYNC_SCAN_MODE=git
 
 # Check if any markdown or CSV files were changed in the last commit
 CHANGED_DOCS=$(git diff-tree --no-commit-id --name-only -r HEAD | grep -E '\.(md|csv)$')
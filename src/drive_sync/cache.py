@@ -1,26 +1,81 @@
 """
 Caching system for Drive Sync
 Tracks file hashes to avoid re-syncing unchanged files
+(size/mtime/inode are checked first so unchanged files are never reread)
+
+Entries are persisted by a pluggable store (see cache_store.py): the
+legacy JSON file, or an SQLite database written one record at a time.
+Each entry records the hash algorithm it was computed with, so changing
+the algorithm keeps existing entries valid. Small metadata namespaces
+(e.g. Drive folder IDs) are stored alongside the file entries.
+
+With a flush interval, changed entries are written behind by a background
+thread so the sync loop never waits on disk.
 """
 
 import os
-import json
+import mmap
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Tuple, Optional
+from typing import Any, Dict, Iterable, List, Set, Tuple, Optional
+
+from .cache_store import JSONCacheStore, SQLiteCacheStore
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    xxhash = None
+    XXHASH_AVAILABLE = False
+
+
+# Entries written before the algorithm was recorded are MD5
+LEGACY_HASH_ALGORITHM = 'md5'
+HASH_ALGORITHMS = ('md5', 'sha1', 'sha256', 'blake2b') + (('xxh64', 'xxh3_128') if XXHASH_AVAILABLE else ())
+# Default for new entries: xxh3 when installed, otherwise sha256, the fastest
+# hashlib algorithm in benchmarks/bench_hashing.py on CPUs with SHA extensions
+DEFAULT_HASH_ALGORITHM = 'xxh3_128' if XXHASH_AVAILABLE else 'sha256'
+
+# Files are read in 1 MiB blocks; files from the threshold up are memory-mapped
+HASH_BUFFER_SIZE = 1024 * 1024
+HASH_MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+def hash_algorithm_available(algorithm: str) -> bool:
+    """Whether this installation can compute an algorithm recorded in a cache entry"""
+    if algorithm.startswith('xxh'):
+        return xxhash is not None and hasattr(xxhash, algorithm)
+    return algorithm in hashlib.algorithms_available
 
 
 class SyncCache:
     """Manages sync cache for tracking file changes"""
 
-    def __init__(self, cache_file: str = None, folder_id: str = None):
+    def __init__(
+        self,
+        cache_file: str = None,
+        folder_id: str = None,
+        paranoid: bool = False,
+        backend: str = 'json',
+        flush_interval: Optional[float] = None,
+        hash_algorithm: str = LEGACY_HASH_ALGORITHM
+    ):
         """
         Initialize sync cache
 
         Args:
             cache_file: Path to cache file (optional - derived from folder_id if not provided)
             folder_id: Google Drive folder ID (used to create project-specific cache)
+            paranoid: Always rehash files instead of trusting unchanged size/mtime/inode
+            backend: 'json' (whole-file JSON) or 'sqlite' (WAL database next to the
+                     JSON path, migrating an existing JSON cache on first use)
+            flush_interval: Write changed entries from a background thread at most
+                            this many seconds after they change (None/0: only on save)
+            hash_algorithm: Content hash for new entries, one of HASH_ALGORITHMS
+                            (existing entries keep the algorithm they were hashed with)
         """
         if cache_file:
             self.cache_file = cache_file
@@ -33,8 +88,42 @@ class SyncCache:
             # Fallback to default (legacy behavior)
             self.cache_file = 'cache/.sync_cache.json'
 
+        if backend == 'sqlite':
+            json_file = self.cache_file
+            self.cache_file = os.path.splitext(json_file)[0] + '.db'
+            self.store = SQLiteCacheStore(self.cache_file, migrate_from=json_file)
+        elif backend == 'json':
+            self.store = JSONCacheStore(self.cache_file)
+        else:
+            raise ValueError(f"Unknown cache backend: {backend}")
+
+        if hash_algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+        self.hash_algorithm = hash_algorithm
+
+        self.backend = backend
         self.folder_id = folder_id
+        self.paranoid = paranoid
         self.cache: Dict[str, dict] = {}
+        # Entries changed since the last save, and the dict that save wrote
+        self._dirty: Set[str] = set()
+        self._saved_cache = self.cache
+        # Hashes computed by should_sync this run, reused by update:
+        # path → (stat fields, algorithm, hash)
+        self._run_hashes: Dict[str, Tuple[dict, str, str]] = {}
+        # Metadata namespaces (namespace → key → value), saved with the entries
+        self.meta: Dict[str, Dict[str, Any]] = {}
+        self._meta_dirty = False
+        # Guards cache entries against concurrent sync workers
+        self._lock = threading.RLock()
+        # Serializes writes so an older snapshot never replaces a newer one
+        self._save_lock = threading.Lock()
+
+        # Write-behind flusher, started on the first change
+        self.flush_interval = flush_interval or 0
+        self._flusher: Optional[threading.Thread] = None
+        self._flush_requested = threading.Event()
+        self._flush_stopping = threading.Event()
 
     def load(self) -> Dict[str, dict]:
         """
@@ -45,100 +134,437 @@ class SyncCache:
         """
         if os.path.exists(self.cache_file):
             try:
-                with open(self.cache_file, 'r') as f:
-                    self.cache = json.load(f)
-                    print(f"📂 Loaded cache with {len(self.cache)} entries")
+                self.cache, self.meta = self.store.load()
+                print(f"📂 Loaded cache with {len(self.cache)} entries")
             except Exception as e:
                 print(f"⚠️  Error loading cache: {e}")
-                self.cache = {}
+                self.cache, self.meta = {}, {}
+                if not self.store.incremental:
+                    # Keep the unreadable file for inspection instead of overwriting it
+                    os.replace(self.cache_file, f"{self.cache_file}.corrupt")
+                    print(f"⚠️  Moved unreadable cache to {self.cache_file}.corrupt")
         else:
-            self.cache = {}
+            self.cache, self.meta = {}, {}
             print(f"📂 No existing cache found - starting fresh")
 
+        with self._lock:
+            self._dirty.clear()
+            self._meta_dirty = False
+            self._saved_cache = self.cache
         return self.cache
 
     def save(self):
-        """Save cache to disk"""
-        try:
-            # Ensure cache directory exists
-            cache_dir = os.path.dirname(self.cache_file)
-            if cache_dir and not os.path.exists(cache_dir):
-                print(f"📁 Creating cache directory: {cache_dir}")
-                os.makedirs(cache_dir, exist_ok=True)
+        """Save changed entries to disk now (blocks until written and fsynced)"""
+        self._save(quiet=False)
+
+    def schedule_save(self):
+        """Save changed entries without blocking (synchronous without a flush interval)"""
+        if self.flush_interval > 0 and not self._flush_stopping.is_set():
+            self._request_flush()
+        else:
+            self.save()
 
-            print(f"📝 Saving cache to: {self.cache_file}")
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache, f, indent=2)
+    def close(self):
+        """Stop the background flusher and write everything still pending, then close the store"""
+        self._flush_stopping.set()
+        self._flush_requested.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.save()
+        self.store.close()
 
-            print(f"✅ Cache saved successfully ({len(self.cache)} entries)")
-        except Exception as e:
-            print(f"❌ Error saving cache: {e}")
+    def _save(self, quiet: bool):
+        """Snapshot changed entries under the lock, then write them outside it"""
+        with self._save_lock:
+            with self._lock:
+                dirty = set(self._dirty)
+                if self.cache is not self._saved_cache:
+                    # Cache dict was replaced wholesale - write everything
+                    dirty |= set(self.cache) | set(self._saved_cache)
+                meta_dirty = self._meta_dirty
+                if not dirty and not meta_dirty and os.path.exists(self.cache_file):
+                    return
+                if self.store.incremental:
+                    entries = {key: dict(self.cache[key]) for key in dirty if key in self.cache}
+                else:
+                    entries = {key: dict(entry) for key, entry in self.cache.items()}
+                meta = {namespace: dict(values) for namespace, values in self.meta.items() if values}
+                total = len(self.cache)
+                self._dirty.clear()
+                self._meta_dirty = False
+                self._saved_cache = self.cache
+
+            try:
+                if not quiet:
+                    print(f"📝 Saving cache to: {self.cache_file}")
+                self.store.save(entries, dirty, meta)
+                if not quiet:
+                    print(f"✅ Cache saved successfully ({total} entries)")
+            except Exception as e:
+                # Keep the entries dirty so the next save retries them
+                with self._lock:
+                    self._dirty |= dirty
+                    self._meta_dirty |= meta_dirty
+                print(f"❌ Error saving cache: {e}")
+
+    def _request_flush(self):
+        """Wake the background flusher, starting it on first use"""
+        with self._lock:
+            if self._flush_stopping.is_set():
+                return
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name='cache-flusher', daemon=True
+                )
+                self._flusher.start()
+        self._flush_requested.set()
+
+    def _flush_loop(self):
+        while not self._flush_stopping.is_set():
+            self._flush_requested.wait()
+            # Coalesce changes for one interval (cut short by close())
+            self._flush_stopping.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self._save(quiet=True)
+
+    def _mark_dirty(self, cache_key: str):
+        """Queue an entry for the next save; lock must be held"""
+        self._dirty.add(cache_key)
+        if self.flush_interval > 0:
+            self._request_flush()
+
+    def _write(self, cache_key: str):
+        """Persist one changed entry now (SQLite) or on the next save (JSON); lock must be held"""
+        if self.store.incremental:
+            self.store.upsert(cache_key, self.cache[cache_key])
+        else:
+            self._mark_dirty(cache_key)
 
     @staticmethod
-    def get_file_hash(file_path: Path) -> Optional[str]:
+    def get_file_hash(file_path: Path, algorithm: str = LEGACY_HASH_ALGORITHM) -> Optional[str]:
         """
-        Get MD5 hash of file content
+        Get hash of file content
+
+        Files up to 1 MiB are read in one call, larger ones through a
+        reusable 1 MiB buffer, and very large ones are memory-mapped, so
+        hashing is not bound by read syscalls.
 
         Args:
             file_path: Path to file
+            algorithm: Hash algorithm (default: MD5)
 
         Returns:
-            MD5 hash string or None if error
+            Hex digest or None if error (including an unavailable algorithm)
         """
-        hash_md5 = hashlib.md5()
         try:
+            if algorithm.startswith('xxh'):
+                hasher = getattr(xxhash, algorithm)()
+            else:
+                hasher = hashlib.new(algorithm)
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+                size = os.fstat(f.fileno()).st_size
+                if size >= HASH_MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        hasher.update(mapped)
+                elif size <= HASH_BUFFER_SIZE:
+                    hasher.update(f.read())
+                else:
+                    buffer = bytearray(HASH_BUFFER_SIZE)
+                    view = memoryview(buffer)
+                    while True:
+                        size = f.readinto(buffer)
+                        if not size:
+                            break
+                        hasher.update(view[:size])
+            return hasher.hexdigest()
         except Exception as e:
             print(f"⚠️  Error hashing {file_path}: {e}")
             return None
 
+    @staticmethod
+    def _stat_fields(st: os.stat_result) -> dict:
+        """Size, mtime and inode recorded alongside the content hash"""
+        return {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'inode': st.st_ino,
+        }
+
+    def _hash_and_remember(
+        self, cache_key: str, file_path: Path, stat_fields: dict, algorithm: str
+    ) -> Optional[str]:
+        """Hash a file (reusing this run's hash of the same version) and remember it for update()"""
+        with self._lock:
+            remembered = self._run_hashes.get(cache_key)
+        if remembered and remembered[:2] == (stat_fields, algorithm):
+            return remembered[2]
+
+        file_hash = self.get_file_hash(file_path, algorithm)
+        if file_hash:
+            with self._lock:
+                self._run_hashes[cache_key] = (stat_fields, algorithm, file_hash)
+        return file_hash
+
     def should_sync(self, file_path: Path) -> Tuple[bool, str]:
         """
         Check if file should be synced based on cache
 
+        Files whose size, mtime and inode match the cache entry are treated
+        as unchanged without reading them; otherwise (or in paranoid mode)
+        the content hash decides, computed with the entry's own algorithm.
+        An entry hashed with an algorithm this installation lacks (e.g. xxh3
+        without xxhash) cannot be compared; the file is rehashed with the
+        configured algorithm and treated as modified.
+
         Args:
             file_path: Path to file
 
         Returns:
             Tuple of (should_sync: bool, reason: str)
         """
-        file_hash = self.get_file_hash(file_path)
-        if not file_hash:
+        cache_key = str(file_path)
+        try:
+            st = os.stat(file_path)
+        except OSError:
             return True, "error reading file"
+        stat_fields = self._stat_fields(st)
 
-        cache_key = str(file_path)
+        with self._lock:
+            cached_data = self.cache.get(cache_key)
+
+        # Fast path: unchanged metadata means unchanged content
+        if cached_data and cached_data.get('hash') and not self.paranoid:
+            if all(cached_data.get(field) == value for field, value in stat_fields.items()):
+                return False, "already synced"
+
+        algorithm = self.hash_algorithm
+        comparable = True
+        if cached_data and cached_data.get('hash'):
+            recorded = cached_data.get('hash_algorithm', LEGACY_HASH_ALGORITHM)
+            comparable = hash_algorithm_available(recorded)
+            if comparable:
+                algorithm = recorded
+        file_hash = self._hash_and_remember(cache_key, file_path, stat_fields, algorithm)
+        if not file_hash:
+            return True, "error reading file"
 
         # File not in cache - needs sync
-        if cache_key not in self.cache:
+        if cached_data is None:
             return True, "new file"
 
-        cached_data = self.cache[cache_key]
+        # Recorded hash cannot be recomputed here - resync and record the new algorithm
+        if not comparable:
+            return True, "file modified"
 
         # Hash changed - needs sync
         if cached_data.get('hash') != file_hash:
             return True, "file modified"
 
+        # Content unchanged (e.g. touched or copied) - refresh metadata for next run
+        with self._lock:
+            cached_data.update(stat_fields)
+            self._mark_dirty(cache_key)
+
         # Already synced and unchanged
         return False, "already synced"
 
+    def prehash(self, files: Iterable[Path], workers: int = 4) -> List[Tuple[bool, str]]:
+        """
+        Run the sync check for many files on a thread pool
+
+        Hashing releases the GIL, so files that miss the stat fast path
+        are hashed in parallel; the results are remembered and reused by
+        the should_sync/update calls made while syncing.
+
+        Args:
+            files: Files about to be synced
+            workers: Number of hashing threads
+
+        Returns:
+            should_sync result for each file, in order
+        """
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='hash') as pool:
+            return list(pool.map(self.should_sync, files))
+
     def update(self, file_path: Path, drive_file_id: str):
         """
         Update cache with synced file info
 
+        Reuses the hash computed by should_sync in this run; the recorded
+        size/mtime/inode are the ones that hash was computed for, so a file
+        edited during upload is detected on the next run.
+
         Args:
             file_path: Local file path
             drive_file_id: Google Drive file ID
         """
-        file_hash = self.get_file_hash(file_path)
+        cache_key = str(file_path)
+        with self._lock:
+            remembered = self._run_hashes.pop(cache_key, None)
+
+        if remembered:
+            stat_fields, algorithm, file_hash = remembered
+        else:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return
+            stat_fields = self._stat_fields(st)
+            algorithm = self.hash_algorithm
+            file_hash = self.get_file_hash(file_path, algorithm)
+
         if file_hash:
-            self.cache[str(file_path)] = {
-                'hash': file_hash,
-                'drive_id': drive_file_id,
-                'last_sync': datetime.now().isoformat(),
-            }
+            with self._lock:
+                self.cache[cache_key] = {
+                    'hash': file_hash,
+                    'hash_algorithm': algorithm,
+                    'drive_id': drive_file_id,
+                    'last_sync': datetime.now().isoformat(),
+                    **stat_fields,
+                }
+                self._write(cache_key)
+
+    def remove(self, file_path: Path):
+        """
+        Forget a file (e.g. deleted locally)
+
+        Args:
+            file_path: Local file path
+        """
+        cache_key = str(file_path)
+        with self._lock:
+            self._run_hashes.pop(cache_key, None)
+            if self.cache.pop(cache_key, None) is None:
+                return
+            if self.store.incremental:
+                self.store.delete(cache_key)
+            else:
+                self._mark_dirty(cache_key)
+
+    def get_meta(self, namespace: str, key: str) -> Any:
+        """
+        Get a metadata value
+
+        Args:
+            namespace: Metadata namespace (e.g. 'folders')
+            key: Key within the namespace
+
+        Returns:
+            Stored value or None
+        """
+        with self._lock:
+            return self.meta.get(namespace, {}).get(key)
+
+    def set_meta(self, namespace: str, key: str, value: Any):
+        """
+        Store a JSON-serializable metadata value
+
+        Args:
+            namespace: Metadata namespace (e.g. 'folders')
+            key: Key within the namespace
+            value: Value to store
+        """
+        with self._lock:
+            values = self.meta.setdefault(namespace, {})
+            if values.get(key) == value:
+                return
+            values[key] = value
+            self._write_meta(namespace, key)
+
+    def delete_meta(self, namespace: str, key: str):
+        """
+        Remove a metadata value
+
+        Args:
+            namespace: Metadata namespace
+            key: Key within the namespace
+        """
+        with self._lock:
+            if self.meta.get(namespace, {}).pop(key, None) is None:
+                return
+            self._write_meta(namespace, key)
+
+    def find_meta(self, namespace: str, value: Any) -> List[str]:
+        """
+        Get the keys of a namespace that hold a value
+
+        Args:
+            namespace: Metadata namespace
+            value: Value to look for
+
+        Returns:
+            Matching keys
+        """
+        with self._lock:
+            return [key for key, stored in self.meta.get(namespace, {}).items() if stored == value]
+
+    def meta_keys(self, namespace: str) -> List[str]:
+        """
+        Get all keys of a metadata namespace
+
+        Args:
+            namespace: Metadata namespace
+
+        Returns:
+            Keys
+        """
+        with self._lock:
+            return list(self.meta.get(namespace, {}))
+
+    def _write_meta(self, namespace: str, key: str):
+        """Persist one changed metadata value now (SQLite) or on the next save (JSON); lock must be held"""
+        if self.store.incremental:
+            if key in self.meta.get(namespace, {}):
+                self.store.upsert_meta(namespace, key, self.meta[namespace][key])
+            else:
+                self.store.delete_meta(namespace, key)
+            return
+        self._meta_dirty = True
+        if self.flush_interval > 0:
+            self._request_flush()
+
+    def paths(self) -> List[str]:
+        """
+        Get the local paths of all cached files
+
+        Returns:
+            Cache keys
+        """
+        with self._lock:
+            return list(self.cache)
+
+    def get_drive_id(self, file_path: Path) -> Optional[str]:
+        """
+        Get the Drive file ID recorded for a local file
+
+        Args:
+            file_path: Local file path
+
+        Returns:
+            Drive file ID or None if the file was never synced
+        """
+        with self._lock:
+            entry = self.cache.get(str(file_path))
+        return entry.get('drive_id') if entry else None
+
+    def find_path_by_drive_id(self, drive_id: str) -> Optional[str]:
+        """
+        Get the local path recorded for a Drive file ID
+
+        Args:
+            drive_id: Google Drive file ID
+
+        Returns:
+            Local path (cache key) or None if no entry has that ID
+        """
+        if self.store.incremental:
+            return self.store.find_by_drive_id(drive_id)
+        with self._lock:
+            for path, entry in self.cache.items():
+                if entry.get('drive_id') == drive_id:
+                    return path
+        return None
 
     def get_stats(self) -> Dict[str, int]:
         """
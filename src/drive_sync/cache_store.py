@@ -0,0 +1,253 @@
+"""
+Storage backends for the sync cache
+
+- JSONCacheStore: one compact JSON file, atomically replaced on every save (default)
+- SQLiteCacheStore: SQLite database in WAL mode, one row per file,
+  committed as each file is synced; migrates an existing JSON cache
+
+Besides file entries, both stores keep small metadata namespaces (e.g.
+Drive folder IDs): namespace → {key: JSON value}.
+"""
+
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+# Columns stored natively; any other entry fields go into the `extra` JSON column
+FILE_COLUMNS = ('hash', 'hash_algorithm', 'drive_id', 'last_sync', 'size', 'mtime_ns', 'inode')
+
+# Top-level key holding the metadata namespaces in the JSON file
+META_KEY = '__meta__'
+
+Meta = Dict[str, Dict[str, Any]]
+
+
+class JSONCacheStore:
+    """Whole-file JSON cache (legacy format)"""
+
+    # Every save rewrites the file, so single-record writes are deferred to save()
+    incremental = False
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path to the JSON cache file
+        """
+        self.path = path
+
+    def load(self) -> Tuple[Dict[str, dict], Meta]:
+        """Read all entries and metadata (raises on unreadable/corrupt files)"""
+        if not os.path.exists(self.path):
+            return {}, {}
+        with open(self.path, 'r') as f:
+            entries = json.load(f)
+        return entries, entries.pop(META_KEY, {})
+
+    def save(self, entries: Dict[str, dict], dirty: Iterable[str], meta: Optional[Meta] = None):
+        """
+        Rewrite the file with all entries and metadata.
+
+        The JSON is written to a temporary file in the same directory,
+        fsynced and renamed over the cache, so an interrupted save leaves
+        the previous cache intact rather than a truncated one.
+        """
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir and not os.path.exists(cache_dir):
+            print(f"📁 Creating cache directory: {cache_dir}")
+            os.makedirs(cache_dir, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(self.path)}.", suffix='.tmp', dir=cache_dir or '.'
+        )
+        try:
+            if meta:
+                entries = dict(entries, **{META_KEY: meta})
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._fsync_dir(cache_dir or '.')
+
+    @staticmethod
+    def _fsync_dir(path: str):
+        """Persist the rename itself (not supported on every platform)"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def close(self):
+        pass
+
+
+class SQLiteCacheStore:
+    """
+    One row per synced file in an SQLite database (WAL mode).
+
+    Each upsert is its own transaction, so a crash loses at most the file
+    being synced and never corrupts earlier entries. Rows are indexed by
+    path (primary key) and drive_id.
+    """
+
+    incremental = True
+
+    def __init__(self, path: str, migrate_from: Optional[str] = None):
+        """
+        Open (and create) the database.
+
+        Args:
+            path: Path to the .db file
+            migrate_from: Legacy JSON cache imported when the database is new
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            print(f"📁 Creating cache directory: {cache_dir}")
+            os.makedirs(cache_dir, exist_ok=True)
+
+        is_new = not os.path.exists(path)
+        # Shared by sync worker threads; access is serialized by self._lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                hash TEXT,
+                hash_algorithm TEXT,
+                drive_id TEXT,
+                last_sync TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                inode INTEGER,
+                extra TEXT
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_files_drive_id ON files(drive_id)')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS meta (
+                namespace TEXT,
+                key TEXT,
+                value TEXT,
+                PRIMARY KEY (namespace, key)
+            )
+        ''')
+        # Databases created before hash algorithms were recorded
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(files)')}
+        if 'hash_algorithm' not in columns:
+            self.conn.execute('ALTER TABLE files ADD COLUMN hash_algorithm TEXT')
+        self.conn.commit()
+
+        if is_new and migrate_from and os.path.exists(migrate_from):
+            self._migrate(migrate_from)
+
+    def _migrate(self, json_path: str):
+        """Import a legacy JSON cache and keep it as <name>.migrated"""
+        try:
+            with open(json_path, 'r') as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Could not migrate {json_path}: {e}")
+            return
+
+        meta = entries.pop(META_KEY, {})
+        self.save(entries, entries.keys())
+        for namespace, values in meta.items():
+            for key, value in values.items():
+                self.upsert_meta(namespace, key, value)
+        os.replace(json_path, f"{json_path}.migrated")
+        print(f"📦 Migrated {len(entries)} cache entries from {json_path} to {self.path}")
+
+    @staticmethod
+    def _row(key: str, entry: dict) -> tuple:
+        extra = {k: v for k, v in entry.items() if k not in FILE_COLUMNS}
+        return (key, *(entry.get(column) for column in FILE_COLUMNS), json.dumps(extra) if extra else None)
+
+    def load(self) -> Tuple[Dict[str, dict], Meta]:
+        """Read all entries and metadata"""
+        entries = {}
+        meta: Meta = {}
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT path, {', '.join(FILE_COLUMNS)}, extra FROM files"
+            ).fetchall()
+            meta_rows = self.conn.execute('SELECT namespace, key, value FROM meta').fetchall()
+        for path, *values, extra in rows:
+            entry = {column: value for column, value in zip(FILE_COLUMNS, values) if value is not None}
+            if extra:
+                entry.update(json.loads(extra))
+            entries[path] = entry
+        for namespace, key, value in meta_rows:
+            meta.setdefault(namespace, {})[key] = json.loads(value)
+        return entries, meta
+
+    def save(self, entries: Dict[str, dict], dirty: Iterable[str], meta: Optional[Meta] = None):
+        """Upsert the changed entries in one transaction (metadata is written as it changes)"""
+        rows = [self._row(key, entries[key]) for key in dirty if key in entries]
+        removed = [(key,) for key in dirty if key not in entries]
+        with self._lock, self.conn:
+            self.conn.executemany(self._UPSERT, rows)
+            self.conn.executemany('DELETE FROM files WHERE path = ?', removed)
+
+    _UPSERT = f'''
+        INSERT INTO files (path, {', '.join(FILE_COLUMNS)}, extra)
+        VALUES ({', '.join('?' * (len(FILE_COLUMNS) + 2))})
+        ON CONFLICT(path) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in FILE_COLUMNS)},
+            extra = excluded.extra
+    '''
+
+    def upsert(self, key: str, entry: dict):
+        """Write one entry and commit"""
+        with self._lock, self.conn:
+            self.conn.execute(self._UPSERT, self._row(key, entry))
+
+    def delete(self, key: str):
+        """Remove one entry and commit"""
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM files WHERE path = ?', (key,))
+
+    def upsert_meta(self, namespace: str, key: str, value: Any):
+        """Write one metadata value and commit"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO meta (namespace, key, value) VALUES (?, ?, ?) '
+                'ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value',
+                (namespace, key, json.dumps(value))
+            )
+
+    def delete_meta(self, namespace: str, key: str):
+        """Remove one metadata value and commit"""
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM meta WHERE namespace = ? AND key = ?', (namespace, key))
+
+    def find_by_drive_id(self, drive_id: str) -> Optional[str]:
+        """Indexed reverse lookup of the local path for a Drive ID"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT path FROM files WHERE drive_id = ? LIMIT 1', (drive_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,404 @@
+"""
+Thread-safe, rate-limited execution of Google API requests.
+
+The httplib2 transport behind googleapiclient is not thread-safe, so requests
+issued from sync worker threads are executed on a per-thread authorized
+connection built from the request's own credentials.
+
+Every Drive, Docs and Sheets call goes through execute_with_retry(), which
+applies the shared RateLimiter and retries throttled or failed requests.
+Resumable media uploads are sent chunk by chunk and resume from the last
+acknowledged byte after a transient failure. Independent metadata-only
+calls can be grouped with BatchExecutor.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import google_auth_httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaUpload, build_http
+
+from .ratelimit import RateLimiter
+
+
+logger = logging.getLogger(__name__)
+
+
+_local = threading.local()
+
+
+def thread_http(request):
+    """
+    Get an authorized HTTP transport owned by the current thread.
+
+    Args:
+        request: googleapiclient HttpRequest (or BatchHttpRequest)
+
+    Returns:
+        Authorized HTTP object for this thread, or None if the request
+        carries no credentials (in which case its own transport is used)
+    """
+    credentials = getattr(getattr(request, 'http', None), 'credentials', None)
+    if credentials is None:
+        return None
+
+    transports = getattr(_local, 'transports', None)
+    if transports is None:
+        transports = _local.transports = {}
+
+    http = transports.get(id(credentials))
+    if http is None:
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+        transports[id(credentials)] = http
+    return http
+
+
+def execute_request(request, **kwargs):
+    """
+    Execute an API request on the calling thread's own connection.
+
+    Args:
+        request: googleapiclient HttpRequest
+        **kwargs: Extra arguments for request.execute()
+
+    Returns:
+        Deserialized API response
+    """
+    http = thread_http(request)
+    if http is not None:
+        kwargs['http'] = http
+    return request.execute(**kwargs)
+
+
+def _retry_after(error: HttpError) -> Optional[float]:
+    """Parse the Retry-After header (seconds) from an HttpError, if present"""
+    value = getattr(error, 'resp', None) and error.resp.get('retry-after')
+    try:
+        return float(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+# 403 reasons Drive uses for quota/rate-limit rejections
+THROTTLE_REASONS = frozenset({'rateLimitExceeded', 'userRateLimitExceeded'})
+
+
+def _error_reasons(error: HttpError) -> Set[str]:
+    """
+    Collect the reason codes from an HttpError's JSON body.
+
+    Google APIs list them as {"error": {"errors": [{"reason": ...}]}};
+    newer responses may carry them in "details" instead.
+    """
+    try:
+        data = json.loads((error.content or b'').decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        return set()
+    if isinstance(data, list) and data:
+        data = data[0]
+    body = data.get('error') if isinstance(data, dict) else None
+    if not isinstance(body, dict):
+        return set()
+
+    reasons = set()
+    for key in ('errors', 'details'):
+        items = body.get(key)
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get('reason'), str):
+                reasons.add(item['reason'])
+    return reasons
+
+
+def is_throttled(error: HttpError) -> bool:
+    """
+    Check whether an HttpError is a quota/rate-limit rejection.
+
+    Drive reports throttling either as 429 or as 403 with a
+    rateLimitExceeded / userRateLimitExceeded reason.
+    """
+    status = error.resp.status
+    if status == 429:
+        return True
+    return status == 403 and not THROTTLE_REASONS.isdisjoint(_error_reasons(error))
+
+
+def _wait_before_retry(
+    error: Exception,
+    attempt: int,
+    rate_limiter: Optional[RateLimiter],
+    api: str,
+    max_retries: int
+) -> bool:
+    """
+    Back off before retrying a failed request.
+
+    Args:
+        error: Exception raised by the request
+        attempt: Zero-based number of the failed attempt
+        rate_limiter: Shared limiter, told about throttling
+        api: Limiter bucket name
+        max_retries: Maximum number of attempts
+
+    Returns:
+        True after waiting if the request should be retried, False if the
+        error is permanent or retries are exhausted
+    """
+    if attempt == max_retries - 1:
+        return False
+    if isinstance(error, HttpError) and is_throttled(error):
+        retry_after = _retry_after(error)
+        if rate_limiter is not None:
+            rate_limiter.record_throttle(api, retry_after)
+        wait_time = retry_after or (2 ** attempt) + (time.time() % 1)
+        logger.warning(f"Rate limit hit, waiting {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
+    elif isinstance(error, HttpError) and error.resp.status >= 500:  # Server error
+        wait_time = (2 ** attempt)
+        logger.warning(f"Server error, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
+    elif isinstance(error, OSError):  # Dropped connection or timeout
+        wait_time = (2 ** attempt)
+        logger.warning(f"Connection error ({error}), retrying in {wait_time:.1f}s "
+                       f"(attempt {attempt + 1}/{max_retries})")
+    else:
+        return False
+    time.sleep(wait_time)
+    return True
+
+
+def execute_with_retry(
+    request,
+    rate_limiter: Optional[RateLimiter] = None,
+    api: str = 'drive',
+    max_retries: int = 5
+):
+    """
+    Execute an API request through the rate limiter with exponential backoff.
+
+    Throttling responses are reported to the limiter (so adaptive limiters
+    slow down for everyone) and retried, honouring Retry-After. Server
+    errors (5xx) are retried with backoff; other errors are raised.
+    Requests with a resumable media body are handed to
+    execute_resumable_upload().
+
+    Args:
+        request: googleapiclient HttpRequest
+        rate_limiter: Shared limiter (None disables limiting)
+        api: Limiter bucket name (drive, docs, sheets)
+        max_retries: Maximum number of attempts
+
+    Returns:
+        Deserialized API response
+
+    Raises:
+        HttpError: If the request fails permanently or retries are exhausted
+    """
+    if isinstance(getattr(request, 'resumable', None), MediaUpload):
+        return execute_resumable_upload(request, rate_limiter, api, max_retries)
+
+    for attempt in range(max_retries):
+        try:
+            if rate_limiter is not None:
+                rate_limiter.acquire(api)
+            response = execute_request(request)
+            if rate_limiter is not None:
+                rate_limiter.record_success(api)
+            return response
+        except HttpError as error:
+            if not _wait_before_retry(error, attempt, rate_limiter, api, max_retries):
+                raise
+    raise Exception("Unexpected error in retry logic")
+
+
+def execute_resumable_upload(
+    request,
+    rate_limiter: Optional[RateLimiter] = None,
+    api: str = 'drive',
+    max_retries: int = 5
+):
+    """
+    Upload a resumable media body one chunk at a time.
+
+    Only one chunk of the media is read into memory at a time. After a
+    throttled, failed (5xx) or dropped chunk the request asks Drive how
+    much of the upload it has received and continues from there, so a
+    transient failure never restarts the upload from the first byte. The
+    retry budget applies per chunk.
+
+    Args:
+        request: googleapiclient HttpRequest with a resumable media body
+        rate_limiter: Shared limiter (each chunk costs one token)
+        api: Limiter bucket name
+        max_retries: Maximum attempts per chunk
+
+    Returns:
+        Deserialized API response
+
+    Raises:
+        HttpError: If the upload fails permanently or retries are exhausted
+    """
+    kwargs = {}
+    http = thread_http(request)
+    if http is not None:
+        kwargs['http'] = http
+
+    response = None
+    attempt = 0
+    while response is None:
+        try:
+            if rate_limiter is not None:
+                rate_limiter.acquire(api)
+            status, response = request.next_chunk(**kwargs)
+            if rate_limiter is not None:
+                rate_limiter.record_success(api)
+        except (HttpError, OSError) as error:
+            if not _wait_before_retry(error, attempt, rate_limiter, api, max_retries):
+                raise
+            attempt += 1
+            continue
+        attempt = 0
+        if status is not None:
+            logger.debug(f"Uploaded {status.resumable_progress}/{status.total_size} bytes")
+    return response
+
+
+# Google's batch endpoint accepts at most 100 calls per HTTP request
+MAX_BATCH_SIZE = 100
+
+
+class BatchExecutor:
+    """
+    Collects independent metadata-only requests and sends them in HTTP batches.
+
+    Requests are flushed in chunks of up to MAX_BATCH_SIZE through the
+    service's new_batch_http_request(). Items that come back throttled or
+    with a server error are retried individually in the next round (with
+    backoff); every item's callback is invoked exactly once with either
+    its response or its final exception.
+    """
+
+    def __init__(
+        self,
+        service,
+        rate_limiter: Optional[RateLimiter] = None,
+        api: str = 'drive',
+        max_retries: int = 5,
+        batch_size: int = MAX_BATCH_SIZE
+    ):
+        """
+        Initialize batch executor.
+
+        Args:
+            service: googleapiclient service that owns the requests
+            rate_limiter: Shared limiter (each batched call costs one token)
+            api: Limiter bucket name
+            max_retries: Maximum attempts per item
+            batch_size: Calls per HTTP batch (capped at MAX_BATCH_SIZE)
+        """
+        self.service = service
+        self.rate_limiter = rate_limiter
+        self.api = api
+        self.max_retries = max_retries
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self._pending: List[Tuple[Any, Optional[Callable]]] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, request, callback: Optional[Callable[[Optional[dict], Optional[Exception]], None]] = None):
+        """
+        Queue a request.
+
+        Args:
+            request: googleapiclient HttpRequest (no media uploads)
+            callback: Called as callback(response, exception) once the item
+                      finally succeeds or fails
+        """
+        self._pending.append((request, callback))
+
+    def _execute_chunk(self, chunk: List[Tuple[Any, Optional[Callable]]]) -> Dict[int, Tuple[Any, Any]]:
+        """Send one HTTP batch and collect (response, exception) per item"""
+        results: Dict[int, Tuple[Any, Any]] = {}
+
+        def on_item(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
+
+        batch = self.service.new_batch_http_request(callback=on_item)
+        for idx, (request, _) in enumerate(chunk):
+            batch.add(request, request_id=str(idx))
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(self.api, tokens=len(chunk))
+        try:
+            execute_request_batch(batch, chunk[0][0])
+        except HttpError as error:
+            # The whole envelope failed (e.g. 429/503): every item gets the error
+            return {idx: (None, error) for idx in range(len(chunk))}
+        return results
+
+    def flush(self) -> int:
+        """
+        Send every queued request.
+
+        Returns:
+            Number of items that failed permanently
+        """
+        pending, self._pending = self._pending, []
+        failures = 0
+        attempt = 0
+
+        while pending:
+            retry: List[Tuple[Any, Optional[Callable]]] = []
+            throttled = False
+
+            for start in range(0, len(pending), self.batch_size):
+                chunk = pending[start:start + self.batch_size]
+                results = self._execute_chunk(chunk)
+
+                for idx, (request, callback) in enumerate(chunk):
+                    response, exception = results.get(idx, (None, Exception("No response in batch")))
+                    retryable = isinstance(exception, HttpError) and (
+                        is_throttled(exception) or exception.resp.status >= 500
+                    )
+                    if retryable and attempt < self.max_retries - 1:
+                        throttled = throttled or is_throttled(exception)
+                        retry.append((request, callback))
+                        continue
+                    if exception is not None:
+                        failures += 1
+                    if callback:
+                        callback(response, exception)
+
+            if self.rate_limiter is not None:
+                if throttled:
+                    self.rate_limiter.record_throttle(self.api)
+                elif len(retry) < len(pending):
+                    self.rate_limiter.record_success(self.api)
+
+            if retry:
+                wait_time = (2 ** attempt) + (time.time() % 1)
+                logger.warning(f"Retrying {len(retry)} batched requests in {wait_time:.1f}s")
+                time.sleep(wait_time)
+            pending = retry
+            attempt += 1
+
+        return failures
+
+
+def execute_request_batch(batch, sample_request):
+    """
+    Execute a BatchHttpRequest on the calling thread's own connection.
+
+    Args:
+        batch: googleapiclient BatchHttpRequest
+        sample_request: Any request in the batch (supplies the credentials)
+    """
+    http = thread_http(sample_request)
+    if http is not None:
+        batch.execute(http=http)
+    else:
+        batch.execute()
@@ -5,18 +5,21 @@ Provides:
 - Document creation and updates
 - Diagram marker detection (<!-- DIAGRAM: name -->)
 - Image embedding at marker positions
+- Single-request embedding of all images and anchor links per document
 - Professional styling
 """
 
 import logging
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.oauth2 import service_account
 
+from .executor import execute_with_retry
+from .ratelimit import RateLimiter
 from .utils import slugify_heading, get_unique_slug
 
 
@@ -40,14 +43,18 @@ class GoogleDocsService:
     Google Docs service wrapper with diagram embedding support.
     """
 
-    def __init__(self, credentials_path: str):
+    rate_limiter: Optional[RateLimiter] = None
+
+    def __init__(self, credentials_path: str, rate_limiter: Optional[RateLimiter] = None):
         """
         Initialize Google Docs service.
 
         Args:
             credentials_path: Path to service account credentials JSON
+            rate_limiter: Shared rate limiter for all API calls (optional)
         """
         self.credentials_path = credentials_path
+        self.rate_limiter = rate_limiter
         self.docs_service = None
         self.drive_service = None
         self._authenticate()
@@ -73,6 +80,47 @@ class GoogleDocsService:
             logger.error(f"Authentication failed: {str(e)}")
             raise GoogleDocsError(f"Authentication failed: {str(e)}")
 
+    def _execute(self, request):
+        """Execute a request through the shared rate limiter with retries"""
+        return execute_with_retry(request, self.rate_limiter, api='docs')
+
+    @staticmethod
+    def _find_markers(document: Dict[str, Any], kind: str) -> List[Dict[str, Any]]:
+        """
+        Find [KIND:name] markers in a fetched document.
+
+        Args:
+            document: Google Docs document dict from API
+            kind: Marker kind ('DIAGRAM' or 'IMAGE')
+
+        Returns:
+            List[Dict]: List of marker locations with name, index and length
+        """
+        content = document.get('body', {}).get('content', [])
+        markers = []
+
+        # Pattern for markers (visible text format that survives conversion)
+        marker_pattern = re.compile(r'\[' + kind + r':(\w+)\]')
+
+        # Search through content
+        for element in content:
+            if 'paragraph' in element:
+                paragraph = element['paragraph']
+                for text_run in paragraph.get('elements', []):
+                    if 'textRun' in text_run:
+                        text_content = text_run['textRun'].get('content', '')
+                        start_index = text_run.get('startIndex', 0)
+
+                        # Find all markers in this text run
+                        for match in marker_pattern.finditer(text_content):
+                            markers.append({
+                                'name': match.group(1),
+                                'index': start_index + match.start(),
+                                'length': len(match.group(0))
+                            })
+
+        return markers
+
     def find_diagram_markers(self, doc_id: str) -> List[Dict[str, Any]]:
         """
         Find diagram markers in document ([DIAGRAM:name]).
@@ -83,42 +131,73 @@ class GoogleDocsService:
         Returns:
             List[Dict]: List of marker locations with name and index
         """
+        return self.find_markers(doc_id, 'DIAGRAM')
+
+    def find_image_markers(self, doc_id: str) -> List[Dict[str, Any]]:
+        """
+        Find image markers in document ([IMAGE:name]).
+
+        Args:
+            doc_id: Document ID
+
+        Returns:
+            List[Dict]: List of marker locations with name and index
+        """
+        return self.find_markers(doc_id, 'IMAGE')
+
+    def find_markers(self, doc_id: str, kind: str) -> List[Dict[str, Any]]:
+        """
+        Fetch a document and find its [KIND:name] markers.
+
+        Args:
+            doc_id: Document ID
+            kind: Marker kind ('DIAGRAM' or 'IMAGE')
+
+        Returns:
+            List[Dict]: List of marker locations (empty on API errors)
+        """
         try:
-            doc = self.docs_service.documents().get(documentId=doc_id).execute()
-            content = doc.get('body', {}).get('content', [])
-            markers = []
-
-            # Pattern for diagram markers (visible text format that survives conversion)
-            marker_pattern = r'\[DIAGRAM:(\w+)\]'
-
-            # Search through content
-            for element in content:
-                if 'paragraph' in element:
-                    paragraph = element['paragraph']
-                    for text_run in paragraph.get('elements', []):
-                        if 'textRun' in text_run:
-                            text_content = text_run['textRun'].get('content', '')
-                            start_index = text_run.get('startIndex', 0)
-
-                            # Find all markers in this text run
-                            for match in re.finditer(marker_pattern, text_content):
-                                diagram_name = match.group(1)
-                                marker_offset = match.start()
-                                marker_index = start_index + marker_offset
-
-                                markers.append({
-                                    'name': diagram_name,
-                                    'index': marker_index,
-                                    'length': len(match.group(0))
-                                })
-
-            logger.info(f"Found {len(markers)} diagram markers in {doc_id}")
+            doc = self._execute(self.docs_service.documents().get(documentId=doc_id))
+            markers = self._find_markers(doc, kind)
+            logger.info(f"Found {len(markers)} {kind.lower()} markers in {doc_id}")
             return markers
 
         except HttpError as error:
             logger.error(f"Failed to find markers: {error}")
             return []
 
+    @staticmethod
+    def _embed_requests(
+        marker_index: int,
+        marker_length: int,
+        image_url: str,
+        width_pt: int,
+        height_pt: int
+    ) -> List[Dict[str, Any]]:
+        """Build the delete-marker/insert-image request pair for one embed"""
+        return [
+            # Delete the marker text
+            {
+                'deleteContentRange': {
+                    'range': {
+                        'startIndex': marker_index,
+                        'endIndex': marker_index + marker_length
+                    }
+                }
+            },
+            # Insert image at marker location
+            {
+                'insertInlineImage': {
+                    'location': {'index': marker_index},
+                    'uri': image_url,
+                    'objectSize': {
+                        'height': {'magnitude': height_pt, 'unit': 'PT'},
+                        'width': {'magnitude': width_pt, 'unit': 'PT'}
+                    }
+                }
+            }
+        ]
+
     def embed_diagram(
         self,
         doc_id: str,
@@ -145,34 +224,14 @@ class GoogleDocsService:
             GoogleDocsError: If embedding fails
         """
         try:
-            # Build batch update requests
-            requests = [
-                # Delete the marker text
-                {
-                    'deleteContentRange': {
-                        'range': {
-                            'startIndex': marker_index,
-                            'endIndex': marker_index + marker_length
-                        }
-                    }
-                },
-                # Insert image at marker location
-                {
-                    'insertInlineImage': {
-                        'location': {'index': marker_index},
-                        'uri': image_url,
-                        'objectSize': {
-                            'height': {'magnitude': height_pt, 'unit': 'PT'},
-                            'width': {'magnitude': width_pt, 'unit': 'PT'}
-                        }
-                    }
-                }
-            ]
+            requests = self._embed_requests(
+                marker_index, marker_length, image_url, width_pt, height_pt
+            )
 
-            self.docs_service.documents().batchUpdate(
+            self._execute(self.docs_service.documents().batchUpdate(
                 documentId=doc_id,
                 body={'requests': requests}
-            ).execute()
+            ))
 
             logger.info(f"Embedded '{diagram_name}' at index {marker_index}")
 
@@ -329,36 +388,22 @@ class GoogleDocsService:
         logger.info(f"Found {len(anchor_links)} anchor links in document")
         return anchor_links
 
-    def convert_anchor_links(
-        self,
-        doc_id: str,
+    @staticmethod
+    def _anchor_link_requests(
         heading_map: Dict[str, Dict[str, Any]],
         anchor_links: List[Dict[str, Any]]
-    ) -> int:
+    ) -> List[Dict[str, Any]]:
         """
-        Convert anchor links to headingId links.
-
-        Replaces #anchor-slug URLs with Google Docs headingId links.
-        Processes links in reverse index order to prevent index invalidation.
+        Build updateTextStyle requests pointing anchor links at their headings.
 
         Args:
-            doc_id: Google Docs document ID
             heading_map: Map of slugs to heading metadata (from _parse_headings)
             anchor_links: List of anchor links (from _find_anchor_links)
 
         Returns:
-            Number of links successfully converted
-
-        Raises:
-            GoogleDocsError: If batchUpdate fails
+            Requests sorted by start_index descending; unknown anchors are skipped
         """
-        if not anchor_links:
-            logger.info("No anchor links to convert")
-            return 0
-
-        # Build batchUpdate requests (process in reverse order)
         requests = []
-        converted_count = 0
 
         # Sort by start_index descending (highest index first)
         sorted_links = sorted(anchor_links, key=lambda x: x['start_index'], reverse=True)
@@ -386,7 +431,39 @@ class GoogleDocsService:
                     'fields': 'link'
                 }
             })
-            converted_count += 1
+
+        return requests
+
+    def convert_anchor_links(
+        self,
+        doc_id: str,
+        heading_map: Dict[str, Dict[str, Any]],
+        anchor_links: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Convert anchor links to headingId links.
+
+        Replaces #anchor-slug URLs with Google Docs headingId links.
+        Processes links in reverse index order to prevent index invalidation.
+
+        Args:
+            doc_id: Google Docs document ID
+            heading_map: Map of slugs to heading metadata (from _parse_headings)
+            anchor_links: List of anchor links (from _find_anchor_links)
+
+        Returns:
+            Number of links successfully converted
+
+        Raises:
+            GoogleDocsError: If batchUpdate fails
+        """
+        if not anchor_links:
+            logger.info("No anchor links to convert")
+            return 0
+
+        # Build batchUpdate requests (process in reverse order)
+        requests = self._anchor_link_requests(heading_map, anchor_links)
+        converted_count = len(requests)
 
         if not requests:
             logger.info("No valid anchor links to convert")
@@ -394,10 +471,10 @@ class GoogleDocsService:
 
         # Execute batchUpdate
         try:
-            self.docs_service.documents().batchUpdate(
+            self._execute(self.docs_service.documents().batchUpdate(
                 documentId=doc_id,
                 body={'requests': requests}
-            ).execute()
+            ))
 
             logger.info(f"✅ Converted {converted_count} anchor links to headingId links")
             return converted_count
@@ -425,7 +502,7 @@ class GoogleDocsService:
         try:
             # Step 1: Get document structure
             logger.info("🔗 Processing anchor links...")
-            document = self.docs_service.documents().get(documentId=doc_id).execute()
+            document = self._execute(self.docs_service.documents().get(documentId=doc_id))
 
             # Step 2: Parse headings
             heading_map = self._parse_headings(document)
@@ -446,3 +523,88 @@ class GoogleDocsService:
         except HttpError as error:
             logger.error(f"Failed to process anchor links: {error}")
             raise GoogleDocsError(f"Failed to process anchor links: {error}")
+
+    def embed_images(
+        self,
+        doc_id: str,
+        embeds: List[Dict[str, Any]],
+        convert_anchor_links: bool = True
+    ) -> Tuple[int, int]:
+        """
+        Embed every diagram/image and convert anchor links in one batchUpdate.
+
+        The document is fetched once; all [DIAGRAM:...] and [IMAGE:...]
+        markers are located in that snapshot, and every delete/insert pair
+        (plus anchor-link updateTextStyle requests) is sent in a single
+        request ordered by descending index, so earlier edits never shift
+        the positions of later ones.
+
+        Args:
+            doc_id: Document ID
+            embeds: Dicts with 'kind' ('DIAGRAM' or 'IMAGE'), 'name',
+                    'image_url', 'width_pt' and 'height_pt'
+            convert_anchor_links: Also convert #anchor links to heading links
+
+        Returns:
+            Tuple of (images embedded, anchor links converted)
+
+        Raises:
+            GoogleDocsError: If fetching or updating the document fails
+        """
+        try:
+            document = self._execute(self.docs_service.documents().get(documentId=doc_id))
+        except HttpError as error:
+            logger.error(f"Failed to fetch document: {error}")
+            raise GoogleDocsError(f"Failed to fetch document: {error}")
+
+        # (index, requests) pairs, sorted once everything is collected
+        operations = []
+        embedded_count = 0
+
+        # Repeated names consume their markers in document order
+        markers: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for kind in {embed['kind'] for embed in embeds}:
+            for marker in self._find_markers(document, kind):
+                markers.setdefault((kind, marker['name']), []).append(marker)
+
+        for embed in embeds:
+            matching = markers.get((embed['kind'], embed['name']))
+            marker = matching.pop(0) if matching else None
+            if not marker:
+                logger.warning(f"  ⚠️  Marker not found for {embed['name']}")
+                continue
+            operations.append((marker['index'], self._embed_requests(
+                marker['index'], marker['length'], embed['image_url'],
+                embed['width_pt'], embed['height_pt']
+            )))
+            embedded_count += 1
+
+        converted_count = 0
+        if convert_anchor_links:
+            heading_map = self._parse_headings(document)
+            anchor_links = self._find_anchor_links(document) if heading_map else []
+            for request in self._anchor_link_requests(heading_map, anchor_links):
+                start_index = request['updateTextStyle']['range']['startIndex']
+                operations.append((start_index, [request]))
+                converted_count += 1
+
+        if not operations:
+            return 0, 0
+
+        operations.sort(key=lambda op: op[0], reverse=True)
+        requests = [request for _, op_requests in operations for request in op_requests]
+
+        try:
+            self._execute(self.docs_service.documents().batchUpdate(
+                documentId=doc_id,
+                body={'requests': requests}
+            ))
+        except HttpError as error:
+            logger.error(f"Failed to embed images: {error}")
+            raise GoogleDocsError(f"Failed to embed images: {error}")
+
+        logger.info(
+            f"Embedded {embedded_count} images and converted {converted_count} "
+            f"anchor links in one request"
+        )
+        return embedded_count, converted_count
@@ -3,19 +3,24 @@ Google Drive Tool - Enhanced file and image upload operations.
 
 Provides:
 - Image upload from bytes
+- Streaming, resumable file upload from disk
 - Public URL generation
 - Folder creation
+- Batched permission updates
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Optional
 from pathlib import Path
 
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaInMemoryUpload
+from googleapiclient.http import MediaFileUpload, MediaInMemoryUpload
 from google.oauth2 import service_account
 
+from .executor import BatchExecutor, execute_with_retry
+from .ratelimit import RateLimiter
+
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +30,30 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive.file'
 ]
 
+# Resumable upload chunks must be a multiple of 256 KiB (except the last one)
+UPLOAD_CHUNK_MULTIPLE = 256 * 1024
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def check_chunk_size(chunk_size: int) -> int:
+    """
+    Validate a resumable upload chunk size.
+
+    Args:
+        chunk_size: Chunk size in bytes
+
+    Returns:
+        The chunk size
+
+    Raises:
+        ValueError: If it is not a positive multiple of 256 KiB
+    """
+    if chunk_size <= 0 or chunk_size % UPLOAD_CHUNK_MULTIPLE:
+        raise ValueError(
+            f"Upload chunk size must be a positive multiple of {UPLOAD_CHUNK_MULTIPLE} bytes, got {chunk_size}"
+        )
+    return chunk_size
+
 
 class GoogleDriveError(Exception):
     """Base exception for Google Drive operations"""
@@ -36,14 +65,26 @@ class GoogleDriveService:
     Google Drive service wrapper for file operations.
     """
 
-    def __init__(self, credentials_path: str):
+    rate_limiter: Optional[RateLimiter] = None
+    _service_account_email: Optional[str] = None
+
+    def __init__(
+        self,
+        credentials_path: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE
+    ):
         """
         Initialize Google Drive service.
 
         Args:
             credentials_path: Path to service account credentials JSON
+            rate_limiter: Shared rate limiter for all API calls (optional)
+            chunk_size: Bytes per resumable upload chunk for upload_file (multiple of 256 KiB)
         """
         self.credentials_path = credentials_path
+        self.rate_limiter = rate_limiter
+        self.chunk_size = check_chunk_size(chunk_size)
         self.service = None
         self._authenticate()
 
@@ -67,6 +108,10 @@ class GoogleDriveService:
             logger.error(f"Authentication failed: {str(e)}")
             raise GoogleDriveError(f"Authentication failed: {str(e)}")
 
+    def _execute(self, request):
+        """Execute a request through the shared rate limiter with retries"""
+        return execute_with_retry(request, self.rate_limiter, api='drive')
+
     def upload_image_bytes(
         self,
         image_bytes: bytes,
@@ -91,18 +136,58 @@ class GoogleDriveService:
         Raises:
             GoogleDriveError: If upload fails
         """
+        media = MediaInMemoryUpload(
+            image_bytes,
+            mimetype=mime_type,
+            resumable=True
+        )
+        return self._create_file(media, filename, folder_id, len(image_bytes))
+
+    def upload_file(
+        self,
+        file_path: Path,
+        filename: str,
+        folder_id: str,
+        mime_type: str = 'image/png',
+        shared_drive_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload a local file to Google Drive, streaming it from disk.
+
+        The file is sent as a resumable upload in chunks of chunk_size
+        bytes, so memory use does not grow with the file, and an upload
+        interrupted by a transient error resumes from the last chunk Drive
+        acknowledged.
+
+        Args:
+            file_path: Local file to upload
+            filename: Name for the file in Drive
+            folder_id: Folder ID to upload to
+            mime_type: MIME type of the file (default: image/png)
+            shared_drive_id: Shared Drive ID if applicable
+
+        Returns:
+            Dict: File metadata with id, name, and webViewLink
+
+        Raises:
+            GoogleDriveError: If upload fails
+        """
+        media = MediaFileUpload(
+            str(file_path),
+            mimetype=mime_type,
+            chunksize=self.chunk_size,
+            resumable=True
+        )
+        return self._create_file(media, filename, folder_id, media.size())
+
+    def _create_file(self, media, filename: str, folder_id: str, size: int) -> Dict[str, Any]:
+        """Create a file from a media body (shared by the upload methods)"""
         try:
             file_metadata = {
                 'name': filename,
                 'parents': [folder_id]
             }
 
-            media = MediaInMemoryUpload(
-                image_bytes,
-                mimetype=mime_type,
-                resumable=True
-            )
-
             # Build request parameters
             create_params = {
                 'body': file_metadata,
@@ -111,11 +196,11 @@ class GoogleDriveService:
                 'supportsAllDrives': True  # Always support Shared Drives
             }
 
-            file = self.service.files().create(**create_params).execute()
+            file = self._execute(self.service.files().create(**create_params))
 
             logger.info(
-                f"Uploaded image: {file['name']} "
-                f"({len(image_bytes)} bytes, ID: {file['id']})"
+                f"Uploaded: {file['name']} "
+                f"({size} bytes, ID: {file['id']})"
             )
 
             return {
@@ -126,8 +211,8 @@ class GoogleDriveService:
             }
 
         except HttpError as error:
-            logger.error(f"Failed to upload image: {error}")
-            raise GoogleDriveError(f"Failed to upload image: {error}")
+            logger.error(f"Failed to upload {filename}: {error}")
+            raise GoogleDriveError(f"Failed to upload {filename}: {error}") from error
 
     def create_folder(
         self,
@@ -162,7 +247,7 @@ class GoogleDriveService:
                 'supportsAllDrives': True  # Always support Shared Drives
             }
 
-            folder = self.service.files().create(**create_params).execute()
+            folder = self._execute(self.service.files().create(**create_params))
 
             logger.info(f"Created folder: {folder['name']} (ID: {folder['id']})")
 
@@ -193,6 +278,56 @@ class GoogleDriveService:
         # Google Drive direct download URL format
         return f"https://drive.google.com/uc?export=view&id={file_id}"
 
+    def new_batch(self) -> BatchExecutor:
+        """
+        Create a batch for metadata-only calls (permissions, folders).
+
+        Returns:
+            BatchExecutor bound to this service and its rate limiter
+        """
+        return BatchExecutor(self.service, self.rate_limiter, api='drive')
+
+    def _public_permission_request(self, file_id: str):
+        """Build the permissions().create request that makes a file public"""
+        permission = {
+            'type': 'anyone',
+            'role': 'reader'
+        }
+
+        create_params = {
+            'fileId': file_id,
+            'body': permission,
+            'sendNotificationEmail': False,
+            'supportsAllDrives': True  # Always support Shared Drives
+        }
+
+        return self.service.permissions().create(**create_params)
+
+    def _service_account_reader_request(self, file_id: str):
+        """Build the permissions().create request that adds the service account as reader"""
+        # Get service account email from credentials (read once)
+        if self._service_account_email is None:
+            credentials = service_account.Credentials.from_service_account_file(
+                self.credentials_path,
+                scopes=SCOPES
+            )
+            self._service_account_email = credentials.service_account_email
+
+        permission = {
+            'type': 'user',
+            'role': 'reader',
+            'emailAddress': self._service_account_email
+        }
+
+        create_params = {
+            'fileId': file_id,
+            'body': permission,
+            'sendNotificationEmail': False,
+            'supportsAllDrives': True
+        }
+
+        return self.service.permissions().create(**create_params)
+
     def set_public_permissions(
         self,
         file_id: str,
@@ -209,19 +344,7 @@ class GoogleDriveService:
             GoogleDriveError: If permission setting fails
         """
         try:
-            permission = {
-                'type': 'anyone',
-                'role': 'reader'
-            }
-
-            create_params = {
-                'fileId': file_id,
-                'body': permission,
-                'sendNotificationEmail': False,
-                'supportsAllDrives': True  # Always support Shared Drives
-            }
-
-            self.service.permissions().create(**create_params).execute()
+            self._execute(self._public_permission_request(file_id))
 
             logger.info(f"Set public permissions on {file_id}")
 
@@ -243,30 +366,42 @@ class GoogleDriveService:
             GoogleDriveError: If permission setting fails
         """
         try:
-            # Get service account email from credentials
-            credentials = service_account.Credentials.from_service_account_file(
-                self.credentials_path,
-                scopes=SCOPES
-            )
-            service_account_email = credentials.service_account_email
-
-            permission = {
-                'type': 'user',
-                'role': 'reader',
-                'emailAddress': service_account_email
-            }
-
-            create_params = {
-                'fileId': file_id,
-                'body': permission,
-                'sendNotificationEmail': False,
-                'supportsAllDrives': True
-            }
-
-            self.service.permissions().create(**create_params).execute()
+            self._execute(self._service_account_reader_request(file_id))
 
             logger.info(f"Added service account reader permission on {file_id}")
 
         except HttpError as error:
             logger.error(f"Failed to add service account permission: {error}")
             raise GoogleDriveError(f"Failed to add service account permission: {error}")
+
+    def queue_public_permissions(
+        self,
+        batch: BatchExecutor,
+        file_id: str,
+        callback: Optional[Callable[[Optional[dict], Optional[Exception]], None]] = None
+    ) -> None:
+        """
+        Queue a public-read permission in a batch (see new_batch).
+
+        Args:
+            batch: Batch to add the request to
+            file_id: File ID
+            callback: Called as callback(response, exception) after the batch flushes
+        """
+        batch.add(self._public_permission_request(file_id), callback)
+
+    def queue_service_account_reader(
+        self,
+        batch: BatchExecutor,
+        file_id: str,
+        callback: Optional[Callable[[Optional[dict], Optional[Exception]], None]] = None
+    ) -> None:
+        """
+        Queue a service-account reader permission in a batch (see new_batch).
+
+        Args:
+            batch: Batch to add the request to
+            file_id: File ID
+            callback: Called as callback(response, exception) after the batch flushes
+        """
+        batch.add(self._service_account_reader_request(file_id), callback)
@@ -0,0 +1,154 @@
+"""
+Git-based change detection for directory syncs
+
+Instead of walking and checking a whole tree, ask git which files may
+have changed since the commit recorded at the last successful sync:
+
+- `git diff --name-status <commit>` against the working tree (committed,
+  staged and unstaged changes to tracked files)
+- untracked files not ignored by .gitignore (`git ls-files --others
+  --exclude-standard`)
+- files that were dirty when the last sync ran (they may since have been
+  reverted to the committed content, which the diff would not show)
+
+Without a usable recorded commit every tracked and untracked,
+non-ignored file is listed (`git ls-files`), still without walking the
+tree. Deleted files need no git query: the planner prunes cache entries
+whose files are gone.
+"""
+
+import logging
+import subprocess
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .walker import PathMatcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class GitScanError(Exception):
+    """git is not installed, or the directory is not inside a work tree"""
+    pass
+
+
+class GitScan:
+    """Files to check for one directory sync, as reported by git"""
+
+    def __init__(self, head: Optional[str], base: Optional[str]):
+        """
+        Args:
+            head: Commit checked out when the scan ran (None in a repo without commits)
+            base: Commit the changes are relative to (None for a full listing)
+        """
+        self.head = head
+        self.base = base
+        # Candidate files (existing, not excluded or ignored)
+        self.files: List[Path] = []
+        # Tracked files (relative POSIX paths) differing from head when scanned
+        self.dirty: List[str] = []
+        # Candidates dropped by exclude patterns or ignore rules
+        self.excluded = 0
+        self.ignored = 0
+
+
+def _git(directory: Path, *args: str) -> str:
+    """Run a git command in directory and return its output"""
+    try:
+        result = subprocess.run(
+            ['git', *args], cwd=directory, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False
+        )
+    except OSError as e:
+        raise GitScanError(f"Cannot run git: {e}") from e
+    if result.returncode != 0:
+        raise GitScanError(result.stderr.decode('utf-8', 'replace').strip() or f"git {args[0]} failed")
+    return result.stdout.decode('utf-8', 'surrogateescape')
+
+
+def _paths(output: str) -> List[str]:
+    """Split NUL-terminated path output (-z)"""
+    return [path for path in output.split('\0') if path]
+
+
+def _changed_paths(output: str) -> List[str]:
+    """Paths of added, modified or type-changed entries in `diff --name-status -z --no-renames`"""
+    fields = _paths(output)
+    # Alternating status, path
+    return [path for status, path in zip(fields[::2], fields[1::2]) if status[0] != 'D']
+
+
+def _commit_exists(directory: Path, commit: str) -> bool:
+    try:
+        _git(directory, 'cat-file', '-e', f"{commit}^{{commit}}")
+        return True
+    except GitScanError:
+        return False
+
+
+def scan_git_changes(
+    directory: Path,
+    base: Optional[str] = None,
+    previously_dirty: Iterable[str] = (),
+    recursive: bool = True,
+    matcher: Optional[PathMatcher] = None
+) -> GitScan:
+    """
+    List the files under a directory that may have changed since a commit
+
+    Args:
+        directory: Directory inside a git work tree
+        base: Commit of the last successful sync (None lists every file)
+        previously_dirty: GitScan.dirty of that sync
+        recursive: Include files in subdirectories
+        matcher: Exclude and ignore rules
+
+    Returns:
+        GitScan of the directory
+
+    Raises:
+        GitScanError: If git is unavailable or directory is not in a work tree
+    """
+    directory = Path(directory)
+    if _git(directory, 'rev-parse', '--is-inside-work-tree').strip() != 'true':
+        raise GitScanError(f"{directory} is not inside a git work tree")
+    try:
+        head = _git(directory, 'rev-parse', '--verify', '--quiet', 'HEAD').strip()
+    except GitScanError:
+        head = None
+
+    if base is not None and not _commit_exists(directory, base):
+        logger.info(f"   Last synced commit {base[:12]} not found - listing all files")
+        base = None
+    scan = GitScan(head, base)
+
+    untracked = _paths(_git(directory, 'ls-files', '-z', '--others', '--exclude-standard'))
+    if head is not None:
+        scan.dirty = _changed_paths(_git(
+            directory, 'diff', '--name-status', '-z', '--no-renames', '--relative', head
+        ))
+
+    if base is None:
+        candidates = _paths(_git(directory, 'ls-files', '-z', '--cached')) + untracked
+    else:
+        changed = scan.dirty if base == head else _changed_paths(_git(
+            directory, 'diff', '--name-status', '-z', '--no-renames', '--relative', base
+        ))
+        candidates = changed + untracked + list(previously_dirty)
+
+    root = directory.as_posix()
+    for relative in dict.fromkeys(candidates):
+        if not recursive and '/' in relative:
+            continue
+        if matcher is not None:
+            if matcher.excludes_relative(root, relative):
+                scan.excluded += 1
+                continue
+            if matcher.ignores(relative.rsplit('/', 1)[-1]):
+                scan.ignored += 1
+                continue
+        path = directory / relative
+        if path.is_file():
+            scan.files.append(path)
+
+    return scan
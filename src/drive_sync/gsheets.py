@@ -0,0 +1,513 @@
+"""
+Google Sheets Tool - Row-level incremental updates of CSV-backed sheets.
+
+A CSV is converted to a Google Sheet by a full upload the first time.
+The rows it contained are remembered as a snapshot (one short hash per
+row); when the CSV changes it is compared with the snapshot and only the
+changed row ranges are written with spreadsheets.values.batchUpdate, a
+bounded number of rows per request.
+Rows past the new end are deleted and the grid is grown as needed in one
+spreadsheets.batchUpdate.
+
+CSVs too large for Drive conversion are instead streamed into sheets in
+chunks of rows (iter_csv_chunks and the write methods below); sync.py
+shards them across tabs and spreadsheets to stay within the cell limit.
+
+Layout:
+    <cache_dir>/<sha256 of CSV path>.json   {spreadsheet_id, columns, rows: [row hash, ...]}
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from google.oauth2 import service_account
+
+from .executor import execute_with_retry
+from .ratelimit import RateLimiter
+
+
+logger = logging.getLogger(__name__)
+
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive.file'
+]
+
+DEFAULT_SNAPSHOT_DIR = 'cache/sheets'
+
+# Above this share of changed rows the whole CSV is uploaded again
+INCREMENTAL_MAX_CHANGED = 0.5
+
+# Google Sheets limit on grid cells per spreadsheet (all tabs together)
+SHEETS_CELL_LIMIT = 10_000_000
+
+# Streamed imports start a new tab after this many rows
+ROWS_PER_TAB = 1_000_000
+
+# Rows sent per Sheets API call when writing row updates or streaming a CSV
+DEFAULT_CHUNK_ROWS = 10_000
+
+# (first row index, rows) of one contiguous block of changed rows
+RowRange = Tuple[int, List[List[str]]]
+
+
+class GoogleSheetsError(Exception):
+    """Base exception for Google Sheets operations"""
+    pass
+
+
+def row_hash(row: List[str]) -> str:
+    """Short, collision-resistant hash of one parsed CSV row"""
+    return hashlib.blake2b(json.dumps(row).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def hash_csv_rows(csv_file: Path) -> Tuple[List[str], int]:
+    """
+    Hash every row of a CSV file without keeping the rows in memory.
+
+    Args:
+        csv_file: CSV file
+
+    Returns:
+        Tuple of (row hashes in order, widest row length)
+
+    Raises:
+        ValueError: If the file is not UTF-8 text or not valid CSV
+    """
+    hashes = []
+    columns = 0
+    try:
+        with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.reader(f):
+                hashes.append(row_hash(row))
+                columns = max(columns, len(row))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ValueError(f"Cannot parse {csv_file}: {e}") from e
+    return hashes, columns
+
+
+def changed_ranges(old_hashes: List[str], new_hashes: List[str]) -> List[Tuple[int, int]]:
+    """
+    Find the rows that differ between two snapshots of the same CSV.
+
+    Rows are compared by position; rows past the end of the old snapshot
+    count as changed.
+
+    Args:
+        old_hashes: Row hashes last written to the sheet
+        new_hashes: Row hashes of the current CSV
+
+    Returns:
+        Contiguous [start, end) row index ranges to write, in order
+    """
+    ranges: List[Tuple[int, int]] = []
+    start = None
+    for index, new_hash in enumerate(new_hashes):
+        changed = index >= len(old_hashes) or old_hashes[index] != new_hash
+        if changed and start is None:
+            start = index
+        elif not changed and start is not None:
+            ranges.append((start, index))
+            start = None
+    if start is not None:
+        ranges.append((start, len(new_hashes)))
+    return ranges
+
+
+def read_row_ranges(csv_file: Path, ranges: List[Tuple[int, int]], columns: int = 0) -> List[RowRange]:
+    """
+    Read only the rows in the given ranges from a CSV file.
+
+    Args:
+        csv_file: CSV file
+        ranges: Sorted [start, end) row index ranges
+        columns: Pad every row to at least this many cells (clears cells
+                 left over from wider rows)
+
+    Returns:
+        List of (start index, rows) per range
+    """
+    blocks: List[RowRange] = []
+    if not ranges:
+        return blocks
+    current = 0
+    with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+        for index, row in enumerate(csv.reader(f)):
+            while current < len(ranges) and index >= ranges[current][1]:
+                current += 1
+            if current == len(ranges):
+                break
+            start, _ = ranges[current]
+            if index < start:
+                continue
+            if not blocks or blocks[-1][0] != start:
+                blocks.append((start, []))
+            blocks[-1][1].append(row + [''] * (columns - len(row)))
+    return blocks
+
+
+def iter_csv_chunks(
+    csv_file: Path,
+    chunk_rows: int,
+    offset: int = 0
+) -> Iterator[Tuple[List[List[str]], int]]:
+    """
+    Read a CSV file in chunks of rows, remembering where each chunk ends.
+
+    Args:
+        csv_file: CSV file
+        chunk_rows: Rows per chunk
+        offset: Byte offset to start at (the end of an earlier chunk)
+
+    Yields:
+        Tuple of (rows, byte offset just past the last row)
+
+    Raises:
+        ValueError: If the file is not UTF-8 text or not valid CSV
+    """
+    with open(csv_file, 'rb') as f:
+        f.seek(offset)
+        position = offset
+
+        def lines():
+            # csv.reader pulls lines only as each row needs them, so after a
+            # row is returned `position` is exactly where the next row starts
+            nonlocal position
+            for raw in f:
+                encoding = 'utf-8-sig' if position == 0 else 'utf-8'
+                position += len(raw)
+                yield raw.decode(encoding)
+
+        chunk: List[List[str]] = []
+        try:
+            for row in csv.reader(lines()):
+                chunk.append(row)
+                if len(chunk) >= chunk_rows:
+                    yield chunk, position
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ValueError(f"Cannot parse {csv_file}: {e}") from e
+        if chunk:
+            yield chunk, position
+
+
+def _a1_title(title: str) -> str:
+    """Quote a sheet title for A1 notation"""
+    return "'" + title.replace("'", "''") + "'"
+
+
+class SheetSnapshots:
+    """Row hashes last written to each CSV-backed sheet, one JSON file per CSV"""
+
+    def __init__(self, cache_dir: str = DEFAULT_SNAPSHOT_DIR):
+        """
+        Args:
+            cache_dir: Directory holding the snapshot files
+        """
+        self.cache_dir = cache_dir
+
+    def _path(self, csv_file: Path) -> str:
+        key = hashlib.sha256(str(Path(csv_file).resolve()).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, csv_file: Path) -> Optional[dict]:
+        """
+        Load the snapshot of a CSV.
+
+        Returns:
+            Dict with spreadsheet_id, columns and rows, or None
+        """
+        path = self._path(csv_file)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load sheet snapshot for {csv_file}: {e}")
+            return None
+
+    def put(self, csv_file: Path, spreadsheet_id: str, hashes: List[str], columns: int):
+        """Record the rows now in a sheet"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(csv_file)
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({'spreadsheet_id': spreadsheet_id, 'columns': columns, 'rows': hashes}, f)
+        os.replace(tmp_file, path)
+
+    def delete(self, csv_file: Path):
+        """Forget the snapshot of a CSV"""
+        try:
+            os.unlink(self._path(csv_file))
+        except FileNotFoundError:
+            pass
+
+
+class GoogleSheetsService:
+    """
+    Google Sheets service wrapper for in-place row updates.
+    """
+
+    rate_limiter: Optional[RateLimiter] = None
+
+    def __init__(self, credentials_path: str, rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initialize Google Sheets service.
+
+        Args:
+            credentials_path: Path to service account credentials JSON
+            rate_limiter: Shared rate limiter for all API calls (optional)
+        """
+        self.credentials_path = credentials_path
+        self.rate_limiter = rate_limiter
+        self.sheets_service = None
+        self._authenticate()
+
+    def _authenticate(self):
+        """Authenticate with Google Sheets API"""
+        try:
+            if not Path(self.credentials_path).exists():
+                raise GoogleSheetsError(
+                    f"Credentials not found: {self.credentials_path}"
+                )
+
+            credentials = service_account.Credentials.from_service_account_file(
+                self.credentials_path,
+                scopes=SCOPES
+            )
+
+            self.sheets_service = build('sheets', 'v4', credentials=credentials)
+            logger.info("Authenticated with Google Sheets API")
+
+        except Exception as e:
+            logger.error(f"Authentication failed: {str(e)}")
+            raise GoogleSheetsError(f"Authentication failed: {str(e)}")
+
+    def _execute(self, request):
+        """Execute a request through the shared rate limiter with retries"""
+        return execute_with_retry(request, self.rate_limiter, api='sheets')
+
+    def update_rows(
+        self,
+        spreadsheet_id: str,
+        blocks: List[RowRange],
+        row_count: int,
+        previous_row_count: int,
+        column_count: int,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS
+    ) -> int:
+        """
+        Write changed rows into the first sheet of a spreadsheet.
+
+        The grid is grown to fit row_count x column_count and rows from
+        row_count to previous_row_count are deleted (one batchUpdate, only
+        when needed), then the blocks are written with values.batchUpdate
+        using USER_ENTERED parsing, as CSV import does. Each request carries
+        at most chunk_rows rows, so large diffs never build one huge body.
+
+        Args:
+            spreadsheet_id: Spreadsheet (Drive file) ID
+            blocks: (start row index, rows) of each changed range
+            row_count: Rows in the CSV now
+            previous_row_count: Rows in the sheet before this update
+            column_count: Widest row
+            chunk_rows: Maximum rows per values.batchUpdate (blocks are split)
+
+        Returns:
+            Number of cells written
+
+        Raises:
+            GoogleSheetsError: If the spreadsheet cannot be read or updated
+        """
+        try:
+            spreadsheet = self._execute(self.sheets_service.spreadsheets().get(
+                spreadsheetId=spreadsheet_id,
+                fields='sheets.properties(sheetId,title,gridProperties)'
+            ))
+            properties = spreadsheet['sheets'][0]['properties']
+            sheet_id = properties['sheetId']
+            grid = properties.get('gridProperties', {})
+
+            requests: List[Dict[str, Any]] = []
+            if row_count < previous_row_count:
+                requests.append({'deleteDimension': {'range': {
+                    'sheetId': sheet_id, 'dimension': 'ROWS',
+                    'startIndex': row_count, 'endIndex': previous_row_count
+                }}})
+            elif row_count > grid.get('rowCount', 0):
+                requests.append({'appendDimension': {
+                    'sheetId': sheet_id, 'dimension': 'ROWS', 'length': row_count - grid.get('rowCount', 0)
+                }})
+            if column_count > grid.get('columnCount', 0):
+                requests.append({'appendDimension': {
+                    'sheetId': sheet_id, 'dimension': 'COLUMNS',
+                    'length': column_count - grid.get('columnCount', 0)
+                }})
+            if requests:
+                self._execute(self.sheets_service.spreadsheets().batchUpdate(
+                    spreadsheetId=spreadsheet_id, body={'requests': requests}
+                ))
+
+            if not blocks:
+                return 0
+            title = _a1_title(properties['title'])
+            chunk_rows = max(1, chunk_rows)
+            requests_sent = 0
+            data: List[Dict[str, Any]] = []
+            pending = 0
+            for start, rows in blocks:
+                offset = 0
+                while offset < len(rows):
+                    piece = rows[offset:offset + chunk_rows - pending]
+                    data.append({'range': f"{title}!A{start + offset + 1}", 'values': piece})
+                    offset += len(piece)
+                    pending += len(piece)
+                    if pending == chunk_rows:
+                        self._write_values(spreadsheet_id, data)
+                        requests_sent += 1
+                        data, pending = [], 0
+            if data:
+                self._write_values(spreadsheet_id, data)
+                requests_sent += 1
+
+            cells = sum(len(row) for _, rows in blocks for row in rows)
+            logger.info(
+                f"Updated {cells} cells in {len(blocks)} ranges of {spreadsheet_id} "
+                f"({requests_sent} requests)"
+            )
+            return cells
+
+        except (HttpError, KeyError, IndexError) as error:
+            raise GoogleSheetsError(f"Failed to update rows of {spreadsheet_id}: {error}") from error
+
+    def _write_values(self, spreadsheet_id: str, data: List[Dict[str, Any]]):
+        """Write value ranges with one values.batchUpdate (USER_ENTERED)"""
+        self._execute(self.sheets_service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'valueInputOption': 'USER_ENTERED', 'data': data}
+        ))
+
+    def _sheet_properties(self, spreadsheet_id: str) -> List[Dict[str, Any]]:
+        """Properties (sheetId, title, grid) of every tab"""
+        spreadsheet = self._execute(self.sheets_service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id, fields='sheets.properties(sheetId,title,gridProperties)'
+        ))
+        return [sheet['properties'] for sheet in spreadsheet['sheets']]
+
+    def start_spreadsheet(self, spreadsheet_id: str, title: str) -> int:
+        """
+        Prepare a spreadsheet for a streamed import.
+
+        Every tab but the first is deleted; the first is emptied, shrunk to
+        one cell (so it uses no cell budget) and renamed.
+
+        Args:
+            spreadsheet_id: New or previously imported spreadsheet
+            title: Title for the first tab
+
+        Returns:
+            sheetId of the first tab
+
+        Raises:
+            GoogleSheetsError: If the spreadsheet cannot be read or updated
+        """
+        try:
+            tabs = self._sheet_properties(spreadsheet_id)
+            sheet_id = tabs[0]['sheetId']
+            requests: List[Dict[str, Any]] = [{'deleteSheet': {'sheetId': tab['sheetId']}} for tab in tabs[1:]]
+            requests.append({'updateCells': {'range': {'sheetId': sheet_id}, 'fields': 'userEnteredValue'}})
+            requests.append({'updateSheetProperties': {
+                'properties': {
+                    'sheetId': sheet_id, 'title': title,
+                    'gridProperties': {'rowCount': 1, 'columnCount': 1}
+                },
+                'fields': 'title,gridProperties(rowCount,columnCount)'
+            }})
+            self._execute(self.sheets_service.spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id, body={'requests': requests}
+            ))
+            return sheet_id
+
+        except (HttpError, KeyError, IndexError) as error:
+            raise GoogleSheetsError(f"Failed to prepare {spreadsheet_id}: {error}") from error
+
+    def add_sheet(self, spreadsheet_id: str, title: str) -> int:
+        """
+        Add an empty one-cell tab, or return the tab of that title if it exists
+        (a resumed import may have added it already).
+
+        Returns:
+            sheetId of the tab
+
+        Raises:
+            GoogleSheetsError: If the tab cannot be added
+        """
+        try:
+            for tab in self._sheet_properties(spreadsheet_id):
+                if tab['title'] == title:
+                    return tab['sheetId']
+            response = self._execute(self.sheets_service.spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={'requests': [{'addSheet': {'properties': {
+                    'title': title, 'gridProperties': {'rowCount': 1, 'columnCount': 1}
+                }}}]}
+            ))
+            return response['replies'][0]['addSheet']['properties']['sheetId']
+
+        except (HttpError, KeyError, IndexError) as error:
+            raise GoogleSheetsError(f"Failed to add sheet {title} to {spreadsheet_id}: {error}") from error
+
+    def write_rows(
+        self,
+        spreadsheet_id: str,
+        sheet_id: int,
+        title: str,
+        start_row: int,
+        rows: List[List[str]],
+        column_count: int
+    ):
+        """
+        Write rows at a fixed position, growing the tab's grid to fit exactly.
+
+        Both calls are idempotent, so a chunk can be written again after an
+        interrupted import.
+
+        Args:
+            spreadsheet_id: Spreadsheet ID
+            sheet_id: Tab sheetId
+            title: Tab title
+            start_row: Zero-based row of the first row written
+            rows: Rows to write
+            column_count: Columns the tab should have
+
+        Raises:
+            GoogleSheetsError: If the rows cannot be written
+        """
+        try:
+            self._execute(self.sheets_service.spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={'requests': [{'updateSheetProperties': {
+                    'properties': {'sheetId': sheet_id, 'gridProperties': {
+                        'rowCount': start_row + len(rows), 'columnCount': column_count
+                    }},
+                    'fields': 'gridProperties(rowCount,columnCount)'
+                }}]}
+            ))
+            self._execute(self.sheets_service.spreadsheets().values().update(
+                spreadsheetId=spreadsheet_id,
+                range=f"{_a1_title(title)}!A{start_row + 1}",
+                valueInputOption='USER_ENTERED',
+                body={'values': rows}
+            ))
+
+        except HttpError as error:
+            raise GoogleSheetsError(f"Failed to write rows to {spreadsheet_id}: {error}") from error
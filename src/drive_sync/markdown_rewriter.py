@@ -0,0 +1,237 @@
+"""
+Single-pass Markdown rewriting for Google Docs upload
+
+MarkdownRewriter scans a document once, recognising fenced code blocks,
+inline code spans and image references, and emits the rewritten text as
+it goes:
+
+- ```mermaid blocks become [DIAGRAM:name] markers (the diagrams are collected)
+- local images, ![alt](path) or `name.png`, become [IMAGE:name] markers
+- other fenced blocks are framed with ═══ CODE ═══ rulers and indented
+- inline code becomes ⟨ code ⟩
+
+Fences follow CommonMark: they open and close on their own lines, and an
+unterminated fence runs to the end of the document (it is formatted as a
+code block, never extracted as a diagram). Nothing inside a code block is
+treated as an image or inline code.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+# One alternation per token kind; the scan always resumes after the last token
+_TOKEN = re.compile(
+    # Opening fence: up to 3 spaces, 3+ backticks, info string (no backticks)
+    r'^(?P<indent>[ ]{0,3})(?P<fence>`{3,})(?P<info>[^`\n]*)(?:\n|\Z)'
+    # Markdown image
+    r'|!\[(?P<alt>[^\]]*)\]\((?P<src>[^)]+)\)'
+    # Inline code; may wrap lines but not cross a blank line or a fence
+    r'|`(?P<code>(?:[^`\n]|\n(?![ \t]*(?:\n|`)))+)`',
+    re.MULTILINE
+)
+
+_CLOSING_FENCE = re.compile(r'^[ ]{0,3}(`{3,})[ \t]*(?:\n|\Z)', re.MULTILINE)
+
+_LANGUAGE = re.compile(r'\w+')
+
+
+class MarkdownRewriter:
+    """Rewrites one Markdown document and collects its diagrams and images"""
+
+    def __init__(
+        self,
+        source_file: Optional[Path] = None,
+        extract_diagrams: bool = True,
+        extract_images: bool = True,
+        format_code: bool = True
+    ):
+        """
+        Args:
+            source_file: Markdown file being rewritten (resolves relative image paths;
+                         required when extract_images is set)
+            extract_diagrams: Replace ```mermaid blocks with diagram markers
+            extract_images: Replace local image references with image markers
+            format_code: Frame fenced code blocks and bracket inline code
+        """
+        self.source_dir = Path(source_file).parent if source_file is not None else None
+        self.extract_diagrams = extract_diagrams
+        self.extract_images = extract_images and self.source_dir is not None
+        self.format_code = format_code
+        # Diagrams in document order (repeated diagrams appear once per block)
+        self.diagrams: List[Dict[str, str]] = []
+        # Images in order of first reference
+        self.images: List[Dict[str, str]] = []
+        self._image_markers: Dict[str, str] = {}
+        # Reference → resolved image path (None if not found); repeated
+        # references to an image cost one filesystem lookup
+        self._resolved: Dict[Tuple[str, str], Optional[Path]] = {}
+
+    def rewrite(self, md_content: str) -> str:
+        """
+        Rewrite a document.
+
+        Args:
+            md_content: Raw markdown
+
+        Returns:
+            Rewritten markdown
+        """
+        return ''.join(self.iter_rewrite(md_content))
+
+    def iter_rewrite(self, md_content: str) -> Iterator[str]:
+        """
+        Rewrite a document incrementally.
+
+        Args:
+            md_content: Raw markdown
+
+        Yields:
+            Consecutive pieces of the rewritten markdown
+        """
+        pos = 0
+        while True:
+            match = _TOKEN.search(md_content, pos)
+            if match is None:
+                break
+            if match.start() > pos:
+                yield md_content[pos:match.start()]
+
+            if match.group('fence') is not None:
+                piece, pos = self._fenced_block(md_content, match)
+            elif match.group('src') is not None:
+                piece, pos = self._markdown_image(match), match.end()
+            else:
+                piece, pos = self._inline_code(match), match.end()
+            yield piece
+
+        if pos < len(md_content):
+            yield md_content[pos:]
+
+    def _fenced_block(self, md_content: str, match) -> Tuple[str, int]:
+        """Rewrite a fenced block; returns (text, position after the block)"""
+        body_start = match.end()
+        fence_length = len(match.group('fence'))
+        closing = _CLOSING_FENCE.search(md_content, body_start)
+        while closing is not None and len(closing.group(1)) < fence_length:
+            closing = _CLOSING_FENCE.search(md_content, closing.end())
+
+        if closing is None:
+            code, end, line_end = md_content[body_start:], len(md_content), ''
+        else:
+            code, end = md_content[body_start:closing.start()], closing.end()
+            line_end = '\n' if md_content[end - 1:end] == '\n' else ''
+
+        words = match.group('info').split()
+        language = words[0] if words and _LANGUAGE.fullmatch(words[0]) else ''
+        indent = match.group('indent')
+
+        if language.lower() == 'mermaid':
+            if self.extract_diagrams and closing is not None:
+                return f"{indent}\n[DIAGRAM:{self._add_diagram(code.strip())}]\n{line_end}", end
+            if not self.extract_diagrams:
+                return md_content[match.start():end], end
+
+        if not self.format_code:
+            return md_content[match.start():end], end
+
+        header = f"═══ CODE ({language.upper()}) ═══" if language else "═══ CODE ═══"
+        footer = "═" * len(header)
+        # Indent code slightly for better visibility
+        indented_code = '\n'.join('    ' + line for line in code.split('\n'))
+        return f"{indent}\n{header}\n{indented_code}\n{footer}\n{line_end}", end
+
+    def _markdown_image(self, match) -> str:
+        """Replace ![alt](path) with a marker when it points at a local image"""
+        image_path = match.group('src')
+        # Skip URLs (http/https)
+        if not self.extract_images or image_path.startswith(('http://', 'https://', '//')):
+            return match.group(0)
+
+        full_path = self._find_image('markdown', image_path)
+        if full_path is None:
+            return match.group(0)
+        return f"\n[IMAGE:{self._add_image(full_path, match.group('alt'))}]\n"
+
+    def _inline_code(self, match) -> str:
+        """Replace `name.png` with an image marker, or bracket the code"""
+        code = match.group('code')
+        filename = code.strip()
+        if self.extract_images and filename.lower().endswith(IMAGE_EXTENSIONS):
+            full_path = self._find_image('inline', filename)
+            if full_path is not None:
+                return f"[IMAGE:{self._add_image(full_path, filename)}]"
+
+        if self.format_code:
+            return f"⟨ {code} ⟩"
+        return match.group(0)
+
+    def _find_image(self, kind: str, reference: str) -> Optional[Path]:
+        """
+        Resolve an image reference to an existing local file.
+
+        Args:
+            kind: 'markdown' for ![alt](path) (relative to the document),
+                  'inline' for `name.png` (also searched in screenshot/image folders)
+            reference: Path or filename as written
+
+        Returns:
+            Resolved path, or None if no such image exists
+        """
+        key = (kind, reference)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        found = None
+        if kind == 'markdown':
+            full_path = (self.source_dir / reference).resolve()
+            if full_path.suffix.lower() in IMAGE_EXTENSIONS and full_path.exists():
+                found = full_path
+        else:
+            # Try to find the image in common locations
+            search_paths = [
+                self.source_dir / reference,
+                self.source_dir / 'screenshots' / reference,
+                self.source_dir / 'images' / reference,
+                self.source_dir.parent / 'screenshots' / reference,
+                self.source_dir.parent / 'images' / reference,
+                self.source_dir.parent / 'scope' / 'screenshots' / reference,
+            ]
+            for search_path in search_paths:
+                full_path = search_path.resolve()
+                if full_path.exists():
+                    found = full_path
+                    break
+
+        self._resolved[key] = found
+        return found
+
+    def _add_diagram(self, diagram_code: str) -> str:
+        """Record a diagram and return its marker name"""
+        code_hash = hashlib.md5(diagram_code.encode()).hexdigest()[:8]
+        diagram_name = f"mermaid_{code_hash}"
+        self.diagrams.append({
+            'name': diagram_name,
+            'code': diagram_code,
+            'hash': code_hash
+        })
+        return diagram_name
+
+    def _add_image(self, full_path: Path, alt_text: str) -> str:
+        """Record an image (once per file) and return its marker name"""
+        path = str(full_path)
+        marker_name = self._image_markers.get(path)
+        if marker_name is None:
+            marker_name = f"image_{hashlib.md5(path.encode()).hexdigest()[:8]}"
+            self._image_markers[path] = marker_name
+            self.images.append({
+                'name': marker_name,
+                'display_name': full_path.stem,
+                'path': path,
+                'alt': alt_text
+            })
+        return marker_name
@@ -3,26 +3,53 @@ Mermaid diagram rendering with multiple backends:
 1. Local mermaid-cli (mmdc) - preferred, reliable, no external dependencies
 2. mermaid.ink API - fallback when CLI unavailable
 
+Local rendering goes through a pool of persistent render workers (see
+mermaid_worker.py) when available, and falls back to one mmdc process per
+diagram otherwise. mermaid.ink requests share one keep-alive connection
+pool; render_many() renders batches concurrently with asyncio.
+
 The render mode is controlled by MERMAID_RENDER_MODE environment variable:
 - "local" (default): Use mermaid-cli for reliable local rendering
 - "api": Use mermaid.ink API (original behavior)
 - "hybrid": Try local first, fall back to API on failure
 """
 
+import asyncio
+import atexit
 import base64
 import logging
 import os
 import subprocess
 import tempfile
+import threading
+import time
 import shutil
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 import httpx
 
+from .mermaid_worker import MermaidWorkerError, MermaidWorkerUnavailable, get_worker_pool
+
 logger = logging.getLogger(__name__)
 
 # Check if mermaid-cli is available
 MMDC_AVAILABLE = shutil.which('mmdc') is not None
 
+# HTTP/2 needs the optional h2 package; HTTP/1.1 keep-alive is used otherwise
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_MERMAID_INK_URL = "https://mermaid.ink"
+API_MAX_CONCURRENCY = 8
+API_MAX_RETRIES = 3
+API_RETRY_BACKOFF = 1.0
+
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
 
 class MermaidAPIError(Exception):
     """Raised when Mermaid.ink API fails"""
@@ -44,6 +71,9 @@ def render_mermaid_local(
     """
     Render Mermaid diagram using local mermaid-cli (mmdc).
 
+    Diagrams go to the persistent render worker pool when it is available;
+    otherwise (or if the workers fail) a fresh mmdc process is used.
+
     This is more reliable than the API as it:
     - Has no external network dependencies
     - No URL length limits
@@ -66,6 +96,29 @@ def render_mermaid_local(
     if not MMDC_AVAILABLE:
         raise MermaidCLIError("mermaid-cli (mmdc) is not installed or not in PATH")
 
+    # Prefer a warm render worker over launching mmdc + Chromium per diagram
+    pool = get_worker_pool()
+    if pool is not None:
+        try:
+            image_bytes = pool.render(diagram_code, format, theme, background_color, timeout)
+            logger.info(f"Rendered Mermaid diagram via render worker ({len(image_bytes)} bytes)")
+            return image_bytes
+        except MermaidWorkerUnavailable as e:
+            logger.warning(f"Render worker unavailable, falling back to mmdc: {e}")
+        except MermaidWorkerError as e:
+            raise MermaidCLIError(f"Failed to render diagram: {e}") from e
+
+    return _render_mermaid_mmdc(diagram_code, format, theme, background_color, timeout)
+
+
+def _render_mermaid_mmdc(
+    diagram_code: str,
+    format: str,
+    theme: str,
+    background_color: str,
+    timeout: int
+) -> bytes:
+    """Render one diagram with a fresh mmdc process (see render_mermaid_local)"""
     # Create temp files for input and output
     temp_dir = Path(tempfile.gettempdir()) / "mermaid"
     temp_dir.mkdir(exist_ok=True)
@@ -141,12 +194,83 @@ def render_mermaid_local(
                     pass
 
 
+def _api_request(
+    diagram_code: str,
+    format: str,
+    theme: str,
+    background_color: str
+) -> Tuple[str, Dict[str, str]]:
+    """Build the mermaid.ink URL and query parameters for a diagram"""
+    # Encode diagram code to base64
+    graphbytes = diagram_code.encode("utf-8")
+    base64_string = base64.urlsafe_b64encode(graphbytes).decode("ascii")
+
+    url = f"{_api_base_url()}/img/{base64_string}"
+    params = {
+        "type": format,
+        "theme": theme,
+        "bgColor": background_color
+    }
+    return url, params
+
+
+def _api_base_url() -> str:
+    """mermaid.ink base URL (MERMAID_INK_URL overrides it, e.g. for a self-hosted instance)"""
+    return os.environ.get('MERMAID_INK_URL', DEFAULT_MERMAID_INK_URL).rstrip('/')
+
+
+def _retry_delay(error: httpx.HTTPError, attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before retrying a failed API request, or None if not retryable.
+
+    Connection errors, 429 and 5xx are retried with exponential backoff;
+    a Retry-After header on 429/503 takes precedence.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status != 429 and status < 500:
+            return None
+        retry_after = error.response.headers.get('retry-after')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    elif not isinstance(error, httpx.TransportError):
+        return None
+    return API_RETRY_BACKOFF * (2 ** attempt)
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=API_MAX_CONCURRENCY * 2, max_keepalive_connections=API_MAX_CONCURRENCY)
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Get the shared, connection-pooled client for mermaid.ink requests.
+
+    Connections are kept alive between diagrams (HTTP/2 when the optional
+    h2 package is installed), so only the first request pays TCP/TLS setup.
+
+    Returns:
+        Process-wide httpx.Client (thread-safe)
+    """
+    global _http_client
+
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(http2=HTTP2_AVAILABLE, limits=_http_limits(), timeout=30)
+            atexit.register(_http_client.close)
+        return _http_client
+
+
 def render_mermaid_api(
     diagram_code: str,
     format: str = "png",
     theme: str = "default",
     background_color: str = "white",
-    timeout: int = 30
+    timeout: int = 30,
+    max_retries: int = API_MAX_RETRIES
 ) -> bytes:
     """
     Render Mermaid diagram using mermaid.ink API.
@@ -160,6 +284,7 @@ def render_mermaid_api(
         theme: Mermaid theme (default, dark, forest, neutral)
         background_color: Background color (transparent, white, etc.)
         timeout: Request timeout in seconds
+        max_retries: Maximum attempts for throttled/failed requests
 
     Returns:
         bytes: Rendered diagram image
@@ -167,24 +292,13 @@ def render_mermaid_api(
     Raises:
         MermaidAPIError: If API request fails
     """
-    try:
-        # Encode diagram code to base64
-        graphbytes = diagram_code.encode("utf-8")
-        base64_string = base64.urlsafe_b64encode(graphbytes).decode("ascii")
-
-        # Build API URL with parameters
-        url = f"https://mermaid.ink/img/{base64_string}"
-        params = {
-            "type": format,
-            "theme": theme,
-            "bgColor": background_color
-        }
-
-        logger.info(f"Rendering Mermaid diagram via API (format={format}, theme={theme})")
+    url, params = _api_request(diagram_code, format, theme, background_color)
+    logger.info(f"Rendering Mermaid diagram via API (format={format}, theme={theme})")
 
-        # Call mermaid.ink API (synchronous for simpler integration)
-        with httpx.Client(timeout=timeout) as client:
-            response = client.get(url, params=params)
+    for attempt in range(max_retries):
+        try:
+            # Pooled client: connections are reused across diagrams and threads
+            response = get_http_client().get(url, params=params, timeout=timeout)
             response.raise_for_status()
 
             image_bytes = response.content
@@ -192,15 +306,116 @@ def render_mermaid_api(
 
             return image_bytes
 
-    except httpx.HTTPError as e:
-        error_msg = f"Mermaid.ink API request failed: {str(e)}"
-        logger.error(error_msg)
-        raise MermaidAPIError(error_msg) from e
+        except httpx.HTTPError as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == max_retries - 1:
+                error_msg = f"Mermaid.ink API request failed: {str(e)}"
+                logger.error(error_msg)
+                raise MermaidAPIError(error_msg) from e
+            logger.warning(f"Mermaid.ink request failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
 
-    except Exception as e:
-        error_msg = f"Failed to render Mermaid diagram: {str(e)}"
-        logger.error(error_msg)
-        raise MermaidAPIError(error_msg) from e
+        except Exception as e:
+            error_msg = f"Failed to render Mermaid diagram: {str(e)}"
+            logger.error(error_msg)
+            raise MermaidAPIError(error_msg) from e
+
+    raise MermaidAPIError("Mermaid.ink API request failed")
+
+
+async def render_mermaid_api_async(
+    diagram_code: str,
+    format: str = "png",
+    theme: str = "default",
+    background_color: str = "white",
+    timeout: int = 30,
+    max_retries: int = API_MAX_RETRIES,
+    client: Optional[httpx.AsyncClient] = None
+) -> bytes:
+    """
+    Render Mermaid diagram using mermaid.ink API without blocking the event loop.
+
+    Args:
+        diagram_code: Mermaid diagram syntax
+        format: Output format (png, svg, pdf)
+        theme: Mermaid theme (default, dark, forest, neutral)
+        background_color: Background color (transparent, white, etc.)
+        timeout: Request timeout in seconds
+        max_retries: Maximum attempts for throttled/failed requests
+        client: Pooled AsyncClient to use (a temporary one is created if omitted)
+
+    Returns:
+        bytes: Rendered diagram image
+
+    Raises:
+        MermaidAPIError: If API request fails
+    """
+    if client is None:
+        async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=_http_limits()) as own_client:
+            return await render_mermaid_api_async(
+                diagram_code, format, theme, background_color, timeout, max_retries, own_client
+            )
+
+    url, params = _api_request(diagram_code, format, theme, background_color)
+
+    for attempt in range(max_retries):
+        try:
+            response = await client.get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response.content
+
+        except httpx.HTTPError as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == max_retries - 1:
+                raise MermaidAPIError(f"Mermaid.ink API request failed: {str(e)}") from e
+            logger.warning(f"Mermaid.ink request failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    raise MermaidAPIError("Mermaid.ink API request failed")
+
+
+async def render_many(
+    diagrams: Iterable[str],
+    format: str = "png",
+    theme: str = "default",
+    background_color: str = "white",
+    concurrency: int = API_MAX_CONCURRENCY,
+    timeout: int = 30,
+    max_retries: int = API_MAX_RETRIES
+) -> List[Union[bytes, MermaidAPIError]]:
+    """
+    Render many diagrams concurrently via mermaid.ink over one connection pool.
+
+    Args:
+        diagrams: Mermaid diagram sources
+        format: Output format (png, svg, pdf)
+        theme: Mermaid theme (default, dark, forest, neutral)
+        background_color: Background color
+        concurrency: Maximum requests in flight
+        timeout: Request timeout in seconds
+        max_retries: Maximum attempts per diagram
+
+    Returns:
+        One entry per diagram, in input order: the image bytes, or the
+        MermaidAPIError for diagrams that failed
+
+    Example:
+        >>> images = asyncio.run(render_many([code_a, code_b], concurrency=4))
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=_http_limits()) as client:
+        async def render_one(diagram_code: str) -> Union[bytes, MermaidAPIError]:
+            async with semaphore:
+                try:
+                    return await render_mermaid_api_async(
+                        diagram_code, format, theme, background_color,
+                        timeout, max_retries, client
+                    )
+                except MermaidAPIError as e:
+                    return e
+
+        return await asyncio.gather(*(render_one(code) for code in diagrams))
 
 
 def render_mermaid_diagram(
@@ -307,7 +522,7 @@ def get_mermaid_url(
     base64_string = base64.urlsafe_b64encode(graphbytes).decode("ascii")
 
     # Build public URL with parameters
-    url = f"https://mermaid.ink/img/{base64_string}"
+    url = f"{_api_base_url()}/img/{base64_string}"
     params = f"?type={format}&theme={theme}&bgColor={background_color}"
 
     return url + params
@@ -0,0 +1,91 @@
+#!/usr/bin/env node
+/**
+ * Long-lived Mermaid render worker.
+ *
+ * Keeps one headless Chromium warm and renders diagrams sent as JSON lines
+ * on stdin, answering with one JSON line per request on stdout:
+ *
+ *   -> {"id": 1, "code": "graph TD; A-->B", "format": "png", "theme": "default", "backgroundColor": "white"}
+ *   <- {"id": 1, "ok": true, "data": "<base64>"}
+ *   -> {"id": 2, "ping": true}
+ *   <- {"id": 2, "ok": true}
+ *
+ * Uses the renderer exported by the globally installed @mermaid-js/mermaid-cli
+ * (override its location with MERMAID_CLI_PATH). Driven by mermaid_worker.py.
+ */
+
+import { execSync } from 'node:child_process';
+import fs from 'node:fs';
+import { createRequire } from 'node:module';
+import path from 'node:path';
+import readline from 'node:readline';
+import { pathToFileURL } from 'node:url';
+
+function send(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+function cliRoot() {
+  if (process.env.MERMAID_CLI_PATH) {
+    return process.env.MERMAID_CLI_PATH;
+  }
+  const globalRoot = execSync('npm root -g', { encoding: 'utf8' }).trim();
+  return path.join(globalRoot, '@mermaid-js', 'mermaid-cli');
+}
+
+async function loadRenderer() {
+  const root = cliRoot();
+  const pkg = JSON.parse(fs.readFileSync(path.join(root, 'package.json'), 'utf8'));
+  const entry = pkg.exports?.['.']?.import || pkg.exports?.['.'] || pkg.main || 'src/index.js';
+  const { renderMermaid } = await import(pathToFileURL(path.join(root, entry)).href);
+
+  // puppeteer is a dependency of mermaid-cli; resolve it from there
+  const requireFromCli = createRequire(path.join(root, 'package.json'));
+  const puppeteer = await import(pathToFileURL(requireFromCli.resolve('puppeteer')).href);
+  return { renderMermaid, puppeteer: puppeteer.default || puppeteer };
+}
+
+async function main() {
+  const { renderMermaid, puppeteer } = await loadRenderer();
+  const browser = await puppeteer.launch({
+    headless: true,
+    executablePath: process.env.PUPPETEER_EXECUTABLE_PATH || '/usr/bin/chromium',
+    args: ['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage'],
+  });
+
+  async function handle(request) {
+    if (request.ping) {
+      return { id: request.id, ok: browser.connected ?? browser.isConnected() };
+    }
+    const { data } = await renderMermaid(browser, request.code, request.format || 'png', {
+      backgroundColor: request.backgroundColor || 'white',
+      mermaidConfig: { theme: request.theme || 'default' },
+    });
+    return { id: request.id, ok: true, data: Buffer.from(data).toString('base64') };
+  }
+
+  // Requests are handled one at a time; the Python pool runs one request per worker
+  let queue = Promise.resolve();
+  const lines = readline.createInterface({ input: process.stdin });
+  lines.on('line', (line) => {
+    queue = queue.then(async () => {
+      let request;
+      try {
+        request = JSON.parse(line);
+        send(await handle(request));
+      } catch (error) {
+        send({ id: request?.id ?? null, ok: false, error: String(error?.message || error) });
+      }
+    });
+  });
+  lines.on('close', () => {
+    queue.then(() => browser.close()).finally(() => process.exit(0));
+  });
+
+  send({ ready: true });
+}
+
+main().catch((error) => {
+  send({ ready: false, error: String(error?.message || error) });
+  process.exit(1);
+});
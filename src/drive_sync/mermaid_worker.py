@@ -0,0 +1,339 @@
+"""
+Pool of persistent Mermaid render workers.
+
+Each worker is a long-lived Node process (mermaid_worker.mjs) that keeps a
+headless Chromium open and renders diagrams sent over its stdin/stdout as
+JSON lines. Rendering through a warm browser avoids the Node start-up and
+Chromium launch that every mmdc invocation pays.
+
+Configuration (environment):
+- MERMAID_WORKERS: number of worker processes (default 2, 0 disables the pool)
+- MERMAID_WORKER_HEALTH_INTERVAL: seconds a worker may sit idle before it is
+  pinged on checkout (default 30)
+"""
+
+import atexit
+import base64
+import itertools
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+WORKER_SCRIPT = Path(__file__).with_name('mermaid_worker.mjs')
+
+
+class MermaidWorkerError(Exception):
+    """Raised when a worker fails to render a diagram"""
+    pass
+
+
+class MermaidWorkerUnavailable(MermaidWorkerError):
+    """Raised when no healthy worker can be started or a worker died"""
+    pass
+
+
+class MermaidWorker:
+    """One persistent render process speaking JSON lines over stdin/stdout"""
+
+    def __init__(self, command: List[str], startup_timeout: float = 60):
+        """
+        Start a worker process and wait until its browser is ready.
+
+        Args:
+            command: Command line that starts the worker
+            startup_timeout: Seconds to wait for the ready message
+
+        Raises:
+            MermaidWorkerUnavailable: If the worker fails to start
+        """
+        self._ids = itertools.count(1)
+        self._lines: 'queue.Queue[Optional[str]]' = queue.Queue()
+        self.last_used = time.monotonic()
+
+        try:
+            self.process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding='utf-8',
+                bufsize=1
+            )
+        except OSError as e:
+            raise MermaidWorkerUnavailable(f"Could not start render worker: {e}") from e
+
+        # Reader thread so every read can time out
+        threading.Thread(target=self._read_lines, daemon=True).start()
+
+        ready = self._next_message(startup_timeout)
+        if not ready.get('ready'):
+            self.close()
+            raise MermaidWorkerUnavailable(f"Render worker failed to start: {ready.get('error')}")
+
+    def _read_lines(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _next_message(self, timeout: float) -> dict:
+        """Read the next JSON message, killing the worker on timeout or exit"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.kill()
+                raise MermaidWorkerUnavailable(f"Render worker timed out after {timeout}s")
+            if line is None:
+                self.close()
+                raise MermaidWorkerUnavailable("Render worker exited unexpectedly")
+            try:
+                return json.loads(line)
+            except ValueError:
+                # Stray output (e.g. library warnings) is not part of the protocol
+                logger.debug(f"Ignoring worker output: {line.rstrip()}")
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is still running"""
+        return self.process.poll() is None
+
+    def request(self, payload: dict, timeout: float) -> dict:
+        """
+        Send one request and wait for its response.
+
+        Args:
+            payload: Request message (an id is added)
+            timeout: Seconds to wait for the response
+
+        Returns:
+            Response message
+
+        Raises:
+            MermaidWorkerUnavailable: If the worker died or timed out
+        """
+        request_id = next(self._ids)
+        try:
+            self.process.stdin.write(json.dumps(dict(payload, id=request_id)) + '\n')
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            self.close()
+            raise MermaidWorkerUnavailable(f"Render worker is gone: {e}") from e
+
+        while True:
+            response = self._next_message(timeout)
+            if response.get('id') == request_id:
+                self.last_used = time.monotonic()
+                return response
+
+    def ping(self, timeout: float = 5) -> bool:
+        """
+        Health check: ask the worker whether its browser is still connected.
+
+        Returns:
+            True if the worker answered in time
+        """
+        if not self.alive:
+            return False
+        try:
+            return bool(self.request({'ping': True}, timeout).get('ok'))
+        except MermaidWorkerUnavailable:
+            return False
+
+    def kill(self):
+        """Stop a hung worker immediately"""
+        self.process.kill()
+        self.process.wait()
+
+    def close(self):
+        """Stop the worker (closing stdin lets it shut its browser down)"""
+        try:
+            self.process.stdin.close()
+        except Exception:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class MermaidWorkerPool:
+    """
+    Fixed-size pool of render workers shared by all sync threads.
+
+    Workers are started lazily. A worker idle for longer than
+    health_check_interval is pinged before use and replaced if it does not
+    answer; a worker that dies or times out mid-render is discarded. If a
+    worker cannot be started at all the pool disables itself so callers
+    fall back to per-diagram mmdc without paying the start-up cost again.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        command: Optional[List[str]] = None,
+        startup_timeout: float = 60,
+        health_check_interval: float = 30
+    ):
+        """
+        Initialize worker pool.
+
+        Args:
+            size: Maximum number of worker processes
+            command: Worker command line (default: node mermaid_worker.mjs)
+            startup_timeout: Seconds to wait for a worker to become ready
+            health_check_interval: Idle seconds after which a worker is pinged before use
+        """
+        self.size = size
+        self.command = command or [shutil.which('node') or 'node', str(WORKER_SCRIPT)]
+        self.startup_timeout = startup_timeout
+        self.health_check_interval = health_check_interval
+        self.disabled = False
+        self._idle: 'queue.Queue[MermaidWorker]' = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self._workers: List[MermaidWorker] = []
+
+    def _checkout(self) -> MermaidWorker:
+        """Take an idle worker, starting a new one while under the pool size"""
+        worker = None
+        while worker is None:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    if self.disabled:
+                        raise MermaidWorkerUnavailable("Render worker pool is disabled")
+                    start = self._started < self.size
+                    if start:
+                        self._started += 1
+                if start:
+                    return self._start_worker()
+                # All workers busy; re-check periodically in case one was discarded
+                try:
+                    worker = self._idle.get(timeout=1)
+                except queue.Empty:
+                    pass
+
+        # Health check workers that have been idle for a while
+        stale = time.monotonic() - worker.last_used > self.health_check_interval
+        if not worker.alive or (stale and not worker.ping()):
+            logger.warning("Mermaid render worker unhealthy - restarting")
+            self._discard(worker)
+            with self._lock:
+                self._started += 1
+            return self._start_worker()
+        return worker
+
+    def _start_worker(self) -> MermaidWorker:
+        try:
+            worker = MermaidWorker(self.command, self.startup_timeout)
+        except MermaidWorkerUnavailable:
+            with self._lock:
+                self._started -= 1
+                self.disabled = True
+            raise
+        with self._lock:
+            self._workers.append(worker)
+        logger.info(f"Started Mermaid render worker ({self._started}/{self.size})")
+        return worker
+
+    def _discard(self, worker: MermaidWorker):
+        worker.close()
+        with self._lock:
+            self._started -= 1
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def render(
+        self,
+        diagram_code: str,
+        format: str = 'png',
+        theme: str = 'default',
+        background_color: str = 'white',
+        timeout: float = 60
+    ) -> bytes:
+        """
+        Render a diagram on a warm worker.
+
+        Args:
+            diagram_code: Mermaid diagram syntax
+            format: Output format (png, svg, pdf)
+            theme: Mermaid theme
+            background_color: Background color
+            timeout: Render timeout in seconds
+
+        Returns:
+            bytes: Rendered diagram image
+
+        Raises:
+            MermaidWorkerUnavailable: If no worker could render (caller should fall back)
+            MermaidWorkerError: If the diagram itself failed to render
+        """
+        worker = self._checkout()
+        try:
+            response = worker.request({
+                'code': diagram_code,
+                'format': format,
+                'theme': theme,
+                'backgroundColor': background_color
+            }, timeout)
+        except MermaidWorkerUnavailable:
+            self._discard(worker)
+            raise
+
+        self._idle.put(worker)
+        if not response.get('ok'):
+            raise MermaidWorkerError(response.get('error') or "Unknown render error")
+        return base64.b64decode(response['data'])
+
+    def close(self):
+        """Stop every worker"""
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._started = 0
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for worker in workers:
+            worker.close()
+
+
+_pool: Optional[MermaidWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> Optional[MermaidWorkerPool]:
+    """
+    Get the process-wide worker pool configured from the environment.
+
+    Returns:
+        Shared MermaidWorkerPool, or None when disabled (MERMAID_WORKERS=0,
+        Node not installed, or workers failed to start)
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            size = int(os.environ.get('MERMAID_WORKERS', '2'))
+            if size <= 0 or not shutil.which('node'):
+                return None
+            _pool = MermaidWorkerPool(
+                size=size,
+                health_check_interval=float(os.environ.get('MERMAID_WORKER_HEALTH_INTERVAL', '30'))
+            )
+            atexit.register(_pool.close)
+
+    return None if _pool.disabled else _pool
@@ -0,0 +1,129 @@
+"""
+Change-set planning for directory syncs
+
+Before any API work, every file in a tree is checked against the sync
+cache (size/mtime/inode first, content hash only when those changed) and
+classified as new, modified or unchanged; cache entries whose files no
+longer exist are reported as deleted. sync_directory then creates only
+the folders that changed files need, so a sync with nothing to do makes
+no Drive calls.
+"""
+
+import os
+from pathlib import Path
+from typing import List, Optional, Set
+
+from .cache import SyncCache
+from .converter import FileTypeDetector
+
+
+class ChangeSet:
+    """Files of one directory sync, classified against the cache"""
+
+    def __init__(self, root: Path):
+        """
+        Args:
+            root: Directory being synced
+        """
+        self.root = root
+        self.new: List[Path] = []
+        self.modified: List[Path] = []
+        self.unchanged: List[Path] = []
+        # Cache keys of synced files that are gone from disk
+        self.deleted: List[str] = []
+        # Files no converter handles
+        self.unsupported: List[Path] = []
+        # New and modified files in scan order
+        self.changed: List[Path] = []
+
+    def folders(self) -> Set[Path]:
+        """
+        Subdirectories that must exist on Drive for the changed files
+
+        Returns:
+            Directories below root holding changed files, with their ancestors
+        """
+        needed = set()
+        for file_path in self.changed:
+            parent = file_path.parent
+            while parent != self.root and parent not in needed:
+                try:
+                    parent.relative_to(self.root)
+                except ValueError:
+                    break
+                needed.add(parent)
+                parent = parent.parent
+        return needed
+
+    def summary(self) -> str:
+        """One-line counts for logging"""
+        return (
+            f"{len(self.new)} new, {len(self.modified)} modified, "
+            f"{len(self.unchanged)} unchanged, {len(self.deleted)} deleted"
+        )
+
+
+def _is_under(path: str, root: Path) -> bool:
+    try:
+        Path(path).relative_to(root)
+        return True
+    except ValueError:
+        return False
+
+
+def plan_changes(
+    root: Path,
+    files: List[Path],
+    cache: Optional[SyncCache] = None,
+    workers: int = 1
+) -> ChangeSet:
+    """
+    Classify the files of a directory sync without calling any API
+
+    Args:
+        root: Directory being synced
+        files: Files found under root (already filtered for excludes/ignores)
+        cache: Sync cache; without one every supported file is new
+        workers: Threads used to hash files whose metadata changed
+
+    Returns:
+        ChangeSet for the tree
+    """
+    plan = ChangeSet(root)
+
+    supported = []
+    for file_path in files:
+        try:
+            FileTypeDetector.get_converter(file_path)
+        except ValueError:
+            plan.unsupported.append(file_path)
+        else:
+            supported.append(file_path)
+
+    if cache is None:
+        plan.new = list(supported)
+        plan.changed = list(supported)
+        return plan
+
+    if workers > 1:
+        results = cache.prehash(supported, workers)
+    else:
+        results = [cache.should_sync(file_path) for file_path in supported]
+
+    for file_path, (should_sync, reason) in zip(supported, results):
+        if not should_sync:
+            plan.unchanged.append(file_path)
+            continue
+        if reason == "new file":
+            plan.new.append(file_path)
+        else:
+            plan.modified.append(file_path)
+        plan.changed.append(file_path)
+
+    scanned = {str(file_path) for file_path in files}
+    plan.deleted = [
+        key for key in cache.paths()
+        if key not in scanned and _is_under(key, root) and not os.path.exists(key)
+    ]
+
+    return plan
@@ -0,0 +1,254 @@
+"""
+Rate limiting for Google API calls.
+
+Provides:
+- RateLimiter: pluggable limiter interface shared by every sync worker
+- IntervalRateLimiter: fixed minimum delay between calls (legacy RATE_LIMIT_DELAY)
+- TokenBucket: thread-safe token bucket with AIMD rate adjustment
+- TokenBucketRateLimiter: one token bucket per Google API (drive, docs, sheets)
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Default (requests/second, burst capacity) per API.
+# Drive allows far more than the Docs/Sheets write quotas (60 writes/min/user).
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    'drive': (10.0, 20.0),
+    'docs': (1.0, 5.0),
+    'sheets': (1.0, 5.0),
+}
+
+
+class RateLimiter:
+    """
+    Base rate limiter interface.
+
+    Every API call first calls acquire(); the retry loop then reports the
+    outcome with record_success() or record_throttle() so adaptive limiters
+    can tune their rate. The base class only counts calls.
+    """
+
+    def __init__(self):
+        self.call_count = 0
+        self._count_lock = threading.Lock()
+
+    def acquire(self, api: str = 'drive', tokens: int = 1):
+        """
+        Block until the caller may issue `tokens` calls against `api`.
+
+        Args:
+            api: API bucket name (drive, docs, sheets)
+            tokens: Number of calls about to be made (e.g. batch size)
+        """
+        with self._count_lock:
+            self.call_count += tokens
+
+    def record_success(self, api: str = 'drive'):
+        """Report a successful call"""
+        pass
+
+    def record_throttle(self, api: str = 'drive', retry_after: Optional[float] = None):
+        """
+        Report a throttled call (429 / rate limit exceeded).
+
+        Args:
+            api: API bucket name
+            retry_after: Server-provided Retry-After delay in seconds, if any
+        """
+        pass
+
+
+class IntervalRateLimiter(RateLimiter):
+    """
+    Space API calls at least `delay` seconds apart across all threads and APIs.
+
+    Each caller reserves the next free time slot under a lock and sleeps
+    outside of it, so N workers share one global call rate instead of each
+    sleeping independently.
+    """
+
+    def __init__(self, delay: float = 0.5):
+        """
+        Initialize rate limiter.
+
+        Args:
+            delay: Minimum delay in seconds between API calls (0 disables)
+        """
+        super().__init__()
+        self.delay = delay
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, api: str = 'drive', tokens: int = 1):
+        """Block until the caller may issue its next API call"""
+        super().acquire(api, tokens)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot) if self.delay > 0 else now
+            self._next_slot = slot + self.delay * tokens
+
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with additive-increase/multiplicative-decrease.
+
+    Tokens refill continuously at `rate` per second up to `capacity` (the
+    burst size). Callers that find the bucket empty reserve tokens anyway
+    (driving the balance negative) and sleep outside the lock until their
+    reservation is covered, which keeps waiting callers in FIFO order.
+
+    On throttling the rate is halved (down to `min_rate`) and, when the
+    server sends Retry-After, the bucket is paused until that deadline.
+    Each success then adds `increase` requests/second back, up to the
+    configured ceiling `max_rate`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        increase: Optional[float] = None
+    ):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Initial refill rate (requests/second)
+            capacity: Burst capacity (maximum stored tokens)
+            min_rate: Floor for multiplicative decrease (default: rate / 16)
+            max_rate: Ceiling for additive increase (default: rate)
+            increase: Rate added per successful call (default: max_rate / 50)
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Token bucket rate and capacity must be positive")
+
+        self.rate = rate
+        self.capacity = capacity
+        self.max_rate = max_rate or rate
+        self.min_rate = min_rate or rate / 16
+        self.increase = increase or self.max_rate / 50
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Add tokens earned since the last update (lock must be held)"""
+        if now > self._updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def acquire(self, tokens: int = 1):
+        """
+        Take `tokens` from the bucket, sleeping until they are available.
+
+        Args:
+            tokens: Number of tokens to take
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= tokens
+            wait = max(0.0, self._paused_until - now)
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self):
+        """Additive increase towards max_rate"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """
+        Multiplicative decrease, optionally pausing until Retry-After.
+
+        Args:
+            retry_after: Seconds the server asked us to wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+                self._updated = max(self._updated, self._paused_until)
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    """
+    Per-API token buckets so Drive traffic never waits behind Docs quota.
+
+    Unknown API names share the 'drive' bucket.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Initialize per-API buckets.
+
+        Args:
+            limits: Map of API name → (requests/second, burst capacity);
+                    missing APIs use DEFAULT_LIMITS
+        """
+        super().__init__()
+        merged = dict(DEFAULT_LIMITS)
+        merged.update(limits or {})
+        self.buckets: Dict[str, TokenBucket] = {
+            api: TokenBucket(rate, capacity) for api, (rate, capacity) in merged.items()
+        }
+
+    def _bucket(self, api: str) -> TokenBucket:
+        return self.buckets.get(api) or self.buckets['drive']
+
+    def acquire(self, api: str = 'drive', tokens: int = 1):
+        """Block until the API's bucket has `tokens` available"""
+        super().acquire(api, tokens)
+        self._bucket(api).acquire(tokens)
+
+    def record_success(self, api: str = 'drive'):
+        """Let the API's rate recover additively"""
+        self._bucket(api).on_success()
+
+    def record_throttle(self, api: str = 'drive', retry_after: Optional[float] = None):
+        """Halve the API's rate and honour Retry-After"""
+        bucket = self._bucket(api)
+        bucket.on_throttle(retry_after)
+        logger.warning(
+            f"Throttled by {api} API - rate reduced to {bucket.rate:.2f} req/s"
+            + (f", pausing {retry_after:.1f}s" if retry_after else "")
+        )
+
+
+def limits_from_env() -> Dict[str, Tuple[float, float]]:
+    """
+    Read per-API limits from environment variables.
+
+    For each API in DEFAULT_LIMITS, `<API>_RATE_LIMIT` sets requests/second
+    and `<API>_BURST` sets the burst capacity (e.g. DRIVE_RATE_LIMIT=20).
+
+    Returns:
+        Map of API name → (requests/second, burst capacity)
+    """
+    limits = {}
+    for api, (rate, capacity) in DEFAULT_LIMITS.items():
+        rate = float(os.getenv(f'{api.upper()}_RATE_LIMIT', rate))
+        capacity = float(os.getenv(f'{api.upper()}_BURST', capacity))
+        limits[api] = (rate, capacity)
+    return limits
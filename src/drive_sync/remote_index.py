@@ -0,0 +1,145 @@
+"""
+In-memory index of remote Drive folder contents.
+
+Each target folder is listed once per run (paginated, minimal fields) and
+kept in memory keyed by (parent, name, mimeType), so existence checks before
+uploads become dictionary lookups instead of one files().list per file.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Only the fields needed for existence checks and change detection
+LIST_FIELDS = 'nextPageToken, files(id, name, mimeType, md5Checksum, modifiedTime)'
+PAGE_SIZE = 1000
+
+
+class RemoteFolderIndex:
+    """Lazily-populated, thread-safe index of Drive folder listings"""
+
+    def __init__(self, service, execute: Callable[[Any], dict]):
+        """
+        Initialize remote index.
+
+        Args:
+            service: Google Drive v3 service object
+            execute: Callable that executes a request (rate limiting + retries)
+        """
+        self.service = service
+        self.execute = execute
+        self._folders: Dict[str, Dict[Tuple[str, str], dict]] = {}
+        self._lock = threading.Lock()
+        self._listing_locks: Dict[str, threading.Lock] = {}
+
+    def _list_folder(self, parent_id: str) -> Dict[Tuple[str, str], dict]:
+        """List every non-trashed child of a folder, following pagination"""
+        entries: Dict[Tuple[str, str], dict] = {}
+        page_token = None
+
+        while True:
+            request = self.service.files().list(
+                q=f"'{parent_id}' in parents and trashed=false",
+                spaces='drive',
+                fields=LIST_FIELDS,
+                pageSize=PAGE_SIZE,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True
+            )
+            results = self.execute(request)
+
+            for item in results.get('files', []):
+                # Keep the first match, like the old per-file query did
+                entries.setdefault((item['name'], item['mimeType']), item)
+
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+        logger.info(f"📇 Indexed {len(entries)} items in folder {parent_id}")
+        return entries
+
+    def folder(self, parent_id: str) -> Dict[Tuple[str, str], dict]:
+        """
+        Get the (name, mimeType) → metadata map for a folder, listing it once.
+
+        Args:
+            parent_id: Drive folder ID
+
+        Returns:
+            Folder contents keyed by (name, mimeType)
+        """
+        with self._lock:
+            if parent_id in self._folders:
+                return self._folders[parent_id]
+            listing_lock = self._listing_locks.setdefault(parent_id, threading.Lock())
+
+        # Only one thread lists a given folder; others wait for its result
+        with listing_lock:
+            with self._lock:
+                if parent_id in self._folders:
+                    return self._folders[parent_id]
+
+            entries = self._list_folder(parent_id)
+
+            with self._lock:
+                self._folders[parent_id] = entries
+            return entries
+
+    def find(self, parent_id: str, name: str, mime_type: str) -> Optional[dict]:
+        """
+        Look up an existing file or folder by name and MIME type.
+
+        Args:
+            parent_id: Drive folder ID
+            name: File name
+            mime_type: Drive MIME type
+
+        Returns:
+            File metadata dict or None if not found
+        """
+        entries = self.folder(parent_id)
+        with self._lock:
+            return entries.get((name, mime_type))
+
+    def add(self, parent_id: str, item: dict):
+        """
+        Record a newly created file so later lookups find it without listing.
+
+        Args:
+            parent_id: Drive folder ID
+            item: File metadata with at least id, name and mimeType
+        """
+        with self._lock:
+            entries = self._folders.get(parent_id)
+            if entries is not None:
+                entries.setdefault((item['name'], item['mimeType']), item)
+
+    def remove(self, parent_id: str, name: str, mime_type: str):
+        """
+        Forget a file (e.g. after it was found to be deleted remotely).
+
+        Args:
+            parent_id: Drive folder ID
+            name: File name
+            mime_type: Drive MIME type
+        """
+        with self._lock:
+            entries = self._folders.get(parent_id)
+            if entries is not None:
+                entries.pop((name, mime_type), None)
+
+    def mark_empty(self, parent_id: str):
+        """
+        Register a folder that was just created, so it is never listed.
+
+        Args:
+            parent_id: ID of the new (empty) folder
+        """
+        with self._lock:
+            self._folders.setdefault(parent_id, {})
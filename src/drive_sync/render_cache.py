@@ -0,0 +1,237 @@
+"""
+Content-addressed on-disk cache for rendered Mermaid diagrams.
+
+Rendered images are stored under a key derived from the diagram code and
+every option that affects the output (format, theme, background and
+renderer), together with the Drive ID of the uploaded copy. Unchanged
+diagrams can then be re-embedded without rendering or uploading again.
+
+Layout:
+    <cache_dir>/index.json       key → {file, size, last_used, drive_id, folder_id}
+    <cache_dir>/<key>.<format>   rendered bytes
+
+The cache is bounded by total size; least recently used entries are
+evicted first.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bump when rendering changes in a way that should invalidate cached images
+RENDERER_VERSION = '1'
+
+DEFAULT_CACHE_DIR = 'cache/diagrams'
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered diagrams and their Drive copies"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize render cache.
+
+        Args:
+            cache_dir: Directory holding index.json and rendered images
+            max_bytes: Maximum total size of stored images (LRU eviction)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(cache_dir, 'index.json')
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def make_key(
+        diagram_code: str,
+        format: str = 'png',
+        theme: str = 'default',
+        background_color: str = 'white',
+        renderer: str = 'local'
+    ) -> str:
+        """
+        Build the cache key for a diagram and its render options.
+
+        Args:
+            diagram_code: Mermaid diagram syntax
+            format: Output format (png, svg, pdf)
+            theme: Mermaid theme
+            background_color: Background color
+            renderer: Rendering backend (local, api, ...)
+
+        Returns:
+            Hex digest identifying the rendered output
+        """
+        parts = [RENDERER_VERSION, renderer, format, theme, background_color, diagram_code]
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def load(self):
+        """Load the index from disk, dropping entries whose image is missing"""
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, 'r') as f:
+                entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load render cache index: {e}")
+            return
+
+        with self._lock:
+            self.entries = {
+                key: entry for key, entry in entries.items()
+                if os.path.exists(os.path.join(self.cache_dir, entry['file']))
+            }
+        logger.info(f"Loaded render cache with {len(self.entries)} diagrams")
+
+    def save(self):
+        """Write the index to disk if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{self.index_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_file, self.index_file)
+            self._dirty = False
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached render and mark it as recently used.
+
+        Recency is only updated in memory; it reaches the index with the
+        next put or eviction, so lookups never force a rewrite.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Copy of the entry (file, size, drive_id, folder_id) or None
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry['last_used'] = time.time()
+            return dict(entry)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Read a cached rendered image.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Image bytes or None if not cached
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, entry['file']), 'rb') as f:
+                return f.read()
+        except OSError:
+            self.invalidate(key)
+            return None
+
+    def put(self, key: str, data: bytes, format: str = 'png'):
+        """
+        Store a rendered image, evicting old entries to stay within max_bytes.
+
+        Args:
+            key: Cache key from make_key
+            data: Rendered image bytes
+            format: File extension for the stored image
+        """
+        filename = f"{key}.{format}"
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, filename), 'wb') as f:
+            f.write(data)
+
+        with self._lock:
+            self.entries[key] = {
+                'file': filename,
+                'size': len(data),
+                'last_used': time.time(),
+                'drive_id': None,
+                'folder_id': None,
+            }
+            self._dirty = True
+            self._evict()
+
+    def set_drive_id(self, key: str, drive_id: str, folder_id: str):
+        """
+        Record the Drive copy of a cached render.
+
+        Args:
+            key: Cache key from make_key
+            drive_id: Drive file ID of the uploaded image
+            folder_id: Document folder the image was uploaded for
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry['drive_id'] = drive_id
+                entry['folder_id'] = folder_id
+                self._dirty = True
+
+    def invalidate_drive_id(self, key: str):
+        """
+        Forget the Drive copy (e.g. it was deleted and could not be embedded).
+
+        The rendered bytes are kept, so the next sync uploads without rendering.
+
+        Args:
+            key: Cache key from make_key
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.get('drive_id'):
+                entry['drive_id'] = None
+                entry['folder_id'] = None
+                self._dirty = True
+
+    def invalidate(self, key: str):
+        """
+        Remove an entry and its image file.
+
+        Args:
+            key: Cache key from make_key
+        """
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self._dirty = True
+                self._remove_file(entry)
+
+    def _remove_file(self, entry: dict):
+        try:
+            os.unlink(os.path.join(self.cache_dir, entry['file']))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes (lock must be held)"""
+        total = sum(entry['size'] for entry in self.entries.values())
+        if total <= self.max_bytes:
+            return
+
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            entry = self.entries.pop(key)
+            total -= entry['size']
+            self._remove_file(entry)
+            logger.info(f"Evicted cached diagram {key[:12]} ({entry['size']} bytes)")
@@ -6,27 +6,56 @@ Enhanced workflow:
 2. Extract local image references from markdown
 3. Upload markdown to Google Docs (with [DIAGRAM:name] and [IMAGE:name] markers)
 4. Render Mermaid diagrams as PNG images via mermaid.ink API
-5. Upload local images to Google Drive
+5. Upload local images to Google Drive (once per distinct image content)
 6. Embed images at marker positions in Google Docs
 """
 
 import os
+import copy
 import time
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, List, Dict
-from googleapiclient.http import MediaFileUpload
+from typing import Optional, Iterable, List, Dict, Set, Tuple, Union
+from googleapiclient.http import MediaFileUpload, MediaInMemoryUpload
 from googleapiclient.errors import HttpError
 
 from .auth import GoogleAuthenticator
 from .converter import FileTypeDetector, MarkdownConverter, CSVConverter, PDFConverter
-from .cache import SyncCache
+from .cache import DEFAULT_HASH_ALGORITHM, SyncCache
 from .mermaid_api import render_mermaid_diagram, get_mermaid_url, MermaidAPIError, MermaidCLIError
-from .gdocs import GoogleDocsService
-from .gdrive import GoogleDriveService
+from .gdocs import GoogleDocsService, GoogleDocsError
+from .gsheets import (
+    DEFAULT_CHUNK_ROWS, INCREMENTAL_MAX_CHANGED, ROWS_PER_TAB, SHEETS_CELL_LIMIT, GoogleSheetsService, GoogleSheetsError,
+    SheetSnapshots, changed_ranges, hash_csv_rows, iter_csv_chunks, read_row_ranges
+)
+from .gdrive import DEFAULT_UPLOAD_CHUNK_SIZE, GoogleDriveService, GoogleDriveError, check_chunk_size
+from .executor import BatchExecutor, execute_with_retry
+from .ratelimit import RateLimiter, IntervalRateLimiter, TokenBucketRateLimiter
+from .remote_index import RemoteFolderIndex
+from .planner import plan_changes
+from .walker import PathMatcher, TreeScan, scan_tree
+from .git_scan import GitScan, GitScanError, scan_git_changes
+from .render_cache import DEFAULT_MAX_BYTES as DEFAULT_RENDER_CACHE_MAX_BYTES, RenderCache
 
 logger = logging.getLogger(__name__)
 
+# CSVs larger than this are streamed through the Sheets API instead of converted by Drive
+DEFAULT_SHEETS_STREAM_THRESHOLD = 20 * 1024 * 1024
+
+# Rows written per Sheets API call when streaming a CSV or applying row updates
+DEFAULT_SHEETS_CHUNK_ROWS = DEFAULT_CHUNK_ROWS
+
+# Parent folders of one depth listed concurrently by create_folder_structure
+FOLDER_LISTING_WORKERS = 8
+
+
+def _is_not_found(error: Exception) -> bool:
+    """Whether an API error (or the HttpError it wraps) is a 404"""
+    cause = error if isinstance(error, HttpError) else error.__cause__
+    return isinstance(cause, HttpError) and cause.resp.status == 404
+
 
 class GoogleDriveSync:
     """Main sync class for uploading files to Google Drive with Mermaid support"""
@@ -36,9 +65,24 @@ class GoogleDriveSync:
         credentials_file='credentials.json',
         folder_id: Optional[str] = None,
         use_cache: bool = True,
-        rate_limit_delay: float = 0.5,
+        rate_limit_delay: Optional[float] = None,
         batch_size: int = 10,
-        enable_mermaid: bool = True
+        enable_mermaid: bool = True,
+        workers: int = 1,
+        rate_limiter: Optional[RateLimiter] = None,
+        render_cache: Optional[RenderCache] = None,
+        render_workers: int = 4,
+        paranoid: bool = False,
+        cache_backend: str = 'json',
+        cache_flush_interval: float = 2.0,
+        hash_algorithm: str = DEFAULT_HASH_ALGORITHM,
+        hash_workers: int = 4,
+        upload_chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        incremental_sheets: bool = True,
+        sheets_stream_threshold: int = DEFAULT_SHEETS_STREAM_THRESHOLD,
+        sheets_chunk_rows: int = DEFAULT_SHEETS_CHUNK_ROWS,
+        scan_mode: str = 'walk',
+        render_cache_max_bytes: int = DEFAULT_RENDER_CACHE_MAX_BYTES
     ):
         """
         Initialize Google Drive sync with Mermaid support.
@@ -47,89 +91,138 @@ class GoogleDriveSync:
             credentials_file: Path to service account JSON
             folder_id: Optional Google Drive folder ID to sync to
             use_cache: Whether to use caching system (default: True)
-            rate_limit_delay: Delay in seconds between API calls (default: 0.5)
+            rate_limit_delay: Fixed delay in seconds between API calls; when set, replaces
+                              the default per-API token buckets (legacy behavior)
             batch_size: Number of files to sync before saving cache (default: 10)
             enable_mermaid: Whether to process Mermaid diagrams (default: True)
+            workers: Number of files to sync concurrently in sync_directory (default: 1)
+            rate_limiter: Custom limiter shared by all API calls (overrides rate_limit_delay)
+            render_cache: Cache of rendered diagrams (default: cache/diagrams when
+                          caching and Mermaid are enabled)
+            render_workers: Diagrams rendered concurrently while documents upload (default: 4)
+            paranoid: Rehash every file instead of trusting unchanged size/mtime (default: False)
+            cache_backend: Sync cache storage, 'json' or 'sqlite' (default: 'json')
+            cache_flush_interval: Seconds a changed cache entry may wait for the background
+                                  flusher; 0 saves synchronously every batch (default: 2)
+            hash_algorithm: Content hash for new cache entries (default: xxh3_128 when
+                            xxhash is installed, otherwise sha256)
+            hash_workers: Threads hashing changed files before sync_directory uploads
+                          them, capped at the CPU count; 1 hashes inline (default: 4)
+            upload_chunk_size: Bytes per resumable upload chunk, a multiple of 256 KiB;
+                               files and images are streamed from disk in chunks of
+                               this size (default: 8 MiB)
+            incremental_sheets: Write only the changed rows of a CSV into its existing
+                                Google Sheet instead of uploading the whole file
+                                (requires use_cache; default: True)
+            sheets_stream_threshold: CSVs larger than this many bytes are streamed into
+                                     Google Sheets in chunks of rows instead of converted
+                                     by Drive; 0 disables streaming (default: 20 MiB)
+            sheets_chunk_rows: Rows written per Sheets API call when streaming or applying
+                               incremental row updates (default: 10000)
+            scan_mode: How sync_directory finds files: 'walk' checks every file in the
+                       tree, 'git' only files git reports as changed since the last
+                       synced commit, honouring .gitignore (default: 'walk')
+            render_cache_max_bytes: Size limit of the default render cache; least recently
+                                    used diagrams are evicted beyond it (default: 200 MiB)
         """
         self.auth = GoogleAuthenticator(credentials_file)
         self.service = self.auth.authenticate()
         self.folder_id = folder_id or os.getenv('GOOGLE_DRIVE_FOLDER_ID')
         self.use_cache = use_cache
         # Pass folder_id to cache for project-specific cache files
-        self.cache = SyncCache(folder_id=self.folder_id) if use_cache else None
+        self.cache = SyncCache(
+            folder_id=self.folder_id, paranoid=paranoid, backend=cache_backend,
+            flush_interval=cache_flush_interval, hash_algorithm=hash_algorithm
+        ) if use_cache else None
         self.rate_limit_delay = rate_limit_delay
         self.batch_size = batch_size
-        self.api_call_count = 0
-        self.last_api_call = 0
         self.enable_mermaid = enable_mermaid
+        self.workers = max(1, workers)
+        self.hash_workers = max(1, min(hash_workers, os.cpu_count() or 1))
+        self.upload_chunk_size = check_chunk_size(upload_chunk_size)
+
+        # One limiter shared by all workers and services so N threads never exceed the quota
+        if rate_limiter is not None:
+            self.rate_limiter = rate_limiter
+        elif rate_limit_delay is not None:
+            self.rate_limiter = IntervalRateLimiter(rate_limit_delay)
+        else:
+            self.rate_limiter = TokenBucketRateLimiter()
+        # Serializes folder lookup/creation so concurrent workers don't create duplicates
+        self._folder_lock = threading.Lock()
+        # Cached folder IDs found stale (404) this run → their re-resolved IDs
+        self._replaced_folders: Dict[str, str] = {}
+        # Folder IDs seen in a non-trashed parent listing (or created) this run
+        self._verified_folders: Set[str] = set()
+        # Each target folder is listed once per run; existence checks are lookups
+        self.remote_index = RemoteFolderIndex(self.service, self._execute_with_retry)
 
         # Initialize enhanced services for Mermaid support
         self.gdocs_service = None
         self.gdrive_service = None
         if enable_mermaid:
-            self.gdocs_service = GoogleDocsService(credentials_file)
-            self.gdrive_service = GoogleDriveService(credentials_file)
+            self.gdocs_service = GoogleDocsService(credentials_file, self.rate_limiter)
+            self.gdrive_service = GoogleDriveService(credentials_file, self.rate_limiter, upload_chunk_size)
+
+        # Diagrams render in the background while their document uploads
+        self._render_executor = None
+        if enable_mermaid:
+            self._render_executor = ThreadPoolExecutor(
+                max_workers=max(1, render_workers), thread_name_prefix='render'
+            )
+
+        # Row snapshots of CSV-backed sheets; the Sheets service is created on first use
+        self.credentials_file = credentials_file
+        self.gsheets_service = None
+        self.sheet_snapshots = SheetSnapshots() if use_cache and incremental_sheets else None
+        self.sheets_stream_threshold = sheets_stream_threshold
+        self.sheets_chunk_rows = max(1, sheets_chunk_rows)
+        if scan_mode not in ('walk', 'git'):
+            raise ValueError(f"Unknown scan mode: {scan_mode} (expected 'walk' or 'git')")
+        self.scan_mode = scan_mode
+
+        # Rendered diagrams and their Drive copies survive across runs
+        self.render_cache = render_cache
+        if self.render_cache is None and enable_mermaid and use_cache:
+            self.render_cache = RenderCache(max_bytes=render_cache_max_bytes)
 
         if self.use_cache:
             self.cache.load()
 
         logger.info(
             f"Initialized GoogleDriveSync "
-            f"(mermaid={'enabled' if enable_mermaid else 'disabled'})"
+            f"(mermaid={'enabled' if enable_mermaid else 'disabled'}, workers={self.workers})"
         )
 
-    def _rate_limit(self):
-        """Apply rate limiting between API calls"""
-        if self.rate_limit_delay > 0:
-            elapsed = time.time() - self.last_api_call
-            if elapsed < self.rate_limit_delay:
-                time.sleep(self.rate_limit_delay - elapsed)
-        self.last_api_call = time.time()
-        self.api_call_count += 1
-
-    def _execute_with_retry(self, request, max_retries: int = 5):
-        """Execute Google Drive API request with exponential backoff retry logic"""
-        for attempt in range(max_retries):
-            try:
-                self._rate_limit()
-                return request.execute()
-            except HttpError as error:
-                if error.resp.status == 429:  # Rate limit
-                    wait_time = (2 ** attempt) + (time.time() % 1)
-                    logger.warning(f"Rate limit hit, waiting {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
-                    if attempt == max_retries - 1:
-                        raise
-                elif error.resp.status >= 500:  # Server error
-                    wait_time = (2 ** attempt)
-                    logger.warning(f"Server error, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
-                    if attempt == max_retries - 1:
-                        raise
-                else:
-                    raise
-        raise Exception("Unexpected error in retry logic")
+    @property
+    def api_call_count(self) -> int:
+        """Number of rate-limited API calls made so far (across all workers)"""
+        return self.rate_limiter.call_count
+
+    def _execute_with_retry(self, request, max_retries: int = 5, api: str = 'drive'):
+        """Execute Google API request through the shared rate limiter with exponential backoff"""
+        return execute_with_retry(request, self.rate_limiter, api=api, max_retries=max_retries)
 
     def get_or_create_folder(self, name: str, parent_id: Optional[str] = None) -> str:
         """Get existing folder or create if it doesn't exist"""
         parent_id = parent_id or self.folder_id or 'root'
 
-        try:
-            # Search for existing folder
-            query = f"name='{name}' and mimeType='application/vnd.google-apps.folder' and '{parent_id}' in parents and trashed=false"
-            request = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name)',
-                supportsAllDrives=True,
-                includeItemsFromAllDrives=True
-            )
-            results = self._execute_with_retry(request)
-            files = results.get('files', [])
+        with self._folder_lock:
+            return self._get_or_create_folder(name, parent_id)
+
+    def _get_or_create_folder(self, name: str, parent_id: str) -> str:
+        """Folder lookup/creation; callers must hold _folder_lock"""
+        cached_id = self._cached_folder(name, parent_id)
+        if cached_id:
+            return cached_id
 
-            if files:
+        try:
+            # Look up existing folder in the parent's listing
+            existing = self.remote_index.find(parent_id, name, 'application/vnd.google-apps.folder')
+            if existing:
                 logger.info(f"📁 Found existing folder: {name}")
-                return files[0]['id']
+                self._remember_folder(name, parent_id, existing['id'])
+                return existing['id']
 
             # Create new folder
             folder_metadata = {
@@ -141,15 +234,201 @@ class GoogleDriveSync:
 
             request = self.service.files().create(
                 body=folder_metadata,
-                fields='id',
+                fields='id, name, mimeType',
                 supportsAllDrives=True
             )
             folder = self._execute_with_retry(request)
+            self.remote_index.add(parent_id, folder)
+            self.remote_index.mark_empty(folder['id'])
+            self._remember_folder(name, parent_id, folder['id'])
             logger.info(f"📁 Created folder: {name}")
             return folder['id']
 
         except HttpError as error:
-            raise Exception(f"Error with folder '{name}': {error}")
+            raise Exception(f"Error with folder '{name}': {error}") from error
+
+    def _cached_folder(self, name: str, parent_id: str) -> Optional[str]:
+        """
+        Folder ID recorded in the sync cache by an earlier run; callers must hold _folder_lock.
+
+        Drive still accepts uploads into a trashed folder, so the first use
+        of a cached ID in a run checks it against the parent's (non-trashed)
+        listing. A folder missing from it is re-resolved like one that 404s.
+        """
+        if not self.use_cache:
+            return None
+        cached_id = self.cache.get_meta('folders', f"{parent_id}/{name}")
+        if not cached_id or cached_id in self._verified_folders:
+            return cached_id
+
+        listed = self.remote_index.find(parent_id, name, 'application/vnd.google-apps.folder')
+        if listed is not None and listed['id'] == cached_id:
+            self._verified_folders.add(cached_id)
+            return cached_id
+        logger.info(f"📁 Cached folder '{name}' is no longer in its parent (trashed or moved)")
+        return self._resolve_stale_folder(cached_id)
+
+    def _cached_folder_unverified(self, name: str, parent_id: str) -> bool:
+        """Whether _cached_folder needs the parent listing (no cached ID, or not yet checked)"""
+        if not self.use_cache:
+            return True
+        return self.cache.get_meta('folders', f"{parent_id}/{name}") not in self._verified_folders
+
+    def _remember_folder(self, name: str, parent_id: str, folder_id: str):
+        """Record a folder ID so later runs skip resolving it"""
+        self._verified_folders.add(folder_id)
+        if self.use_cache:
+            self.cache.set_meta('folders', f"{parent_id}/{name}", folder_id)
+
+    def _replace_stale_folder(self, folder_id: str) -> Optional[str]:
+        """
+        Re-resolve a cached folder whose ID turned out not to exist (404 or trashed).
+
+        The stale cache entry is dropped and the folder looked up (or
+        created) again by name; folders cached inside it are re-keyed under
+        the replacement so they are re-resolved there if they 404 too.
+        Every caller that hit the same stale ID gets the same replacement.
+
+        Args:
+            folder_id: Folder ID that returned 404
+
+        Returns:
+            Replacement folder ID, or None if folder_id did not come from the cache
+        """
+        with self._folder_lock:
+            return self._resolve_stale_folder(folder_id)
+
+    def _resolve_stale_folder(self, folder_id: str) -> Optional[str]:
+        """_replace_stale_folder; callers must hold _folder_lock"""
+        if folder_id in self._replaced_folders:
+            return self._replaced_folders[folder_id]
+
+        keys = self.cache.find_meta('folders', folder_id) if self.use_cache else []
+        if not keys:
+            return None
+        for key in keys:
+            self.cache.delete_meta('folders', key)
+
+        parent_id, name = keys[0].split('/', 1)
+        parent_id = self._replaced_folders.get(parent_id, parent_id)
+        logger.info(f"📁 Cached folder '{name}' no longer exists - resolving it again")
+        self.remote_index.remove(parent_id, name, 'application/vnd.google-apps.folder')
+        try:
+            replacement = self._get_or_create_folder(name, parent_id)
+        except Exception as error:
+            # The parent is gone as well
+            parent_replacement = self._resolve_stale_folder(parent_id) if _is_not_found(error) else None
+            if parent_replacement is None:
+                raise
+            replacement = self._get_or_create_folder(name, parent_replacement)
+
+        self._replaced_folders[folder_id] = replacement
+        for key in self.cache.meta_keys('folders'):
+            if key.startswith(f"{folder_id}/"):
+                child_id = self.cache.get_meta('folders', key)
+                self.cache.delete_meta('folders', key)
+                self.cache.set_meta('folders', f"{replacement}/{key.split('/', 1)[1]}", child_id)
+        return replacement
+
+    def _find_existing(self, name: str, mime_type: str, folder_id: str) -> Optional[str]:
+        """
+        Find an existing file by name and MIME type in a Drive folder.
+
+        Args:
+            name: File name in Drive
+            mime_type: Drive MIME type
+            folder_id: Parent folder ID
+
+        Returns:
+            Drive file ID or None if not found
+        """
+        existing = self.remote_index.find(folder_id, name, mime_type)
+        return existing['id'] if existing else None
+
+    def _upload_file(
+        self,
+        local_file: Path,
+        file_metadata: dict,
+        media,
+        folder_id: str,
+        mime_type: str,
+        fields: str = 'id',
+        retry_stale_folder: bool = True
+    ) -> Tuple[dict, bool]:
+        """
+        Update the Drive copy of a local file, or create it if none exists.
+
+        The Drive ID recorded in the sync cache is trusted first and updated
+        directly; only when it no longer exists (404) or is in the trash does
+        this fall back to a name lookup in the target folder, which only sees
+        non-trashed files. A cached target folder that no longer exists is
+        resolved again and the upload retried once.
+
+        Args:
+            local_file: Local source file (cache key)
+            file_metadata: Metadata for a new file (name, description, ...)
+            media: Media body to upload
+            folder_id: Target Drive folder ID
+            mime_type: Drive MIME type of the uploaded file
+            fields: Fields to return from the API
+            retry_stale_folder: Re-resolve folder_id on 404 (False for the retry itself)
+
+        Returns:
+            Tuple of (file resource, created: bool)
+        """
+        cached_id = self.cache.get_drive_id(local_file) if self.use_cache else None
+        if cached_id:
+            try:
+                request = self.service.files().update(
+                    fileId=cached_id,
+                    media_body=media,
+                    fields=f"{fields},trashed",
+                    supportsAllDrives=True
+                )
+                updated = self._execute_with_retry(request)
+            except HttpError as error:
+                if error.resp.status != 404:
+                    raise
+                logger.info(f"   Cached Drive file {cached_id} not found - looking up by name")
+            else:
+                # Drive updates trashed files without complaint; treat them as gone
+                if not updated.pop('trashed', False):
+                    return updated, False
+                logger.info(f"   Cached Drive file {cached_id} is in the trash - looking up by name")
+
+        existing_id = self._find_existing(file_metadata['name'], mime_type, folder_id)
+        if existing_id:
+            request = self.service.files().update(
+                fileId=existing_id,
+                media_body=media,
+                fields=fields,
+                supportsAllDrives=True
+            )
+            return self._execute_with_retry(request), False
+
+        file_metadata['mimeType'] = mime_type
+        file_metadata['parents'] = [folder_id]
+        request = self.service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields=fields,
+            supportsAllDrives=True
+        )
+        try:
+            created = self._execute_with_retry(request)
+        except HttpError as error:
+            replacement = self._replace_stale_folder(folder_id) \
+                if retry_stale_folder and _is_not_found(error) else None
+            if replacement is None:
+                raise
+            return self._upload_file(
+                local_file, file_metadata, media, replacement, mime_type, fields,
+                retry_stale_folder=False
+            )
+        self.remote_index.add(folder_id, {
+            'id': created['id'], 'name': file_metadata['name'], 'mimeType': mime_type
+        })
+        return created, True
 
     def markdown_to_doc_with_diagrams(
         self,
@@ -202,205 +481,343 @@ class GoogleDriveSync:
 
         if custom_name:
             file_metadata['name'] = custom_name
-
-        file_name = file_metadata['name']
-        temp_file = file_metadata.get('temp_file')
+        content = file_metadata.pop('content', None)
+        temp_file = file_metadata.pop('temp_file', None)
         diagrams = file_metadata.get('diagrams', [])
         images = file_metadata.get('images', [])
 
-        try:
-            # Check if document already exists
-            query = f"name='{file_name}' and mimeType='application/vnd.google-apps.document' and '{folder_id}' in parents and trashed=false"
-            request = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name)',
-                supportsAllDrives=True,
-                includeItemsFromAllDrives=True
-            )
-            results = self._execute_with_retry(request)
-            files = results.get('files', [])
-
-            # Upload markdown to Google Docs
-            upload_file = temp_file if temp_file else str(md_file)
-            media = MediaFileUpload(upload_file, mimetype='text/markdown', resumable=True)
+        # Start rendering diagrams now so it overlaps the document upload
+        renders = {}
+        if self.enable_mermaid and diagrams and self.gdocs_service and self.gdrive_service:
+            renders = self._start_diagram_renders(diagrams, folder_id)
 
-            if files:
-                # Update existing document
-                request = self.service.files().update(
-                    fileId=files[0]['id'],
-                    media_body=media,
-                    supportsAllDrives=True
+        try:
+            # Upload markdown to Google Docs (update in place when it already exists)
+            if content is not None:
+                media = MediaInMemoryUpload(
+                    content, mimetype='text/markdown', chunksize=self.upload_chunk_size, resumable=True
                 )
-                doc = self._execute_with_retry(request)
-                logger.info(f"🔄 Updated: {md_file} → Google Doc")
-                doc_id = doc['id']
             else:
-                # Create new document
-                file_metadata['mimeType'] = 'application/vnd.google-apps.document'
-                file_metadata['parents'] = [folder_id]
-
-                request = self.service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id',
-                    supportsAllDrives=True
+                media = MediaFileUpload(
+                    temp_file or str(md_file), mimetype='text/markdown',
+                    chunksize=self.upload_chunk_size, resumable=True
                 )
-                doc = self._execute_with_retry(request)
+
+            doc, created = self._upload_file(
+                md_file, file_metadata, media, folder_id, 'application/vnd.google-apps.document'
+            )
+            doc_id = doc['id']
+            if created:
                 logger.info(f"✅ Created: {md_file} → Google Doc")
-                doc_id = doc['id']
+            else:
+                logger.info(f"🔄 Updated: {md_file} → Google Doc")
+
+            embeds = []
 
             # Process Mermaid diagrams if any
             if self.enable_mermaid and diagrams and self.gdocs_service and self.gdrive_service:
                 logger.info(f"🎨 Processing {len(diagrams)} Mermaid diagrams...")
-                self._process_mermaid_diagrams(doc_id, diagrams, folder_id)
+                embeds.extend(self._process_mermaid_diagrams(doc_id, diagrams, folder_id, renders))
 
             # Process local images if any
             if enable_images and images and self.gdocs_service and self.gdrive_service:
                 logger.info(f"🖼️  Processing {len(images)} local images...")
-                self._process_local_images(doc_id, images, folder_id)
+                embeds.extend(self._process_local_images(doc_id, images, folder_id))
 
-            # Process anchor links if enabled
+            # Embed images and convert anchor links in a single document update
             enable_anchor_links = os.getenv('ENABLE_ANCHOR_LINKS', 'true').lower() == 'true'
-            if enable_anchor_links and self.gdocs_service:
-                try:
-                    converted_count = self.gdocs_service.process_anchor_links(doc_id)
-                    if converted_count > 0:
-                        logger.info(f"🔗 Converted {converted_count} anchor links")
-                except Exception as e:
-                    # Don't fail entire sync if anchor conversion fails
-                    logger.warning(f"⚠️  Failed to convert anchor links: {e}")
+            if self.gdocs_service and (embeds or enable_anchor_links):
+                self._embed_images(doc_id, embeds, enable_anchor_links)
 
             # Update cache
             if self.use_cache:
                 self.cache.update(md_file, doc_id)
 
-            # Clean up temp file
-            if temp_file and os.path.exists(temp_file):
-                os.unlink(temp_file)
-
             return doc_id
 
         except Exception as error:
-            # Clean up temp file on error
+            # Drop renders that have not started yet
+            for future in renders.values():
+                future.cancel()
+            raise Exception(f"Error syncing {md_file}: {error}")
+
+        finally:
+            # Clean up the spooled copy of very large documents
             if temp_file and os.path.exists(temp_file):
                 os.unlink(temp_file)
-            raise Exception(f"Error syncing {md_file}: {error}")
 
-    def _process_mermaid_diagrams(self, doc_id: str, diagrams: List[Dict], folder_id: str):
+    @staticmethod
+    def _diagram_url(diagram_code: str, render_mode: str) -> Tuple[bool, str]:
+        """
+        Decide whether a diagram is uploaded to Drive or embedded by URL.
+
+        Local mode: ALWAYS render locally and upload to Drive (most reliable)
+        API mode: Use direct URL when under the 2KB limit for Google Docs
+
+        Returns:
+            Tuple of (use Drive upload, mermaid.ink URL or '' in local mode)
+        """
+        if render_mode == 'local':
+            return True, ''
+        mermaid_url = get_mermaid_url(
+            diagram_code,
+            format='png',
+            theme='default',
+            background_color='white'
+        )
+        return len(mermaid_url) > 2000, mermaid_url
+
+    def _start_diagram_renders(self, diagrams: List[Dict], folder_id: str) -> Dict[str, Future]:
+        """
+        Start rendering diagrams in the background, before the document upload.
+
+        Only diagrams that will be uploaded to Drive and have no usable cached
+        render are submitted; _process_mermaid_diagrams consumes the results.
+
+        Args:
+            diagrams: List of diagram dicts with 'name', 'code', 'hash'
+            folder_id: Document folder ID
+
+        Returns:
+            Map of diagram name → Future resolving to PNG bytes
         """
-        Process Mermaid diagrams: render and embed in document.
+        render_mode = os.environ.get('MERMAID_RENDER_MODE', 'local').lower()
+        renders = {}
+
+        for diagram in diagrams:
+            if diagram['name'] in renders:
+                continue
+            use_drive_upload, _ = self._diagram_url(diagram['code'], render_mode)
+            if not use_drive_upload:
+                continue
+            if self.render_cache is not None:
+                # Cached renders are reused or re-uploaded without rendering
+                cache_key = self.render_cache.make_key(diagram['code'], format='png', renderer=render_mode)
+                if self.render_cache.get(cache_key) is not None:
+                    continue
+            renders[diagram['name']] = self._render_executor.submit(
+                render_mermaid_diagram, diagram['code'], format='png'
+            )
+
+        if renders:
+            logger.info(f"🎨 Rendering {len(renders)} diagrams in the background...")
+        return renders
+
+    def _process_mermaid_diagrams(
+        self,
+        doc_id: str,
+        diagrams: List[Dict],
+        folder_id: str,
+        renders: Optional[Dict[str, Future]] = None
+    ):
+        """
+        Process Mermaid diagrams: render and upload images for embedding.
 
         Rendering strategy based on MERMAID_RENDER_MODE:
         - "local": Always render locally, upload to Drive, embed via Drive URL (most reliable)
         - "api": Use direct mermaid.ink URL when possible (original behavior, less reliable)
         - "hybrid": Try local first, fall back to API
 
+        Diagrams with a background render (from _start_diagram_renders) are
+        uploaded as their renders finish; the rest are rendered inline. All
+        permissions are then set in one batched request. Embedding is left to
+        _embed_images.
+
         Args:
             doc_id: Google Doc ID
             diagrams: List of diagram dicts with 'name', 'code', 'hash'
             folder_id: Folder ID for storing diagram images
+            renders: Background renders by diagram name (optional)
+
+        Returns:
+            List of embed dicts for GoogleDocsService.embed_images
         """
-        # Create subfolder for diagram images (only if needed)
-        diagrams_folder_id = None
         render_mode = os.environ.get('MERMAID_RENDER_MODE', 'local').lower()
+        renders = renders or {}
+        permissions = self.gdrive_service.new_batch()
+        embeds = []
+        pending: Dict[Future, List[Dict]] = {}
 
         for diagram in diagrams:
+            diagram_name = diagram['name']
             try:
-                diagram_name = diagram['name']
-                diagram_code = diagram['code']
-
                 logger.info(f"  Processing {diagram_name}...")
 
-                # Determine if we should use local rendering (upload to Drive)
-                # Local mode: ALWAYS render locally and upload to Drive (most reliable)
-                # API mode: Use direct URL when under 2KB limit
-                use_drive_upload = (render_mode == 'local')
-
+                use_drive_upload, mermaid_url = self._diagram_url(diagram['code'], render_mode)
                 if not use_drive_upload:
-                    # Check if URL would be too long for Google Docs (2KB limit)
-                    mermaid_url = get_mermaid_url(
-                        diagram_code,
-                        format='png',
-                        theme='default',
-                        background_color='white'
-                    )
-                    if len(mermaid_url) > 2000:
-                        use_drive_upload = True
-                        logger.info(f"  URL too long ({len(mermaid_url)} bytes) - using Drive upload")
-                    else:
-                        logger.info(f"  Using direct Mermaid.ink URL ({len(mermaid_url)} bytes)")
-                        image_url = mermaid_url
-
-                if use_drive_upload:
-                    # Render locally and upload to Google Drive
-                    logger.info(f"  Rendering locally and uploading to Drive...")
-
-                    # Create diagrams folder if needed
-                    if not diagrams_folder_id:
-                        diagrams_folder_id = self.get_or_create_folder("Diagram Images", folder_id)
-
-                    # Render using configured backend (local CLI or API)
-                    png_bytes = render_mermaid_diagram(diagram_code, format='png')
-
-                    # Upload to Drive
-                    file_metadata = self.gdrive_service.upload_image_bytes(
-                        image_bytes=png_bytes,
-                        filename=f"{diagram_name}.png",
-                        folder_id=diagrams_folder_id,
-                        mime_type='image/png'
-                    )
-
-                    # Make the file publicly readable so Google Docs can embed it
-                    try:
-                        self.gdrive_service.set_public_permissions(file_metadata['id'])
-                        logger.info(f"  Set public read permissions")
-                    except Exception as e:
-                        logger.warning(f"  Could not set public permissions: {e}")
-
-                    # Small delay to let Google Drive process the file
-                    time.sleep(0.5)
-
-                    # Use Drive view URL (works better for embedding)
-                    image_url = f"https://drive.google.com/uc?export=view&id={file_metadata['id']}"
-                    logger.info(f"  Uploaded to Drive ({len(png_bytes)} bytes)")
+                    logger.info(f"  Using direct Mermaid.ink URL ({len(mermaid_url)} bytes)")
+                    embeds.append(self._diagram_embed(diagram_name, mermaid_url))
+                    continue
+                if mermaid_url:
+                    logger.info(f"  URL too long ({len(mermaid_url)} bytes) - using Drive upload")
 
-                # Step 2: Find marker in document and embed image
-                markers = self.gdocs_service.find_diagram_markers(doc_id)
-                matching_markers = [m for m in markers if m['name'] == diagram_name]
+                future = renders.get(diagram_name)
+                if future is not None:
+                    # Uploaded below, as soon as its render finishes
+                    pending.setdefault(future, []).append(diagram)
+                    continue
 
-                if matching_markers:
-                    # Use the first matching marker
-                    marker = matching_markers[0]
-                    self.gdocs_service.embed_diagram(
-                        doc_id=doc_id,
-                        diagram_name=diagram_name,
-                        image_url=image_url,
-                        marker_index=marker['index'],
-                        marker_length=marker['length'],
-                        width_pt=500,
-                        height_pt=350
-                    )
-                    logger.info(f"  ✅ Embedded {diagram_name}")
-                else:
-                    logger.warning(f"  ⚠️  Marker not found for {diagram_name}")
+                cache_key, image_url = self._upload_diagram(
+                    diagram_name, diagram['code'], folder_id, render_mode, permissions
+                )
+                embeds.append(self._diagram_embed(diagram_name, image_url, cache_key))
 
             except (MermaidAPIError, MermaidCLIError) as e:
                 logger.error(f"  ❌ Failed to render {diagram_name}: {e}")
             except Exception as e:
                 logger.error(f"  ❌ Failed to process {diagram_name}: {e}")
 
+        for future in as_completed(pending):
+            for diagram in pending[future]:
+                diagram_name = diagram['name']
+                try:
+                    cache_key, image_url = self._upload_diagram(
+                        diagram_name, diagram['code'], folder_id, render_mode, permissions,
+                        png_bytes=future.result()
+                    )
+                    embeds.append(self._diagram_embed(diagram_name, image_url, cache_key))
+
+                except (MermaidAPIError, MermaidCLIError) as e:
+                    logger.error(f"  ❌ Failed to render {diagram_name}: {e}")
+                except Exception as e:
+                    logger.error(f"  ❌ Failed to process {diagram_name}: {e}")
+
+        self._flush_permissions(permissions)
+        return embeds
+
+    @staticmethod
+    def _diagram_embed(diagram_name: str, image_url: str, cache_key: Optional[str] = None) -> Dict:
+        """Build the embed dict for a diagram"""
+        return {
+            'kind': 'DIAGRAM',
+            'name': diagram_name,
+            'image_url': image_url,
+            'width_pt': 500,
+            'height_pt': 350,
+            'cache_key': cache_key
+        }
+
+    def _upload_diagram(
+        self,
+        diagram_name: str,
+        diagram_code: str,
+        folder_id: str,
+        render_mode: str,
+        permissions,
+        png_bytes: Optional[bytes] = None
+    ) -> Tuple[Optional[str], str]:
+        """
+        Render a diagram and upload it to Drive, reusing cached renders.
+
+        A diagram already uploaded for this folder is embedded from its
+        existing Drive file; a cached render is uploaded without re-rendering.
+
+        Args:
+            diagram_name: Diagram marker name
+            diagram_code: Mermaid diagram syntax
+            folder_id: Document folder ID ("Diagram Images" is created inside it)
+            render_mode: MERMAID_RENDER_MODE (part of the cache key)
+            permissions: Batch to queue the public-read permission on
+            png_bytes: Already rendered image (e.g. from a background render)
+
+        Returns:
+            Tuple of (render cache key or None, Drive view URL)
+        """
+        cache_key = None
+        from_cache = False
+        if self.render_cache is not None:
+            cache_key = self.render_cache.make_key(diagram_code, format='png', renderer=render_mode)
+            entry = self.render_cache.get(cache_key)
+            if entry and entry.get('drive_id') and entry.get('folder_id') == folder_id:
+                logger.info(f"  Unchanged - reusing Drive image {entry['drive_id']}")
+                return cache_key, f"https://drive.google.com/uc?export=view&id={entry['drive_id']}"
+            if png_bytes is None:
+                png_bytes = self.render_cache.get_bytes(cache_key)
+                from_cache = png_bytes is not None
+
+        if png_bytes is None:
+            # Render locally and upload to Google Drive
+            logger.info(f"  Rendering locally and uploading to Drive...")
+            # Render using configured backend (local CLI or API)
+            png_bytes = render_mermaid_diagram(diagram_code, format='png')
+        elif from_cache:
+            logger.info(f"  Using cached render, uploading to Drive...")
+
+        if self.render_cache is not None and not from_cache:
+            self.render_cache.put(cache_key, png_bytes, format='png')
+
+        # Upload to Drive
+        file_metadata = self._upload_image(
+            "Diagram Images", folder_id,
+            image_bytes=png_bytes,
+            filename=f"{diagram_name}.png",
+            mime_type='image/png'
+        )
+        if self.render_cache is not None:
+            self.render_cache.set_drive_id(cache_key, file_metadata['id'], folder_id)
+
+        # Make the file publicly readable so Google Docs can embed it
+        self.gdrive_service.queue_public_permissions(
+            permissions, file_metadata['id'],
+            self._permission_callback(diagram_name, "public read permissions")
+        )
+
+        logger.info(f"  Uploaded to Drive ({len(png_bytes)} bytes)")
+        # Use Drive view URL (works better for embedding)
+        return cache_key, f"https://drive.google.com/uc?export=view&id={file_metadata['id']}"
+
+    def _upload_image(self, subfolder: str, folder_id: str, upload=None, **upload_args) -> Dict:
+        """
+        Upload an image into a named subfolder of a document's folder.
+
+        The subfolder is created on first use and its ID cached across runs;
+        if the cached ID no longer exists it is resolved again and the upload
+        retried once.
+
+        Args:
+            subfolder: Subfolder name ("Diagram Images", "Embedded Images")
+            folder_id: Document folder ID
+            upload: GoogleDriveService upload method (default: upload_image_bytes)
+            **upload_args: Arguments for the upload method
+
+        Returns:
+            Uploaded file metadata
+        """
+        upload = upload or self.gdrive_service.upload_image_bytes
+        target_id = self.get_or_create_folder(subfolder, folder_id)
+        try:
+            return upload(folder_id=target_id, **upload_args)
+        except GoogleDriveError as error:
+            replacement = self._replace_stale_folder(target_id) if _is_not_found(error) else None
+            if replacement is None:
+                raise
+            return upload(folder_id=replacement, **upload_args)
+
     def _process_local_images(self, doc_id: str, images: List[Dict], folder_id: str):
         """
-        Process local image files: upload to Drive and embed in document.
+        Process local image files: upload to Drive for embedding.
+
+        Images are streamed from disk, never read whole into memory, and
+        keyed by a SHA-256 of their content. An image already
+        uploaded (by this or any other document, in this or an earlier run)
+        is embedded from the Drive file recorded in the sync cache's image
+        registry; new images are uploaded once and their public-read
+        permissions set in one batched request. Embedding is left to
+        _embed_images.
 
         Args:
             doc_id: Google Doc ID
             images: List of image dicts with 'name', 'path', 'display_name', 'alt'
             folder_id: Folder ID for storing uploaded images
+
+        Returns:
+            List of embed dicts for GoogleDocsService.embed_images
         """
-        # Create subfolder for images (only if needed)
-        images_folder_id = None
+        permissions = self.gdrive_service.new_batch()
+        fallback_permissions = self.gdrive_service.new_batch()
+        # Content key → Drive ID of images handled for this document
+        drive_ids = {}
+        embeds = []
 
         for image in images:
             try:
@@ -414,126 +831,211 @@ class GoogleDriveSync:
                     logger.warning(f"  ⚠️  Image file not found: {image_path}")
                     continue
 
-                # Read image file
-                with open(image_path, 'rb') as f:
-                    image_bytes = f.read()
-
-                # Determine MIME type
-                suffix = image_path.suffix.lower()
-                mime_types = {
-                    '.png': 'image/png',
-                    '.jpg': 'image/jpeg',
-                    '.jpeg': 'image/jpeg',
-                    '.gif': 'image/gif',
-                    '.webp': 'image/webp'
-                }
-                mime_type = mime_types.get(suffix, 'image/png')
-
-                # Create images folder if needed
-                if not images_folder_id:
-                    images_folder_id = self.get_or_create_folder("Embedded Images", folder_id)
-
-                # Upload to Drive
-                file_metadata = self.gdrive_service.upload_image_bytes(
-                    image_bytes=image_bytes,
-                    filename=f"{display_name}{suffix}",
-                    folder_id=images_folder_id,
-                    mime_type=mime_type
+                image_key = SyncCache.get_file_hash(image_path, 'sha256')
+
+                registered = self.cache.get_meta('images', image_key) if self.use_cache else None
+                if image_key in drive_ids:
+                    logger.info(f"  Same image as an earlier reference - reusing it")
+                elif registered:
+                    drive_ids[image_key] = registered['drive_id']
+                    logger.info(f"  Unchanged - reusing Drive image {registered['drive_id']}")
+                else:
+                    drive_ids[image_key] = self._upload_local_image(
+                        image_path, image_key, display_name, folder_id,
+                        permissions, fallback_permissions
+                    )
+
+                # Use Google Drive direct view URL (works better for embedding)
+                image_url = f"https://drive.google.com/uc?export=view&id={drive_ids[image_key]}"
+
+                # Size images at ~40% page width (Google Doc page = 612pt wide)
+                # 280pt width, 16:10 aspect ratio for screenshots
+                embeds.append({
+                    'kind': 'IMAGE',
+                    'name': image_name,
+                    'image_url': image_url,
+                    'width_pt': 280,
+                    'height_pt': 175,
+                    'image_key': image_key
+                })
+
+            except Exception as e:
+                logger.error(f"  ❌ Failed to process {image.get('display_name', image_name)}: {e}")
+
+        self._flush_permissions(permissions)
+        # Service account access for images that could not be made public
+        self._flush_permissions(fallback_permissions)
+        return embeds
+
+    def _upload_local_image(
+        self,
+        image_path: Path,
+        image_key: str,
+        display_name: str,
+        folder_id: str,
+        permissions,
+        fallback_permissions
+    ) -> str:
+        """
+        Upload one image and queue its permissions.
+
+        The image is added to the registry once a read permission has been
+        set: public read, or service account read (works on Shared Drives)
+        if public sharing is refused.
+
+        Returns:
+            Drive file ID
+        """
+        # Determine MIME type
+        suffix = image_path.suffix.lower()
+        mime_types = {
+            '.png': 'image/png',
+            '.jpg': 'image/jpeg',
+            '.jpeg': 'image/jpeg',
+            '.gif': 'image/gif',
+            '.webp': 'image/webp'
+        }
+        mime_type = mime_types.get(suffix, 'image/png')
+
+        # Upload to Drive
+        file_metadata = self._upload_image(
+            "Embedded Images", folder_id,
+            upload=self.gdrive_service.upload_file,
+            file_path=image_path,
+            filename=f"{display_name}{suffix}",
+            mime_type=mime_type
+        )
+        drive_id = file_metadata['id']
+        logger.info(f"  Uploaded to Drive ({image_path.stat().st_size} bytes)")
+
+        def register(response, exception, description):
+            if exception is not None:
+                return False
+            logger.info(f"  Set {description} on {display_name}")
+            if self.use_cache:
+                self.cache.set_meta('images', image_key, {'drive_id': drive_id, 'mime_type': mime_type})
+            return True
+
+        def on_service_account_reader(response, exception):
+            if not register(response, exception, "service account read permission"):
+                logger.warning(f"  Could not set service account read permission on {display_name}: {exception}")
+
+        def on_public(response, exception):
+            if not register(response, exception, "public read permissions"):
+                logger.info(f"  Could not set public read permissions on {display_name} "
+                            f"({exception}) - granting service account read access")
+                self.gdrive_service.queue_service_account_reader(
+                    fallback_permissions, drive_id, on_service_account_reader
                 )
 
-                # Give service account read access (works on Shared Drives)
-                try:
-                    self.gdrive_service.add_service_account_reader(file_metadata['id'])
-                    logger.info(f"  Added service account read permission")
-                except Exception as e:
-                    logger.info(f"  Permission already inherited: {e}")
+        # Make the file publicly readable so Google Docs can embed it
+        self.gdrive_service.queue_public_permissions(permissions, drive_id, on_public)
+        return drive_id
 
-                # Make the file publicly readable so Google Docs can embed it
-                try:
-                    self.gdrive_service.set_public_permissions(file_metadata['id'])
-                    logger.info(f"  Set public read permissions")
-                except Exception as e:
-                    logger.warning(f"  Could not set public permissions: {e}")
+    @staticmethod
+    def _permission_callback(name: str, description: str, failure_level: int = logging.WARNING):
+        """Build a batch callback that logs the outcome of a permission change"""
+        def callback(response, exception):
+            if exception is not None:
+                logger.log(failure_level, f"  Could not set {description} on {name}: {exception}")
+            else:
+                logger.info(f"  Set {description} on {name}")
+        return callback
+
+    def _flush_permissions(self, batch):
+        """Send queued permission changes in batches before images are embedded"""
+        if not len(batch):
+            return
+        logger.info(f"  🔐 Setting {len(batch)} permissions in batch")
+        batch.flush()
+        # Small delay to let Google Drive process the uploaded files
+        time.sleep(0.5)
+
+    def _embed_images(self, doc_id: str, embeds: List[Dict], convert_anchor_links: bool = True):
+        """
+        Embed all images and convert anchor links with one document update.
 
-                # Use Google Drive direct view URL (works better for embedding)
-                image_url = f"https://drive.google.com/uc?export=view&id={file_metadata['id']}"
-                logger.info(f"  Uploaded to Drive ({len(image_bytes)} bytes)")
+        If the combined batchUpdate is rejected (e.g. one image URL cannot be
+        fetched by Docs), falls back to embedding each image separately and
+        converting anchor links afterwards, so one bad image does not block
+        the rest.
 
-                # Find marker in document and embed image
-                markers = self._find_image_markers(doc_id)
-                matching_markers = [m for m in markers if m['name'] == image_name]
+        Args:
+            doc_id: Google Doc ID
+            embeds: Embed dicts from _process_mermaid_diagrams/_process_local_images
+            convert_anchor_links: Whether to convert #anchor links
+        """
+        try:
+            embedded, converted = self.gdocs_service.embed_images(doc_id, embeds, convert_anchor_links)
+            if embedded:
+                logger.info(f"  ✅ Embedded {embedded} images")
+            if converted:
+                logger.info(f"🔗 Converted {converted} anchor links")
+            return
+        except GoogleDocsError as e:
+            if not embeds:
+                # Don't fail entire sync if anchor conversion fails
+                logger.warning(f"⚠️  Failed to convert anchor links: {e}")
+                return
+            logger.warning(f"⚠️  Combined embed failed, embedding one at a time: {e}")
+
+        for embed in embeds:
+            try:
+                markers = self.gdocs_service.find_markers(doc_id, embed['kind'])
+                matching_markers = [m for m in markers if m['name'] == embed['name']]
 
                 if matching_markers:
                     # Use the first matching marker
                     marker = matching_markers[0]
-                    # Size images at ~40% page width (Google Doc page = 612pt wide)
-                    # 245pt width, maintain 16:10 aspect ratio for screenshots
                     self.gdocs_service.embed_diagram(
                         doc_id=doc_id,
-                        diagram_name=image_name,
-                        image_url=image_url,
+                        diagram_name=embed['name'],
+                        image_url=embed['image_url'],
                         marker_index=marker['index'],
                         marker_length=marker['length'],
-                        width_pt=280,  # ~40-45% page width for reasonable sizing
-                        height_pt=175  # 16:10 aspect ratio
+                        width_pt=embed['width_pt'],
+                        height_pt=embed['height_pt']
                     )
-                    logger.info(f"  ✅ Embedded {display_name}")
+                    logger.info(f"  ✅ Embedded {embed['name']}")
                 else:
-                    logger.warning(f"  ⚠️  Marker not found for {image_name}")
+                    logger.warning(f"  ⚠️  Marker not found for {embed['name']}")
 
             except Exception as e:
-                logger.error(f"  ❌ Failed to process {image.get('display_name', image_name)}: {e}")
+                logger.error(f"  ❌ Failed to embed {embed['name']}: {e}")
+                # The cached Drive copy may be gone; upload a fresh one next time
+                if embed.get('cache_key') and self.render_cache is not None:
+                    self.render_cache.invalidate_drive_id(embed['cache_key'])
+                if embed.get('image_key') and self.use_cache:
+                    self.cache.delete_meta('images', embed['image_key'])
+
+        if convert_anchor_links:
+            try:
+                converted_count = self.gdocs_service.process_anchor_links(doc_id)
+                if converted_count > 0:
+                    logger.info(f"🔗 Converted {converted_count} anchor links")
+            except Exception as e:
+                # Don't fail entire sync if anchor conversion fails
+                logger.warning(f"⚠️  Failed to convert anchor links: {e}")
 
-    def _find_image_markers(self, doc_id: str) -> List[Dict]:
+    def csv_to_sheet(self, csv_file: Path, folder_id: Optional[str] = None, custom_name: Optional[str] = None) -> str:
         """
-        Find image markers in document ([IMAGE:name]).
+        Convert and upload CSV file to Google Sheets.
+
+        The first sync uploads the whole file. When the sheet already exists
+        and a row snapshot from the last sync is available, only the changed
+        rows are written (see _update_sheet_rows); the whole file is
+        uploaded again when most rows changed or the update fails. CSVs
+        above sheets_stream_threshold are streamed instead (see
+        _stream_csv_to_sheet).
 
         Args:
-            doc_id: Document ID
+            csv_file: Path to CSV file
+            folder_id: Target Google Drive folder ID
+            custom_name: Optional custom name for the sheet
 
         Returns:
-            List[Dict]: List of marker locations with name and index
+            Google Sheet ID
         """
-        import re
-
-        try:
-            doc = self.gdocs_service.docs_service.documents().get(documentId=doc_id).execute()
-            content = doc.get('body', {}).get('content', [])
-            markers = []
-
-            # Pattern for image markers
-            marker_pattern = r'\[IMAGE:(\w+)\]'
-
-            # Search through content
-            for element in content:
-                if 'paragraph' in element:
-                    paragraph = element['paragraph']
-                    for text_run in paragraph.get('elements', []):
-                        if 'textRun' in text_run:
-                            text_content = text_run['textRun'].get('content', '')
-                            start_index = text_run.get('startIndex', 0)
-
-                            # Find all markers in this text run
-                            for match in re.finditer(marker_pattern, text_content):
-                                image_name = match.group(1)
-                                marker_offset = match.start()
-                                marker_index = start_index + marker_offset
-
-                                markers.append({
-                                    'name': image_name,
-                                    'index': marker_index,
-                                    'length': len(match.group(0))
-                                })
-
-            logger.info(f"Found {len(markers)} image markers in {doc_id}")
-            return markers
-
-        except Exception as error:
-            logger.error(f"Failed to find image markers: {error}")
-            return []
-
-    def csv_to_sheet(self, csv_file: Path, folder_id: Optional[str] = None, custom_name: Optional[str] = None) -> str:
-        """Convert and upload CSV file to Google Sheets (existing implementation)"""
         csv_file = Path(csv_file)
         folder_id = folder_id or self.folder_id or 'root'
 
@@ -543,51 +1045,314 @@ class GoogleDriveSync:
         if custom_name:
             file_metadata['name'] = custom_name
 
-        file_name = file_metadata['name']
+        # Check cache
+        if self.use_cache:
+            should_sync, reason = self.cache.should_sync(csv_file)
+            if not should_sync:
+                logger.info(f"⏭️  Skipped: {csv_file} ({reason})")
+                return self.cache.get_drive_id(csv_file)
+            logger.info(f"📤 Syncing: {csv_file} ({reason})")
+        else:
+            logger.info(f"📤 Syncing: {csv_file}")
+
+        if self.sheets_stream_threshold and csv_file.stat().st_size > self.sheets_stream_threshold:
+            try:
+                return self._stream_csv_to_sheet(csv_file, folder_id, file_metadata['name'])
+            except (HttpError, GoogleSheetsError, ValueError) as error:
+                raise Exception(f"Error syncing {csv_file}: {error}")
+
+        rows = None
+        if self.sheet_snapshots is not None:
+            try:
+                rows = hash_csv_rows(csv_file)
+            except ValueError as e:
+                logger.warning(f"   {e} - uploading the whole file")
 
         try:
-            query = f"name='{file_name}' and mimeType='application/vnd.google-apps.spreadsheet' and '{folder_id}' in parents and trashed=false"
-            request = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name, webViewLink)',
-                supportsAllDrives=True,
-                includeItemsFromAllDrives=True
+            sheet_id = self._update_sheet_rows(csv_file, *rows) if rows else None
+            if sheet_id:
+                if self.use_cache:
+                    self.cache.update(csv_file, sheet_id)
+                return sheet_id
+
+            media = MediaFileUpload(
+                str(csv_file), mimetype='text/csv', chunksize=self.upload_chunk_size, resumable=True
             )
-            results = self._execute_with_retry(request)
-
-            files = results.get('files', [])
-            media = MediaFileUpload(str(csv_file), mimetype='text/csv', resumable=True)
 
-            if files:
-                request = self.service.files().update(
-                    fileId=files[0]['id'],
-                    media_body=media,
-                    fields='id,webViewLink',
-                    supportsAllDrives=True
-                )
-                sheet = self._execute_with_retry(request)
-                logger.info(f"🔄 Updated: {csv_file} → Google Sheet")
-                logger.info(f"   View at: {sheet.get('webViewLink')}")
+            sheet, created = self._upload_file(
+                csv_file, file_metadata, media, folder_id,
+                converter.get_conversion_mimetype(), fields='id,webViewLink'
+            )
+            if created:
+                logger.info(f"✅ Created: {csv_file} → Google Sheet")
             else:
-                file_metadata['mimeType'] = converter.get_conversion_mimetype()
-                file_metadata['parents'] = [folder_id]
+                logger.info(f"🔄 Updated: {csv_file} → Google Sheet")
+            logger.info(f"   View at: {sheet.get('webViewLink')}")
 
-                request = self.service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id,webViewLink',
-                    supportsAllDrives=True
-                )
-                sheet = self._execute_with_retry(request)
-                logger.info(f"✅ Created: {csv_file} → Google Sheet")
-                logger.info(f"   View at: {sheet.get('webViewLink')}")
+            # Update cache
+            if self.use_cache:
+                self.cache.update(csv_file, sheet['id'])
+            if rows:
+                self.sheet_snapshots.put(csv_file, sheet['id'], *rows)
 
             return sheet['id']
 
         except HttpError as error:
             raise Exception(f"Error syncing {csv_file}: {error}")
 
+    def _update_sheet_rows(self, csv_file: Path, hashes: List[str], columns: int) -> Optional[str]:
+        """
+        Write only the rows of a CSV that changed since its last sync.
+
+        Rows are compared by position with the snapshot recorded at the last
+        sync; the snapshot must belong to the sheet the cache points at.
+
+        Args:
+            csv_file: CSV file
+            hashes: Row hashes of the current file
+            columns: Widest row of the current file
+
+        Returns:
+            Sheet ID if the sheet was brought up to date, None if the whole
+            file must be uploaded instead
+        """
+        sheet_id = self.cache.get_drive_id(csv_file) if self.use_cache else None
+        snapshot = self.sheet_snapshots.get(csv_file)
+        if not sheet_id or not snapshot or snapshot.get('spreadsheet_id') != sheet_id or not hashes:
+            return None
+
+        ranges = changed_ranges(snapshot['rows'], hashes)
+        changed = sum(end - start for start, end in ranges)
+        if changed > INCREMENTAL_MAX_CHANGED * len(hashes):
+            logger.info(f"   {changed}/{len(hashes)} rows changed - uploading the whole file")
+            return None
+
+        # Pad to the old width so cells of rows that got shorter are cleared
+        width = max(columns, snapshot.get('columns', 0))
+        try:
+            self._get_sheets_service().update_rows(
+                sheet_id, read_row_ranges(csv_file, ranges, width),
+                len(hashes), len(snapshot['rows']), width, chunk_rows=self.sheets_chunk_rows
+            )
+        except GoogleSheetsError as e:
+            logger.warning(f"   Row update failed ({e}) - uploading the whole file")
+            self.sheet_snapshots.delete(csv_file)
+            return None
+
+        self.sheet_snapshots.put(csv_file, sheet_id, hashes, columns)
+        logger.info(f"🔄 Updated {changed} of {len(hashes)} rows: {csv_file} → Google Sheet")
+        return sheet_id
+
+    def _get_sheets_service(self) -> GoogleSheetsService:
+        """Sheets API client, created on first use"""
+        if self.gsheets_service is None:
+            self.gsheets_service = GoogleSheetsService(self.credentials_file, self.rate_limiter)
+        return self.gsheets_service
+
+    def _stream_csv_to_sheet(self, csv_file: Path, folder_id: str, name: str) -> str:
+        """
+        Import a large CSV through the Sheets API, a chunk of rows at a time.
+
+        Only one chunk is held in memory. Rows fill tabs of at most
+        ROWS_PER_TAB rows, each starting with the CSV header; a new
+        spreadsheet ("<name> (part N)") is started when the next tab would
+        exceed SHEETS_CELL_LIMIT. Spreadsheets from the last import of the
+        file are reused in order and left-over ones are moved to the trash.
+
+        Progress (byte offset, tabs written and spreadsheets opened) is
+        checkpointed in the sync cache after every chunk, so an interrupted
+        import resumes where it stopped as long as the file is unchanged.
+        Chunks are written at fixed positions, so a chunk written again after
+        an interruption is not duplicated.
+
+        Args:
+            csv_file: CSV file
+            folder_id: Target Google Drive folder ID
+            name: Name of the (first) spreadsheet
+
+        Returns:
+            ID of the first spreadsheet
+
+        Raises:
+            GoogleSheetsError: If the Sheets API fails (the checkpoint is kept)
+            ValueError: If the file is not valid UTF-8 CSV
+        """
+        sheets = self._get_sheets_service()
+        key = str(csv_file)
+        stat = csv_file.stat()
+        fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+        checkpoint = self.cache.get_meta('csv_imports', key) if self.use_cache else None
+        if checkpoint and all(checkpoint.get(k) == v for k, v in fingerprint.items()):
+            state = copy.deepcopy(checkpoint)
+            logger.info(f"   Resuming import after {state['rows']:,} rows")
+        else:
+            previous = []
+            if self.use_cache:
+                cached_id = self.cache.get_drive_id(csv_file)
+                previous = list(self.cache.get_meta('csv_shards', key) or ([cached_id] if cached_id else []))
+            if checkpoint:
+                # The file changed during an interrupted import; reuse what it opened
+                previous = checkpoint['previous'] + checkpoint['spreadsheets']
+            state = dict(fingerprint, offset=0, rows=0, header=None, shards=[], spreadsheets=[],
+                         previous=list(dict.fromkeys(previous)))
+            self._checkpoint_csv_import(csv_file, state)
+
+        for rows, offset in iter_csv_chunks(csv_file, self.sheets_chunk_rows, state['offset']):
+            if state['header'] is None:
+                state['header'] = rows[0]
+                rows = rows[1:]
+            self._write_csv_chunk(sheets, state, rows, csv_file, folder_id, name)
+            state['offset'] = offset
+            state['rows'] += len(rows)
+            self._checkpoint_csv_import(csv_file, state)
+            logger.info(f"   📊 {state['rows']:,} rows ({offset * 100 // max(1, stat.st_size)}%)")
+
+        if not state['shards']:
+            self._open_csv_shard(sheets, state, len(state['header'] or []) or 1, csv_file, folder_id, name)
+
+        spreadsheets = state['spreadsheets']
+        for stale_id in state['previous']:
+            if stale_id in spreadsheets:
+                continue
+            try:
+                self._execute_with_retry(self.service.files().update(
+                    fileId=stale_id, body={'trashed': True}, supportsAllDrives=True
+                ))
+            except HttpError as error:
+                if error.resp.status != 404:
+                    raise
+
+        if self.use_cache:
+            self.cache.set_meta('csv_shards', key, spreadsheets)
+            self.cache.delete_meta('csv_imports', key)
+            self.cache.update(csv_file, spreadsheets[0])
+        if self.sheet_snapshots is not None:
+            self.sheet_snapshots.delete(csv_file)
+
+        logger.info(
+            f"✅ Imported {state['rows']:,} rows: {csv_file} → {len(state['shards'])} tab(s) "
+            f"in {len(spreadsheets)} Google Sheet(s)"
+        )
+        return spreadsheets[0]
+
+    def _write_csv_chunk(
+        self,
+        sheets: GoogleSheetsService,
+        state: dict,
+        rows: List[List[str]],
+        csv_file: Path,
+        folder_id: str,
+        name: str
+    ):
+        """Append rows to the current tab of a streamed import, opening tabs as they fill up"""
+        width = max([len(state['header'] or [])] + [len(row) for row in rows]) or 1
+        while rows:
+            shard = state['shards'][-1] if state['shards'] else None
+            capacity = 0
+            if shard is not None:
+                columns = max(width, shard['columns'])
+                other_cells = sum(
+                    s['rows'] * s['columns'] for s in state['shards']
+                    if s['spreadsheet_id'] == shard['spreadsheet_id'] and s is not shard
+                )
+                capacity = min(
+                    ROWS_PER_TAB - shard['rows'],
+                    (SHEETS_CELL_LIMIT - other_cells) // columns - shard['rows']
+                )
+            if capacity <= 0:
+                self._open_csv_shard(sheets, state, width, csv_file, folder_id, name)
+                continue
+
+            part, rows = rows[:capacity], rows[capacity:]
+            sheets.write_rows(
+                shard['spreadsheet_id'], shard['sheet_id'], shard['title'],
+                shard['rows'], part, columns
+            )
+            shard['rows'] += len(part)
+            shard['columns'] = columns
+
+    def _open_csv_shard(
+        self,
+        sheets: GoogleSheetsService,
+        state: dict,
+        columns: int,
+        csv_file: Path,
+        folder_id: str,
+        name: str
+    ) -> dict:
+        """
+        Start the next tab of a streamed import and write the header into it.
+
+        The tab goes into the current spreadsheet while its cell budget has
+        room for the header and one row, otherwise into the next spreadsheet
+        (opened earlier by this import, reused from the last import, or
+        created). Spreadsheets are recorded in the checkpoint as soon as they
+        are opened; tabs only with the chunk that fills them.
+        """
+        title = f"Part {len(state['shards']) + 1}"
+        current = state['shards'][-1] if state['shards'] else None
+        used_cells = sum(
+            s['rows'] * s['columns'] for s in state['shards']
+            if current is not None and s['spreadsheet_id'] == current['spreadsheet_id']
+        )
+
+        if current is not None and SHEETS_CELL_LIMIT - used_cells >= 2 * columns:
+            spreadsheet_id = current['spreadsheet_id']
+            sheet_id = sheets.add_sheet(spreadsheet_id, title)
+        else:
+            index = len({s['spreadsheet_id'] for s in state['shards']})
+            candidates = state['spreadsheets'] + [i for i in state['previous'] if i not in state['spreadsheets']]
+            spreadsheet_id = candidates[index] if index < len(candidates) else None
+            sheet_id = None
+            if spreadsheet_id:
+                try:
+                    sheet_id = sheets.start_spreadsheet(spreadsheet_id, title)
+                except GoogleSheetsError as error:
+                    if not _is_not_found(error):
+                        raise
+                    logger.info(f"   Spreadsheet {spreadsheet_id} not found - creating a new one")
+                    for known in (state['previous'], state['spreadsheets']):
+                        if spreadsheet_id in known:
+                            known.remove(spreadsheet_id)
+            if sheet_id is None:
+                spreadsheet_name = name if index == 0 else f"{name} (part {index + 1})"
+                mime_type = 'application/vnd.google-apps.spreadsheet'
+                created = self._execute_with_retry(self.service.files().create(
+                    body={'name': spreadsheet_name, 'mimeType': mime_type, 'parents': [folder_id]},
+                    fields='id', supportsAllDrives=True
+                ))
+                spreadsheet_id = created['id']
+                self.remote_index.add(folder_id, {
+                    'id': spreadsheet_id, 'name': spreadsheet_name, 'mimeType': mime_type
+                })
+                sheet_id = sheets.start_spreadsheet(spreadsheet_id, title)
+                logger.info(f"   Created Google Sheet: {spreadsheet_name}")
+            if spreadsheet_id not in state['spreadsheets']:
+                state['spreadsheets'].append(spreadsheet_id)
+                self._record_csv_spreadsheet(csv_file, spreadsheet_id)
+
+        shard = {'spreadsheet_id': spreadsheet_id, 'sheet_id': sheet_id, 'title': title, 'rows': 0, 'columns': 1}
+        state['shards'].append(shard)
+        if state['header']:
+            sheets.write_rows(spreadsheet_id, sheet_id, title, 0, [state['header']], columns)
+            shard['rows'], shard['columns'] = 1, columns
+        return shard
+
+    def _checkpoint_csv_import(self, csv_file: Path, state: dict):
+        """Record the progress of a streamed import in the sync cache"""
+        if self.use_cache:
+            self.cache.set_meta('csv_imports', str(csv_file), copy.deepcopy(state))
+            self.cache.schedule_save()
+
+    def _record_csv_spreadsheet(self, csv_file: Path, spreadsheet_id: str):
+        """Add a spreadsheet to the checkpoint of a streamed import mid-chunk (rows stay at the last chunk)"""
+        checkpoint = self.cache.get_meta('csv_imports', str(csv_file)) if self.use_cache else None
+        if checkpoint is not None:
+            checkpoint = copy.deepcopy(checkpoint)
+            checkpoint['spreadsheets'].append(spreadsheet_id)
+            self._checkpoint_csv_import(csv_file, checkpoint)
+
     def pdf_to_drive(self, pdf_file: Path, folder_id: Optional[str] = None, custom_name: Optional[str] = None) -> str:
         """
         Upload PDF file directly to Google Drive (no conversion).
@@ -609,8 +1374,6 @@ class GoogleDriveSync:
         if custom_name:
             file_metadata['name'] = custom_name
 
-        file_name = file_metadata['name']
-
         # Check cache
         if self.use_cache:
             should_sync, reason = self.cache.should_sync(pdf_file)
@@ -622,44 +1385,18 @@ class GoogleDriveSync:
             logger.info(f"📤 Syncing: {pdf_file}")
 
         try:
-            # Check if PDF already exists in folder
-            query = f"name='{file_name}' and mimeType='application/pdf' and '{folder_id}' in parents and trashed=false"
-            request = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name, webViewLink)',
-                supportsAllDrives=True,
-                includeItemsFromAllDrives=True
+            media = MediaFileUpload(
+                str(pdf_file), mimetype='application/pdf', chunksize=self.upload_chunk_size, resumable=True
             )
-            results = self._execute_with_retry(request)
-
-            files = results.get('files', [])
-            media = MediaFileUpload(str(pdf_file), mimetype='application/pdf', resumable=True)
-
-            if files:
-                # Update existing PDF
-                request = self.service.files().update(
-                    fileId=files[0]['id'],
-                    media_body=media,
-                    fields='id,webViewLink',
-                    supportsAllDrives=True
-                )
-                pdf = self._execute_with_retry(request)
-                logger.info(f"🔄 Updated: {pdf_file} → Google Drive PDF")
-                logger.info(f"   View at: {pdf.get('webViewLink')}")
-            else:
-                # Create new PDF
-                file_metadata['parents'] = [folder_id]
 
-                request = self.service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id,webViewLink',
-                    supportsAllDrives=True
-                )
-                pdf = self._execute_with_retry(request)
+            pdf, created = self._upload_file(
+                pdf_file, file_metadata, media, folder_id, 'application/pdf', fields='id,webViewLink'
+            )
+            if created:
                 logger.info(f"✅ Created: {pdf_file} → Google Drive PDF")
-                logger.info(f"   View at: {pdf.get('webViewLink')}")
+            else:
+                logger.info(f"🔄 Updated: {pdf_file} → Google Drive PDF")
+            logger.info(f"   View at: {pdf.get('webViewLink')}")
 
             # Update cache
             if self.use_cache:
@@ -689,43 +1426,192 @@ class GoogleDriveSync:
             return None
 
     def sync_directory(self, directory: Path, recursive: bool = True, exclude: Optional[List[str]] = None) -> Dict[str, str]:
-        """Sync entire directory to Google Drive with Mermaid support"""
+        """
+        Sync entire directory to Google Drive with Mermaid support
+
+        Args:
+            directory: Directory to sync
+            recursive: Include subdirectories
+            exclude: Glob patterns (as for Path.match) of files and directories to
+                     skip; excluded directories are not walked or created on Drive
+
+        Returns:
+            Local path → Drive file ID of every synced (or unchanged) file; in git
+            scan mode files git did not report are included from the cache
+        """
         directory = Path(directory)
-        exclude = exclude or []
         synced_files = {}
 
-        # Create folder structure
-        logger.info(f"📂 Creating folder structure...")
-        folders = self.create_folder_structure(directory, self.folder_id)
+        # Excluded subtrees and ignored files (.gitkeep, media files, etc.) are
+        # dropped while scanning
+        matcher = self._path_matcher(exclude)
+        scan = self._scan_directory(directory, recursive, matcher)
+        files = scan.files
+
+        if scan.excluded > 0:
+            logger.info(f"⏭️  Excluding {scan.excluded} path(s) matching exclude patterns")
+        if scan.ignored > 0:
+            logger.info(f"⏭️  Skipping {scan.ignored} ignored file(s) (.gitkeep, media files, etc.)")
+
+        # Plan against the cache before any API work
+        plan = plan_changes(directory, files, self.cache if self.use_cache else None, self.hash_workers)
+
+        # Files git did not report are unchanged since the last synced commit
+        untouched = []
+        if isinstance(scan, GitScan):
+            untouched = self._unreported_git_files(directory, files, plan.deleted, recursive, matcher)
 
-        # Get files to sync
-        glob_pattern = '**/*' if recursive else '*'
-        files = [f for f in directory.glob(glob_pattern) if f.is_file()]
+        total_files = len(files) + len(untouched)
+        logger.info(f"\n📊 Found {total_files} files to process\n")
+        logger.info(f"🗂️  Change set: {plan.summary()}")
+        if untouched:
+            logger.info(f"🔀 {len(untouched)} other file(s) unchanged since the last synced commit")
+
+        for file_path in plan.unsupported:
+            logger.warning(f"⚠️  Skipped: {file_path} - unsupported file type")
+        for cache_key in plan.deleted:
+            logger.info(f"🗑️  Deleted locally, removed from cache: {cache_key}")
+            self.cache.remove(cache_key)
+        for file_path in plan.unchanged + untouched:
+            drive_id = self.cache.get_drive_id(file_path)
+            if drive_id:
+                synced_files[str(file_path)] = drive_id
+
+        if plan.changed:
+            # Only the folders changed files live in are resolved or created
+            logger.info(f"📂 Creating folder structure...")
+            folders = self.create_folder_structure(directory, self.folder_id, subdirs=plan.folders())
+            self._sync_changed_files(plan.changed, folders, synced_files)
+        else:
+            logger.info("✨ Nothing to sync")
 
-        # Filter excluded patterns
-        for pattern in exclude:
-            files = [f for f in files if not f.match(pattern)]
+        if isinstance(scan, GitScan):
+            self._record_git_scan(directory, scan, [f for f in plan.changed if str(f) not in synced_files])
+
+        # Final cache save
+        if self.use_cache:
+            self.cache.save()
+            logger.info(f"\n💾 Final sync cache saved ({len(synced_files)}/{total_files} successful)")
+        if self.render_cache is not None:
+            self.render_cache.save()
 
-        # Filter out ignored files (like .gitkeep, .mp4, etc.)
-        ignored_count = 0
-        filtered_files = []
-        for f in files:
-            if FileTypeDetector.should_ignore(f):
-                ignored_count += 1
+        # Summary
+        logger.info(f"\n📈 Sync Statistics:")
+        logger.info(f"   Total files: {total_files}")
+        logger.info(f"   Successfully synced: {len(synced_files)}")
+        logger.info(f"   Errors: {total_files - len(synced_files)}")
+        logger.info(f"   API calls made: {self.api_call_count}")
+
+        return synced_files
+
+    def _scan_directory(self, directory: Path, recursive: bool, matcher: PathMatcher) -> Union[GitScan, TreeScan]:
+        """
+        Find the files of a directory sync.
+
+        In git scan mode only files git reports as changed since the commit
+        recorded at the last successful sync are returned; outside a git work
+        tree (or without git) the whole tree is walked.
+
+        Returns:
+            Scan result (files, excluded and ignored counts)
+        """
+        if self.scan_mode == 'git':
+            recorded = self.cache.get_meta('git', str(directory.resolve())) if self.use_cache else None
+            recorded = recorded or {}
+            try:
+                scan = scan_git_changes(
+                    directory, recorded.get('commit'), recorded.get('dirty', []), recursive, matcher
+                )
+            except GitScanError as e:
+                logger.warning(f"⚠️  Git scan unavailable ({e}) - walking {directory}")
             else:
-                filtered_files.append(f)
-        files = filtered_files
+                if scan.base:
+                    logger.info(f"🔀 Git scan: {len(scan.files)} candidate file(s) since {scan.base[:12]}")
+                else:
+                    logger.info(f"🔀 Git scan: listing all {len(scan.files)} file(s) known to git")
+                return scan
+        return scan_tree(directory, recursive, matcher)
 
-        if ignored_count > 0:
-            logger.info(f"⏭️  Skipping {ignored_count} ignored file(s) (.gitkeep, media files, etc.)")
+    def _unreported_git_files(
+        self,
+        directory: Path,
+        files: List[Path],
+        deleted: List[str],
+        recursive: bool,
+        matcher: PathMatcher
+    ) -> List[Path]:
+        """
+        Cached files of a git-scanned directory that git did not report as changed.
 
-        total_files = len(files)
-        logger.info(f"\n📊 Found {total_files} files to process\n")
+        These are the files a walk would have found unchanged; excluded,
+        ignored and (without recursive) nested files are left out as the
+        walk would leave them out.
+
+        Args:
+            directory: Directory being synced
+            files: Files the git scan returned
+            deleted: Cache keys of files gone from disk
+            recursive: Include subdirectories
+            matcher: Exclude and ignore rules of the sync
+
+        Returns:
+            Files recorded in the sync cache below directory
+        """
+        if not self.use_cache:
+            return []
+        skip = {str(file_path) for file_path in files}
+        skip.update(deleted)
+        root = directory.as_posix()
+        untouched = []
+        for key in self.cache.paths():
+            if key in skip:
+                continue
+            try:
+                relative = Path(key).relative_to(directory)
+            except ValueError:
+                continue
+            if not recursive and len(relative.parts) > 1:
+                continue
+            if matcher.excludes_relative(root, relative.as_posix()) or matcher.ignores(relative.name):
+                continue
+            untouched.append(Path(key))
+        return untouched
+
+    def _record_git_scan(self, directory: Path, scan: GitScan, failed: List[Path]):
+        """
+        Remember the commit a git-scanned sync covered.
 
-        # Sync each file with progress tracking
+        Nothing is recorded when a file failed to sync (the next run diffs
+        from the same commit and retries it) or the repository has no commits.
+        """
+        if not self.use_cache or scan.head is None:
+            return
+        if failed:
+            logger.info(f"   {len(failed)} file(s) failed - keeping the last synced commit for the next git scan")
+            return
+        self.cache.set_meta('git', str(directory.resolve()), {'commit': scan.head, 'dirty': scan.dirty})
+
+    @staticmethod
+    def _path_matcher(exclude: Optional[List[str]] = None) -> PathMatcher:
+        """Exclude patterns plus the files FileTypeDetector ignores, compiled for a walk"""
+        return PathMatcher(exclude or [], FileTypeDetector.IGNORED_FILES, FileTypeDetector.IGNORED_EXTENSIONS)
+
+    def _sync_changed_files(self, files: List[Path], folders: Dict[str, str], synced_files: Dict[str, str]):
+        """
+        Sync the changed files of a directory, serially or on the worker pool.
+
+        Args:
+            files: Files to sync
+            folders: Local directory → Drive folder ID map
+            synced_files: Result map to fill (local path → Drive file ID)
+        """
+        if self.workers > 1:
+            self._sync_files_concurrently(files, folders, synced_files)
+            return
+
+        total_files = len(files)
         for idx, file_path in enumerate(files, 1):
-            parent_dir = str(file_path.parent)
-            target_folder = folders.get(parent_dir, self.folder_id or 'root')
+            target_folder = self._target_folder(file_path, folders)
 
             try:
                 print(f"[{idx}/{total_files}] ", end="")
@@ -735,28 +1621,80 @@ class GoogleDriveSync:
 
                 # Batch save cache
                 if self.use_cache and idx % self.batch_size == 0:
-                    self.cache.save()
+                    self.cache.schedule_save()
                     logger.info(f"💾 Progress saved ({idx}/{total_files} files)")
 
             except Exception as e:
                 logger.error(f"❌ Error syncing {file_path}: {e}")
 
-        # Final cache save
-        if self.use_cache:
-            self.cache.save()
-            logger.info(f"\n💾 Final sync cache saved ({len(synced_files)}/{total_files} successful)")
+    def _target_folder(self, file_path: Path, folders: Dict[str, str]) -> str:
+        """Get the Drive folder a local file belongs in"""
+        return folders.get(str(file_path.parent), self.folder_id or 'root')
 
-        # Summary
-        logger.info(f"\n📈 Sync Statistics:")
-        logger.info(f"   Total files: {total_files}")
-        logger.info(f"   Successfully synced: {len(synced_files)}")
-        logger.info(f"   Errors: {total_files - len(synced_files)}")
-        logger.info(f"   API calls made: {self.api_call_count}")
+    def _sync_files_concurrently(self, files: List[Path], folders: Dict[str, str], synced_files: Dict[str, str]):
+        """
+        Sync files on a bounded worker pool.
 
-        return synced_files
+        Workers only call sync_file; progress output, result collection and
+        batch cache saves happen on the calling thread as results complete.
+
+        Args:
+            files: Files to sync
+            folders: Local directory → Drive folder ID map
+            synced_files: Result map to fill (local path → Drive file ID)
+        """
+        total_files = len(files)
+        logger.info(f"⚡ Syncing with {self.workers} workers")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='sync') as pool:
+            futures = {
+                pool.submit(self.sync_file, file_path, self._target_folder(file_path, folders)): file_path
+                for file_path in files
+            }
+
+            for idx, future in enumerate(as_completed(futures), 1):
+                file_path = futures[future]
+                try:
+                    file_id = future.result()
+                    if file_id:
+                        synced_files[str(file_path)] = file_id
+                    logger.info(f"[{idx}/{total_files}] Done: {file_path}")
+                except Exception as e:
+                    logger.error(f"[{idx}/{total_files}] ❌ Error syncing {file_path}: {e}")
+
+                # Batch save cache
+                if self.use_cache and idx % self.batch_size == 0:
+                    self.cache.schedule_save()
+                    logger.info(f"💾 Progress saved ({idx}/{total_files} files)")
+
+    def create_folder_structure(
+        self,
+        base_path: Path,
+        parent_id: Optional[str] = None,
+        subdirs: Optional[Iterable[Path]] = None,
+        exclude: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Create folder structure matching local directory.
+
+        Subdirectories are resolved level by level: folder IDs cached by
+        earlier runs are reused once found in their parent's listing, other
+        existing folders come from the same listings (fetched concurrently for all parents at one depth),
+        and all missing folders at one depth are created in a single batched
+        request, so a tree takes a few round trips per level rather than
+        per directory.
 
-    def create_folder_structure(self, base_path: Path, parent_id: Optional[str] = None) -> Dict[str, str]:
-        """Create folder structure matching local directory"""
+        Args:
+            base_path: Local directory mirrored on Drive
+            parent_id: Drive folder the directory is created in
+            subdirs: Only resolve these subdirectories, which must include their
+                     ancestors (default: every subdirectory not excluded)
+            exclude: Glob patterns of directories to leave out when walking
+                     base_path (ignored when subdirs is given)
+
+        Returns:
+            Local directory → Drive folder ID map
+        """
         folders = {}
         parent_id = parent_id or self.folder_id or 'root'
 
@@ -764,21 +1702,107 @@ class GoogleDriveSync:
         main_folder_id = self.get_or_create_folder(main_folder_name, parent_id)
         folders[str(base_path)] = main_folder_id
 
-        for subdir in base_path.rglob('*'):
-            if subdir.is_dir():
-                parent_path = subdir.parent
-
-                if str(parent_path) in folders:
-                    parent_folder_id = folders[str(parent_path)]
-                else:
-                    parent_folder_id = main_folder_id
+        # Group subdirectories by depth; parents are always resolved first
+        levels: Dict[int, List[Path]] = {}
+        if subdirs is None:
+            subdirs = scan_tree(base_path, matcher=self._path_matcher(exclude)).dirs
+        for subdir in subdirs:
+            levels.setdefault(len(subdir.relative_to(base_path).parts), []).append(subdir)
+
+        for depth in sorted(levels):
+            with self._folder_lock:
+                self._list_parent_folders(levels[depth], folders, main_folder_id)
+                missing = []
+                for subdir in levels[depth]:
+                    parent_folder_id = folders.get(str(subdir.parent), main_folder_id)
+                    existing_id = self._cached_folder(subdir.name, parent_folder_id)
+                    if not existing_id:
+                        existing_id = self._find_existing(
+                            subdir.name, 'application/vnd.google-apps.folder', parent_folder_id
+                        )
+                        if existing_id:
+                            self._remember_folder(subdir.name, parent_folder_id, existing_id)
+                    if existing_id:
+                        folders[str(subdir)] = existing_id
+                    else:
+                        missing.append((subdir, parent_folder_id))
 
-                folder_id = self.get_or_create_folder(subdir.name, parent_folder_id)
-                folders[str(subdir)] = folder_id
+                if missing:
+                    self._create_folders_batch(missing, folders)
 
         return folders
 
+    def _list_parent_folders(self, subdirs: List[Path], folders: Dict[str, str], main_folder_id: str):
+        """
+        Fetch the Drive listings of the parents of uncached or unverified subdirectories concurrently.
+
+        Args:
+            subdirs: Subdirectories of one depth
+            folders: Local directory → Drive folder ID map (parents already resolved)
+            main_folder_id: Drive folder of the base directory
+        """
+        parent_ids = []
+        for subdir in subdirs:
+            parent_folder_id = folders.get(str(subdir.parent), main_folder_id)
+            if parent_folder_id not in parent_ids and self._cached_folder_unverified(subdir.name, parent_folder_id):
+                parent_ids.append(parent_folder_id)
+        if len(parent_ids) < 2:
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=min(FOLDER_LISTING_WORKERS, len(parent_ids)), thread_name_prefix='list'
+        ) as pool:
+            # Errors surface again from the lookup that needs the listing
+            for future in [pool.submit(self.remote_index.folder, pid) for pid in parent_ids]:
+                try:
+                    future.result()
+                except Exception:
+                    pass
+
+    def _create_folders_batch(self, missing: List[Tuple[Path, str]], folders: Dict[str, str]):
+        """
+        Create sibling-level folders in batched requests; caller holds _folder_lock.
+
+        Args:
+            missing: (local directory, parent folder ID) pairs to create
+            folders: Local directory → Drive folder ID map to fill
+        """
+        batch = BatchExecutor(self.service, self.rate_limiter, api='drive')
+        errors = []
+
+        for subdir, parent_folder_id in missing:
+            def on_created(folder, error, subdir=subdir, parent_folder_id=parent_folder_id):
+                if error is not None:
+                    errors.append((subdir.name, error))
+                    return
+                self.remote_index.add(parent_folder_id, folder)
+                self.remote_index.mark_empty(folder['id'])
+                self._remember_folder(subdir.name, parent_folder_id, folder['id'])
+                folders[str(subdir)] = folder['id']
+                logger.info(f"📁 Created folder: {subdir.name}")
+
+            request = self.service.files().create(
+                body={
+                    'name': subdir.name,
+                    'mimeType': 'application/vnd.google-apps.folder',
+                    'parents': [parent_folder_id]
+                },
+                fields='id, name, mimeType',
+                supportsAllDrives=True
+            )
+            batch.add(request, on_created)
+
+        batch.flush()
+
+        if errors:
+            name, error = errors[0]
+            raise Exception(f"Error with folder '{name}': {error}")
+
     def finalize(self):
-        """Save cache before shutdown"""
+        """Save cache and stop background renderers before shutdown"""
+        if self._render_executor is not None:
+            self._render_executor.shutdown(wait=True)
         if self.use_cache and self.cache:
-            self.cache.save()
+            self.cache.close()
+        if self.render_cache is not None:
+            self.render_cache.save()
@@ -0,0 +1,184 @@
+"""
+Single-pass directory walk for directory syncs
+
+One os.scandir walk yields both the files to sync and the subdirectories
+to mirror on Drive. File/directory checks use the type information
+returned with each DirEntry, so no per-entry stat is needed on platforms
+that report it (Linux, macOS, Windows).
+
+Exclude patterns and ignore rules are compiled once into a PathMatcher
+and applied while walking: an excluded directory is pruned before it is
+descended into, so nothing below it is listed, synced or created on
+Drive.
+
+Symlinks are treated like Path.glob('**/*') treats them: symlinked files
+are included, symlinked directories are not descended into.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+
+def _glob_component(part: str) -> str:
+    """Regex for one path component of a glob (wildcards never cross '/')"""
+    regex = []
+    i = 0
+    while i < len(part):
+        char = part[i]
+        i += 1
+        if char == '*':
+            regex.append('[^/]*')
+        elif char == '?':
+            regex.append('[^/]')
+        elif char == '[':
+            end = part.find(']', i + 1 if part[i:i + 1] in ('!', ']') else i)
+            if end == -1:
+                regex.append(re.escape(char))
+                continue
+            body = part[i:end].replace('\\', '\\\\')
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            elif body.startswith(('^', '[')):
+                body = '\\' + body
+            regex.append(f'[{body}]')
+            i = end + 1
+        else:
+            regex.append(re.escape(char))
+    return ''.join(regex)
+
+
+def _glob_regex(pattern: str) -> str:
+    """
+    Regex matching what Path.match(pattern) matches, against a POSIX path
+
+    Relative patterns match the trailing components of a path; absolute
+    patterns match the whole path.
+    """
+    anchored = pattern.startswith('/')
+    parts = [part for part in pattern.split('/') if part]
+    body = '/'.join(_glob_component(part) for part in parts)
+    return ('^/' if anchored else '(?:^|/)') + body + '$'
+
+
+class PathMatcher:
+    """Exclude patterns and ignored file names/extensions, compiled once"""
+
+    def __init__(
+        self,
+        exclude: Iterable[str] = (),
+        ignored_names: Iterable[str] = (),
+        ignored_extensions: Iterable[str] = ()
+    ):
+        """
+        Args:
+            exclude: Glob patterns as for Path.match (e.g. '*.draft.md',
+                     'node_modules'); a trailing '/' ('temp/') matches
+                     directories only. A matching directory is pruned
+                     with everything below it.
+            ignored_names: File names skipped silently (case-insensitive)
+            ignored_extensions: File extensions skipped silently (case-insensitive)
+        """
+        any_path, dirs_only = [], []
+        for pattern in exclude:
+            if not pattern.strip('/'):
+                continue
+            (dirs_only if pattern.endswith('/') else any_path).append(_glob_regex(pattern))
+        self._exclude = re.compile('|'.join(any_path)) if any_path else None
+        self._exclude_dirs = re.compile('|'.join(any_path + dirs_only)) if any_path or dirs_only else None
+        self._ignored_names = {name.lower() for name in ignored_names}
+        self._ignored_extensions = {extension.lower() for extension in ignored_extensions}
+
+    def excludes(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Whether an exclude pattern matches a path
+
+        Args:
+            path: POSIX path as walked (including the walk's root)
+            is_dir: The path is a directory
+        """
+        pattern = self._exclude_dirs if is_dir else self._exclude
+        return pattern is not None and pattern.search(path) is not None
+
+    def excludes_relative(self, root: str, relative: str) -> bool:
+        """
+        Whether a file below root is excluded, by itself or by any directory on its way
+
+        Args:
+            root: POSIX path of the walk's root
+            relative: POSIX path of the file relative to root
+        """
+        parts = relative.split('/')
+        prefix = root
+        for part in parts[:-1]:
+            prefix = f"{prefix}/{part}"
+            if self.excludes(prefix, is_dir=True):
+                return True
+        return self.excludes(f"{prefix}/{parts[-1]}")
+
+    def ignores(self, name: str) -> bool:
+        """Whether a file name is ignored silently (see FileTypeDetector.should_ignore)"""
+        name = name.lower()
+        return name in self._ignored_names or os.path.splitext(name)[1] in self._ignored_extensions
+
+
+class TreeScan:
+    """Result of one directory walk"""
+
+    def __init__(self):
+        # Files to sync and subdirectories, parents before their children
+        self.files: List[Path] = []
+        self.dirs: List[Path] = []
+        # Files and directories matching an exclude pattern (pruned directories count once)
+        self.excluded = 0
+        # Files matching an ignore rule
+        self.ignored = 0
+
+
+def scan_tree(root: Path, recursive: bool = True, matcher: Optional[PathMatcher] = None) -> TreeScan:
+    """
+    List the files and subdirectories under a directory in one pass
+
+    Args:
+        root: Directory to walk
+        recursive: Descend into subdirectories (otherwise only root's entries)
+        matcher: Exclude and ignore rules applied while walking
+
+    Returns:
+        TreeScan of the directory; unreadable directories are skipped
+    """
+    root = Path(root)
+    scan = TreeScan()
+    pending = [(root, root.as_posix())]
+
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    posix_path = f"{prefix}/{entry.name}"
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if matcher is not None and matcher.excludes(posix_path, is_dir=True):
+                                scan.excluded += 1
+                                continue
+                            path = directory / entry.name
+                            scan.dirs.append(path)
+                            if recursive:
+                                pending.append((path, posix_path))
+                        elif entry.is_file():
+                            if matcher is not None:
+                                if matcher.excludes(posix_path):
+                                    scan.excluded += 1
+                                    continue
+                                if matcher.ignores(entry.name):
+                                    scan.ignored += 1
+                                    continue
+                            scan.files.append(directory / entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+    return scan
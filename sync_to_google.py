@@ -13,7 +13,10 @@ from pathlib import Path
 # Add src to Python path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from drive_sync.sync import GoogleDriveSync
+from drive_sync.cache import DEFAULT_HASH_ALGORITHM
+from drive_sync.gdrive import DEFAULT_UPLOAD_CHUNK_SIZE
+from drive_sync.sync import DEFAULT_SHEETS_CHUNK_ROWS, GoogleDriveSync
+from drive_sync.ratelimit import IntervalRateLimiter, TokenBucketRateLimiter, limits_from_env
 
 
 def setup_logging():
@@ -37,9 +40,27 @@ def main():
     # Configuration from environment
     folder_id = os.getenv('GOOGLE_DRIVE_FOLDER_ID')
     sync_paths = os.getenv('SYNC_PATHS', 'docs').split(',')
-    rate_limit_delay = float(os.getenv('RATE_LIMIT_DELAY', '0.5'))
     batch_size = int(os.getenv('BATCH_SIZE', '10'))
     enable_mermaid = os.getenv('ENABLE_MERMAID', 'true').lower() == 'true'
+    workers = int(os.getenv('SYNC_WORKERS', '1'))
+    render_workers = int(os.getenv('MERMAID_RENDER_WORKERS', '4'))
+    paranoid = os.getenv('CACHE_PARANOID', 'false').lower() == 'true'
+    cache_backend = os.getenv('CACHE_BACKEND', 'json').lower()
+    cache_flush_interval = float(os.getenv('CACHE_FLUSH_INTERVAL', '2'))
+    hash_algorithm = os.getenv('CACHE_HASH_ALGORITHM', DEFAULT_HASH_ALGORITHM).lower()
+    hash_workers = int(os.getenv('HASH_WORKERS', '4'))
+    upload_chunk_size = int(os.getenv('UPLOAD_CHUNK_SIZE', str(DEFAULT_UPLOAD_CHUNK_SIZE)))
+    incremental_sheets = os.getenv('SHEETS_INCREMENTAL', 'true').lower() == 'true'
+    sheets_stream_threshold = int(float(os.getenv('SHEETS_STREAM_MB', '20')) * 1024 * 1024)
+    sheets_chunk_rows = int(os.getenv('SHEETS_CHUNK_ROWS', str(DEFAULT_SHEETS_CHUNK_ROWS)))
+    scan_mode = os.getenv('SYNC_SCAN_MODE', 'walk').lower()
+    render_cache_max_bytes = int(float(os.getenv('RENDER_CACHE_MAX_MB', '200')) * 1024 * 1024)
+
+    # RATE_LIMIT_DELAY forces the legacy fixed delay; otherwise per-API token buckets are used
+    if os.getenv('RATE_LIMIT_DELAY'):
+        rate_limiter = IntervalRateLimiter(float(os.environ['RATE_LIMIT_DELAY']))
+    else:
+        rate_limiter = TokenBucketRateLimiter(limits_from_env())
 
     if not folder_id:
         logger.error("❌ GOOGLE_DRIVE_FOLDER_ID not set in environment")
@@ -48,6 +69,7 @@ def main():
     logger.info(f"📂 Target folder ID: {folder_id}")
     logger.info(f"📝 Paths to sync: {', '.join(sync_paths)}")
     logger.info(f"🎨 Mermaid diagrams: {'enabled' if enable_mermaid else 'disabled'}")
+    logger.info(f"⚡ Sync workers: {workers}")
     logger.info("")
 
     try:
@@ -56,9 +78,22 @@ def main():
             credentials_file='credentials.json',
             folder_id=folder_id,
             use_cache=True,
-            rate_limit_delay=rate_limit_delay,
+            rate_limiter=rate_limiter,
             batch_size=batch_size,
-            enable_mermaid=enable_mermaid
+            enable_mermaid=enable_mermaid,
+            workers=workers,
+            render_workers=render_workers,
+            paranoid=paranoid,
+            cache_backend=cache_backend,
+            cache_flush_interval=cache_flush_interval,
+            hash_algorithm=hash_algorithm,
+            hash_workers=hash_workers,
+            upload_chunk_size=upload_chunk_size,
+            incremental_sheets=incremental_sheets,
+            sheets_stream_threshold=sheets_stream_threshold,
+            sheets_chunk_rows=sheets_chunk_rows,
+            scan_mode=scan_mode,
+            render_cache_max_bytes=render_cache_max_bytes
         )
 
         # Sync each configured path
@@ -4,9 +4,13 @@ Tests for sync cache functionality.
 Tests file hashing, cache storage, and sync decision logic.
 """
 
+import os
+import time
 import pytest
 import json
 from pathlib import Path
+from unittest.mock import patch
+from src.drive_sync import cache as cache_module
 from src.drive_sync.cache import SyncCache
 
 
@@ -105,6 +109,108 @@ class TestFileHashing:
         assert SyncCache.get_file_hash(file1) != SyncCache.get_file_hash(file2)
 
 
+class TestHashAlgorithms:
+    """Test buffered/mmap hashing and per-entry algorithms."""
+
+    @pytest.mark.parametrize('algorithm', ['md5', 'sha256', 'blake2b'])
+    def test_matches_hashlib(self, tmp_path, algorithm):
+        """Test that every read path produces the hashlib digest."""
+        import hashlib
+
+        data = os.urandom(3 * 1024 * 1024 + 17)
+        test_file = tmp_path / "data.bin"
+        test_file.write_bytes(data)
+        expected = hashlib.new(algorithm, data).hexdigest()
+
+        assert SyncCache.get_file_hash(test_file, algorithm) == expected
+        with patch.object(cache_module, 'HASH_MMAP_THRESHOLD', 1024):
+            assert SyncCache.get_file_hash(test_file, algorithm) == expected
+        with patch.object(cache_module, 'HASH_BUFFER_SIZE', 4096):
+            assert SyncCache.get_file_hash(test_file, algorithm) == expected
+
+    def test_empty_file(self, tmp_path):
+        """Test hashing an empty file."""
+        test_file = tmp_path / "empty.txt"
+        test_file.write_bytes(b'')
+
+        assert SyncCache.get_file_hash(test_file) == 'd41d8cd98f00b204e9800998ecf8427e'
+
+    def test_unknown_algorithm(self):
+        """Test that an unsupported algorithm is rejected."""
+        with pytest.raises(ValueError):
+            SyncCache(hash_algorithm='crc32')
+
+    def test_update_records_algorithm(self, tmp_path):
+        """Test that new entries use and record the configured algorithm."""
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+        cache = SyncCache(hash_algorithm='blake2b')
+
+        cache.update(test_file, 'drive_1')
+
+        entry = cache.cache[str(test_file)]
+        assert entry['hash_algorithm'] == 'blake2b'
+        assert entry['hash'] == SyncCache.get_file_hash(test_file, 'blake2b')
+
+    def test_legacy_entry_stays_valid(self, tmp_path):
+        """Test that an MD5 entry without a recorded algorithm is still matched."""
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+        cache = SyncCache(hash_algorithm='blake2b')
+        cache.cache = {str(test_file): {'hash': SyncCache.get_file_hash(test_file), 'drive_id': 'd'}}
+
+        assert cache.should_sync(test_file) == (False, "already synced")
+
+    def test_unavailable_algorithm_rehashed(self, tmp_path):
+        """Test that an xxh3 entry without xxhash installed is resynced, not an error."""
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+        cache = SyncCache(hash_algorithm='sha256')
+        cache.cache = {str(test_file): {'hash': 'abc', 'hash_algorithm': 'xxh3_128', 'drive_id': 'd'}}
+
+        with patch.object(cache_module, 'xxhash', None):
+            assert SyncCache.get_file_hash(test_file, 'xxh3_128') is None
+            assert cache.should_sync(test_file) == (True, "file modified")
+            cache.update(test_file, 'd')
+
+        entry = cache.cache[str(test_file)]
+        assert entry['hash_algorithm'] == 'sha256'
+        assert entry['hash'] == SyncCache.get_file_hash(test_file, 'sha256')
+
+    def test_prehash_results_are_reused(self, tmp_path):
+        """Test that files hashed by prehash are not hashed again while syncing."""
+        files = []
+        for i in range(5):
+            path = tmp_path / f"doc{i}.md"
+            path.write_text(f"Content {i}")
+            files.append(path)
+        cache = SyncCache()
+
+        with patch.object(SyncCache, 'get_file_hash', wraps=SyncCache.get_file_hash) as get_hash:
+            cache.prehash(files, workers=3)
+            assert get_hash.call_count == 5
+            for path in files:
+                assert cache.should_sync(path) == (True, "new file")
+                cache.update(path, 'drive_id')
+
+        assert get_hash.call_count == 5
+
+    def test_prehash_ignores_stale_results(self, tmp_path):
+        """Test that a file changed after prehash is hashed again."""
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+        cache = SyncCache()
+        cache.update(test_file, 'drive_id')
+        test_file.write_text("Changed content!")
+
+        cache.prehash([test_file])
+        test_file.write_text("Changed again, longer")
+
+        assert cache.should_sync(test_file) == (True, "file modified")
+        cache.update(test_file, 'drive_id')
+        assert cache.cache[str(test_file)]['hash'] == SyncCache.get_file_hash(test_file)
+
+
 class TestShouldSync:
     """Test sync decision logic."""
 
@@ -202,6 +308,97 @@ class TestCacheUpdate:
         assert entry['hash'] != 'old_hash'
 
 
+class TestStatFastPath:
+    """Test skipping the hash when size/mtime/inode are unchanged."""
+
+    def _synced(self, tmp_path, **kwargs):
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+        cache = SyncCache(**kwargs)
+        cache.update(test_file, 'drive_id_123')
+        return cache, test_file
+
+    def test_update_records_stat(self, tmp_path):
+        """Test that size, mtime_ns and inode are stored."""
+        cache, test_file = self._synced(tmp_path)
+        st = test_file.stat()
+
+        entry = cache.cache[str(test_file)]
+
+        assert entry['size'] == st.st_size
+        assert entry['mtime_ns'] == st.st_mtime_ns
+        assert entry['inode'] == st.st_ino
+
+    def test_unchanged_stat_skips_hash(self, tmp_path):
+        """Test that an unchanged file is not read."""
+        cache, test_file = self._synced(tmp_path)
+
+        with patch.object(SyncCache, 'get_file_hash') as get_hash:
+            assert cache.should_sync(test_file) == (False, "already synced")
+
+        get_hash.assert_not_called()
+
+    def test_paranoid_always_hashes(self, tmp_path):
+        """Test that paranoid mode rehashes unchanged files."""
+        cache, test_file = self._synced(tmp_path, paranoid=True)
+
+        with patch.object(SyncCache, 'get_file_hash', wraps=SyncCache.get_file_hash) as get_hash:
+            assert cache.should_sync(test_file) == (False, "already synced")
+
+        get_hash.assert_called_once()
+
+    def test_modified_file_detected(self, tmp_path):
+        """Test that a content change is still detected."""
+        cache, test_file = self._synced(tmp_path)
+        test_file.write_text("Changed content")
+
+        assert cache.should_sync(test_file) == (True, "file modified")
+
+    def test_touched_file_refreshes_stat(self, tmp_path):
+        """Test that a touched but unchanged file is hashed once, then fast-pathed."""
+        cache, test_file = self._synced(tmp_path)
+        st = test_file.stat()
+        os.utime(test_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        assert cache.should_sync(test_file) == (False, "already synced")
+        with patch.object(SyncCache, 'get_file_hash') as get_hash:
+            assert cache.should_sync(test_file) == (False, "already synced")
+        get_hash.assert_not_called()
+
+    def test_update_reuses_should_sync_hash(self, tmp_path):
+        """Test that update does not hash a file checked in the same run."""
+        test_file = tmp_path / "new.md"
+        test_file.write_text("Content")
+        cache = SyncCache()
+
+        assert cache.should_sync(test_file) == (True, "new file")
+        with patch.object(SyncCache, 'get_file_hash') as get_hash:
+            cache.update(test_file, 'drive_id_123')
+
+        get_hash.assert_not_called()
+        assert cache.cache[str(test_file)]['hash'] == SyncCache.get_file_hash(test_file)
+
+
+class TestDriveIdLookup:
+    """Test reading back cached Drive IDs."""
+
+    def test_get_drive_id(self, tmp_path):
+        """Test that the synced Drive ID is returned for a cached file."""
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+
+        cache = SyncCache()
+        cache.update(test_file, 'drive_id_123')
+
+        assert cache.get_drive_id(test_file) == 'drive_id_123'
+
+    def test_get_drive_id_unknown_file(self, tmp_path):
+        """Test that unknown files have no Drive ID."""
+        cache = SyncCache()
+
+        assert cache.get_drive_id(tmp_path / "unknown.md") is None
+
+
 class TestCachePersistence:
     """Test cache save and load functionality."""
 
@@ -261,6 +458,281 @@ class TestCachePersistence:
         assert data == {'test': {'data': 'value'}}
 
 
+class TestWriteBehind:
+    """Test atomic JSON writes and the background flusher."""
+
+    def test_json_is_compact(self, tmp_path):
+        """Test that the JSON cache is written without indentation."""
+        cache_file = tmp_path / "cache.json"
+        cache = SyncCache(cache_file=str(cache_file))
+        cache.cache = {'a': {'hash': 'h'}}
+        cache.save()
+
+        assert cache_file.read_text() == '{"a":{"hash":"h"}}'
+
+    def test_failed_write_keeps_previous_cache(self, tmp_path):
+        """Test that an interrupted save leaves the old file and no temp files."""
+        cache_file = tmp_path / "cache.json"
+        cache = SyncCache(cache_file=str(cache_file))
+        cache.cache = {'a': {'hash': 'h1'}}
+        cache.save()
+
+        cache.cache = {'a': {'hash': 'h2'}}
+        with patch('src.drive_sync.cache_store.json.dump', side_effect=OSError('disk full')):
+            cache.save()
+
+        assert json.loads(cache_file.read_text()) == {'a': {'hash': 'h1'}}
+        assert [p.name for p in tmp_path.iterdir()] == ['cache.json']
+
+        # The failed entries stay dirty and are written by the next save
+        cache.save()
+        assert json.loads(cache_file.read_text()) == {'a': {'hash': 'h2'}}
+
+    def test_corrupt_cache_is_kept(self, tmp_path):
+        """Test that an unreadable cache is moved aside rather than overwritten."""
+        cache_file = tmp_path / "cache.json"
+        cache_file.write_text('{"a": {"ha')
+
+        SyncCache(cache_file=str(cache_file)).load()
+
+        assert not cache_file.exists()
+        assert (tmp_path / "cache.json.corrupt").read_text() == '{"a": {"ha'
+
+    def test_clean_save_skips_write(self, tmp_path):
+        """Test that saving without changes does not rewrite the file."""
+        cache_file = tmp_path / "cache.json"
+        cache = SyncCache(cache_file=str(cache_file))
+        cache.cache = {'a': {'hash': 'h'}}
+        cache.save()
+
+        with patch.object(cache.store, 'save') as store_save:
+            cache.save()
+
+        store_save.assert_not_called()
+
+    def test_changes_flushed_in_background(self, tmp_path):
+        """Test that updates reach disk within the flush interval without save()."""
+        test_file = tmp_path / "test.md"
+        test_file.write_text("content")
+        cache_file = tmp_path / "cache.json"
+        cache = SyncCache(cache_file=str(cache_file), flush_interval=0.05)
+
+        cache.update(test_file, "drive_1")
+
+        deadline = time.monotonic() + 5
+        while not cache_file.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert json.loads(cache_file.read_text())[str(test_file)]['drive_id'] == 'drive_1'
+        cache.close()
+
+    def test_schedule_save_does_not_block(self, tmp_path):
+        """Test that schedule_save returns before the flusher writes."""
+        cache = SyncCache(cache_file=str(tmp_path / "cache.json"), flush_interval=60)
+        cache.cache = {'a': {'hash': 'h'}}
+
+        with patch.object(cache, '_save') as save:
+            cache.schedule_save()
+            save.assert_not_called()
+
+        cache.close()
+        assert json.loads((tmp_path / "cache.json").read_text()) == {'a': {'hash': 'h'}}
+
+    def test_close_flushes_pending_changes(self, tmp_path):
+        """Test that close writes changes without waiting for the interval."""
+        test_file = tmp_path / "test.md"
+        test_file.write_text("content")
+        cache_file = tmp_path / "cache.json"
+        cache = SyncCache(cache_file=str(cache_file), flush_interval=60)
+        cache.update(test_file, "drive_1")
+
+        start = time.monotonic()
+        cache.close()
+
+        assert time.monotonic() - start < 5
+        assert str(test_file) in json.loads(cache_file.read_text())
+
+    def test_schedule_save_without_interval_is_synchronous(self, tmp_path):
+        """Test that schedule_save writes immediately when no flusher is configured."""
+        cache_file = tmp_path / "cache.json"
+        cache = SyncCache(cache_file=str(cache_file))
+        cache.cache = {'a': {'hash': 'h'}}
+
+        cache.schedule_save()
+
+        assert cache_file.exists()
+
+
+class TestMetadata:
+    """Test metadata namespaces stored alongside file entries."""
+
+    def test_json_round_trip(self, tmp_path):
+        """Test that metadata is saved under its own key and not loaded as an entry."""
+        cache_file = tmp_path / "cache.json"
+        cache = SyncCache(cache_file=str(cache_file))
+        cache.cache = {'a.md': {'hash': 'h'}}
+        cache.set_meta('folders', 'root/docs', 'folder-1')
+        cache.save()
+
+        reloaded = SyncCache(cache_file=str(cache_file))
+        reloaded.load()
+
+        assert reloaded.cache == {'a.md': {'hash': 'h'}}
+        assert reloaded.get_meta('folders', 'root/docs') == 'folder-1'
+        assert json.loads(cache_file.read_text())['__meta__'] == {'folders': {'root/docs': 'folder-1'}}
+
+    def test_metadata_change_triggers_save(self, tmp_path):
+        """Test that a metadata-only change is written by save."""
+        cache_file = tmp_path / "cache.json"
+        cache = SyncCache(cache_file=str(cache_file))
+        cache.save()
+
+        cache.set_meta('folders', 'root/docs', 'folder-1')
+        cache.delete_meta('folders', 'missing')
+        cache.save()
+
+        assert '__meta__' in json.loads(cache_file.read_text())
+
+    def test_find_and_delete(self):
+        """Test reverse lookup and removal of metadata values."""
+        cache = SyncCache()
+        cache.set_meta('folders', 'root/a', 'id-1')
+        cache.set_meta('folders', 'root/b', 'id-2')
+
+        assert cache.find_meta('folders', 'id-2') == ['root/b']
+        cache.delete_meta('folders', 'root/b')
+        assert cache.get_meta('folders', 'root/b') is None
+        assert cache.meta_keys('folders') == ['root/a']
+
+    def test_sqlite_round_trip(self, tmp_path):
+        """Test that metadata is committed immediately in the SQLite store."""
+        cache_file = str(tmp_path / "cache.json")
+        cache = SyncCache(cache_file=cache_file, backend='sqlite')
+        cache.set_meta('folders', 'root/docs', 'folder-1')
+        cache.set_meta('folders', 'root/old', 'folder-2')
+        cache.delete_meta('folders', 'root/old')
+
+        reloaded = SyncCache(cache_file=cache_file, backend='sqlite')
+        reloaded.load()
+
+        assert reloaded.meta == {'folders': {'root/docs': 'folder-1'}}
+
+
+class TestSQLiteBackend:
+    """Test the SQLite cache store."""
+
+    def test_update_is_committed_immediately(self, tmp_path):
+        """Test that synced entries survive without an explicit save."""
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+        cache_file = str(tmp_path / "cache" / ".sync_cache.json")
+
+        cache1 = SyncCache(cache_file=cache_file, backend='sqlite')
+        cache1.load()
+        cache1.update(test_file, 'drive_id_123')
+
+        cache2 = SyncCache(cache_file=cache_file, backend='sqlite')
+        loaded = cache2.load()
+
+        assert cache1.cache_file.endswith('.sync_cache.db')
+        assert loaded[str(test_file)]['drive_id'] == 'drive_id_123'
+        assert loaded[str(test_file)]['size'] == test_file.stat().st_size
+
+    def test_wal_mode(self, tmp_path):
+        """Test that the database uses write-ahead logging."""
+        cache = SyncCache(cache_file=str(tmp_path / "c.json"), backend='sqlite')
+
+        mode = cache.store.conn.execute('PRAGMA journal_mode').fetchone()[0]
+
+        assert mode == 'wal'
+
+    def test_close_closes_connection(self, tmp_path):
+        """Test that closing the cache saves and closes the database."""
+        import sqlite3
+
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+        cache = SyncCache(cache_file=str(tmp_path / "c.json"), backend='sqlite')
+        cache.load()
+        cache.update(test_file, 'drive_id_123')
+
+        cache.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            cache.store.conn.execute('SELECT 1')
+        reopened = SyncCache(cache_file=str(tmp_path / "c.json"), backend='sqlite')
+        assert reopened.load()[str(test_file)]['drive_id'] == 'drive_id_123'
+
+    def test_adds_hash_algorithm_column(self, tmp_path):
+        """Test that databases from before hash algorithms were recorded are upgraded."""
+        import sqlite3
+
+        db = tmp_path / "c.db"
+        conn = sqlite3.connect(str(db))
+        conn.execute(
+            'CREATE TABLE files (path TEXT PRIMARY KEY, hash TEXT, drive_id TEXT, last_sync TEXT, '
+            'size INTEGER, mtime_ns INTEGER, inode INTEGER, extra TEXT)'
+        )
+        conn.execute("INSERT INTO files (path, hash, drive_id) VALUES ('a.md', 'h', 'd')")
+        conn.commit()
+        conn.close()
+
+        cache = SyncCache(cache_file=str(tmp_path / "c.json"), backend='sqlite')
+
+        assert cache.load() == {'a.md': {'hash': 'h', 'drive_id': 'd'}}
+
+    def test_migrates_json_cache(self, tmp_path):
+        """Test that an existing JSON cache is imported once."""
+        cache_file = tmp_path / ".sync_cache_abc.json"
+        cache_file.write_text(json.dumps({
+            '/docs/a.md': {'hash': 'h1', 'drive_id': 'd1', 'last_sync': '2025-01-01T00:00:00'},
+            '/docs/b.md': {'hash': 'h2', 'drive_id': 'd2', 'custom': [1, 2]},
+            '__meta__': {'folders': {'root/docs': 'folder-1'}},
+        }))
+
+        cache = SyncCache(cache_file=str(cache_file), backend='sqlite')
+        loaded = cache.load()
+
+        assert loaded['/docs/a.md'] == {'hash': 'h1', 'drive_id': 'd1', 'last_sync': '2025-01-01T00:00:00'}
+        assert loaded['/docs/b.md']['custom'] == [1, 2]
+        assert '__meta__' not in loaded
+        assert cache.get_meta('folders', 'root/docs') == 'folder-1'
+        assert not cache_file.exists()
+        assert (tmp_path / ".sync_cache_abc.json.migrated").exists()
+
+    def test_find_path_by_drive_id(self, tmp_path):
+        """Test reverse lookup through the drive_id index."""
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+        cache = SyncCache(cache_file=str(tmp_path / "c.json"), backend='sqlite')
+        cache.load()
+        cache.update(test_file, 'drive_id_123')
+
+        assert cache.find_path_by_drive_id('drive_id_123') == str(test_file)
+        assert cache.find_path_by_drive_id('unknown') is None
+
+    def test_save_writes_refreshed_entries(self, tmp_path):
+        """Test that save persists entries changed outside update()."""
+        test_file = tmp_path / "doc.md"
+        test_file.write_text("Content")
+        cache_file = str(tmp_path / "c.json")
+        cache = SyncCache(cache_file=cache_file, backend='sqlite')
+        cache.load()
+        cache.update(test_file, 'drive_id_123')
+        st = test_file.stat()
+        os.utime(test_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        cache.should_sync(test_file)
+        cache.save()
+
+        reloaded = SyncCache(cache_file=cache_file, backend='sqlite').load()
+        assert reloaded[str(test_file)]['mtime_ns'] == st.st_mtime_ns + 10**9
+
+    def test_unknown_backend(self):
+        """Test that unknown backends are rejected."""
+        with pytest.raises(ValueError):
+            SyncCache(backend='redis')
+
+
 class TestCacheStats:
     """Test cache statistics."""
 
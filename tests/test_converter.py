@@ -5,6 +5,7 @@ Tests Markdown processing, Mermaid extraction, image extraction,
 and file type detection.
 """
 
+import os
 import pytest
 import tempfile
 from pathlib import Path
@@ -14,6 +15,7 @@ from src.drive_sync.converter import (
     PDFConverter,
     FileTypeDetector
 )
+from src.drive_sync.markdown_rewriter import MarkdownRewriter
 
 
 class TestMermaidExtraction:
@@ -223,6 +225,78 @@ class TestImageExtraction:
         assert '[IMAGE:' in modified
 
 
+class TestSinglePassRewriter:
+    """Test the single-pass tokenizer behind prepare_for_upload."""
+
+    def test_combined_rewrite(self, tmp_path):
+        """Test diagrams, images, code blocks and inline code in one document."""
+        (tmp_path / 'shot.png').write_bytes(b'PNG')
+        md_file = tmp_path / 'doc.md'
+        rewriter = MarkdownRewriter(md_file)
+
+        result = rewriter.rewrite(
+            "Run `make`.\n\n![Shot](shot.png)\n\n```bash\necho hi\n```\n\n"
+            "```mermaid\ngraph TD\n    A --> B\n```\nSee `shot.png`.\n"
+        )
+
+        marker = rewriter.images[0]['name']
+        diagram = rewriter.diagrams[0]['name']
+        assert result == (
+            f"Run ⟨ make ⟩.\n\n\n[IMAGE:{marker}]\n\n\n"
+            "\n═══ CODE (BASH) ═══\n    echo hi\n    \n═══════════════════\n\n\n"
+            f"\n[DIAGRAM:{diagram}]\n\nSee [IMAGE:{marker}].\n"
+        )
+        assert len(rewriter.images) == 1
+        assert rewriter.diagrams[0]['code'] == 'graph TD\n    A --> B'
+
+    def test_unterminated_fence_runs_to_end(self):
+        """Test that an unclosed fence is code to the end of the document, not a diagram."""
+        md_content = "Intro\n\n```mermaid\ngraph TD\n\nText `x`\n"
+
+        content, diagrams = MarkdownConverter.extract_mermaid_diagrams(md_content)
+        formatted = MarkdownRewriter().rewrite(md_content)
+
+        assert diagrams == []
+        assert content == md_content
+        assert formatted.startswith('Intro\n\n\n═══ CODE (MERMAID) ═══\n    graph TD\n')
+        assert '    Text `x`' in formatted
+
+    def test_fence_with_info_string_does_not_close(self):
+        """Test that ```python inside a block does not end it (CommonMark)."""
+        md_content = "```mermaid\ngraph TD\n```python\n```\nafter\n"
+
+        content, diagrams = MarkdownConverter.extract_mermaid_diagrams(md_content)
+
+        assert diagrams[0]['code'] == 'graph TD\n```python'
+        assert content.endswith(']\n\nafter\n')
+
+    def test_code_block_contents_untouched(self, tmp_path):
+        """Test that backticks and image references inside code blocks are kept."""
+        (tmp_path / 'shot.png').write_bytes(b'PNG')
+        rewriter = MarkdownRewriter(tmp_path / 'doc.md')
+
+        result = rewriter.rewrite("```sh\necho `date` ![x](shot.png)\n```\n")
+
+        assert '    echo `date` ![x](shot.png)' in result
+        assert rewriter.images == []
+
+    def test_longer_fence_contains_shorter(self):
+        """Test that a ```` fence is only closed by a fence at least as long."""
+        result = MarkdownConverter.preprocess_markdown_for_google_docs(
+            "````md\n```python\nx\n```\n````\nafter `y`\n"
+        )
+
+        assert '    ```python' in result
+        assert result.count('═══ CODE (MD) ═══') == 1
+        assert result.endswith('after ⟨ y ⟩\n')
+
+    def test_inline_code_does_not_cross_paragraphs(self):
+        """Test that an unmatched backtick is left alone."""
+        result = MarkdownConverter.preprocess_markdown_for_google_docs("a ` b\n\nc `d` e\n")
+
+        assert result == "a ` b\n\nc ⟨ d ⟩ e\n"
+
+
 class TestFileTypeDetector:
     """Test file type detection and converter selection."""
 
@@ -346,14 +420,27 @@ graph TD
 
         assert result['name'] == 'test_doc'
         assert result['mimeType'] == 'text/markdown'
-        assert 'temp_file' in result
+        assert 'temp_file' not in result
         assert len(result['diagrams']) == 1
 
-        # Verify temp file content
-        with open(result['temp_file'], 'r') as f:
-            content = f.read()
-            assert '⟨ inline code ⟩' in content
-            assert '[DIAGRAM:' in content
+        # Verify processed content
+        content = result['content'].decode('utf-8')
+        assert '⟨ inline code ⟩' in content
+        assert '[DIAGRAM:' in content
+
+    def test_large_markdown_spooled_to_temp_file(self, tmp_path):
+        """Test that documents above the memory limit are written to a temp file."""
+        md_file = tmp_path / "big.md"
+        md_file.write_text("# Big\n\n" + "text " * 100)
+
+        result = MarkdownConverter.prepare_for_upload(md_file, memory_limit=64)
+
+        assert 'content' not in result
+        try:
+            with open(result['temp_file'], 'r', encoding='utf-8') as f:
+                assert f.read().startswith('# Big')
+        finally:
+            os.unlink(result['temp_file'])
 
     def test_prepare_csv_file(self, tmp_path):
         """Test preparing a CSV file for upload."""
@@ -0,0 +1,121 @@
+"""
+Tests for Google Docs image embedding.
+
+Tests marker discovery and the single batchUpdate that embeds every
+diagram/image and converts anchor links.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from src.drive_sync.gdocs import GoogleDocsService
+
+
+def paragraph(text, start_index, link=None):
+    """Build a document paragraph with one text run."""
+    text_run = {'content': text}
+    if link:
+        text_run['textStyle'] = {'link': {'url': link}}
+    return {
+        'paragraph': {
+            'elements': [
+                {'textRun': text_run, 'startIndex': start_index, 'endIndex': start_index + len(text)}
+            ]
+        }
+    }
+
+
+@pytest.fixture
+def document():
+    """A document with a heading, two image markers, a diagram and an anchor link."""
+    heading = {
+        'paragraph': {
+            'paragraphStyle': {'namedStyleType': 'HEADING_1', 'headingId': 'h.intro'},
+            'elements': [{'textRun': {'content': 'Intro\n'}, 'startIndex': 1}]
+        }
+    }
+    return {
+        'body': {
+            'content': [
+                heading,
+                paragraph('[IMAGE:shot]\n', 10),
+                paragraph('[DIAGRAM:flow]\n', 30),
+                paragraph('Intro', 50, link='#intro'),
+                paragraph('[IMAGE:shot]\n', 70),
+            ]
+        }
+    }
+
+
+def make_gdocs(document):
+    """Build a GoogleDocsService whose documents().get returns `document`."""
+    docs_service = MagicMock()
+    docs_service.documents.return_value.get.return_value.execute.return_value = document
+    gdocs = GoogleDocsService.__new__(GoogleDocsService)
+    gdocs.docs_service = docs_service
+    return gdocs, docs_service
+
+
+def embed(kind, name, url):
+    return {'kind': kind, 'name': name, 'image_url': url, 'width_pt': 100, 'height_pt': 50}
+
+
+class TestEmbedImages:
+    """Test single-request embedding."""
+
+    def test_find_markers(self, document):
+        """Test that markers are found by kind with absolute indices."""
+        images = GoogleDocsService._find_markers(document, 'IMAGE')
+        diagrams = GoogleDocsService._find_markers(document, 'DIAGRAM')
+
+        assert [(m['name'], m['index'], m['length']) for m in images] == [('shot', 10, 12), ('shot', 70, 12)]
+        assert [(m['name'], m['index']) for m in diagrams] == [('flow', 30)]
+
+    def test_one_get_and_one_batch_update(self, document):
+        """Test that all embeds and anchor links go in one descending-index request."""
+        gdocs, docs_service = make_gdocs(document)
+
+        embedded, converted = gdocs.embed_images('doc-id', [
+            embed('IMAGE', 'shot', 'url-1'),
+            embed('DIAGRAM', 'flow', 'url-2'),
+            embed('IMAGE', 'shot', 'url-3'),
+        ])
+
+        assert (embedded, converted) == (3, 1)
+        assert docs_service.documents.return_value.get.call_count == 1
+        assert docs_service.documents.return_value.batchUpdate.call_count == 1
+
+        requests = docs_service.documents.return_value.batchUpdate.call_args[1]['body']['requests']
+        indices = []
+        for request in requests:
+            if 'deleteContentRange' in request:
+                indices.append(request['deleteContentRange']['range']['startIndex'])
+            elif 'updateTextStyle' in request:
+                indices.append(request['updateTextStyle']['range']['startIndex'])
+        assert indices == [70, 50, 30, 10]
+
+        # Repeated names consume markers in document order
+        inserts = [r['insertInlineImage'] for r in requests if 'insertInlineImage' in r]
+        assert [(i['location']['index'], i['uri']) for i in inserts] == [
+            (70, 'url-3'), (30, 'url-2'), (10, 'url-1')
+        ]
+
+    def test_missing_marker_is_skipped(self, document):
+        """Test that an embed without a marker does not block the others."""
+        gdocs, docs_service = make_gdocs(document)
+
+        embedded, converted = gdocs.embed_images(
+            'doc-id', [embed('DIAGRAM', 'missing', 'url'), embed('DIAGRAM', 'flow', 'url')],
+            convert_anchor_links=False
+        )
+
+        assert (embedded, converted) == (1, 0)
+        requests = docs_service.documents.return_value.batchUpdate.call_args[1]['body']['requests']
+        assert len(requests) == 2
+
+    def test_nothing_to_do_skips_update(self):
+        """Test that no batchUpdate is sent when there is nothing to change."""
+        gdocs, docs_service = make_gdocs({'body': {'content': []}})
+
+        assert gdocs.embed_images('doc-id', []) == (0, 0)
+        docs_service.documents.return_value.batchUpdate.assert_not_called()
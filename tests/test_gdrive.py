@@ -0,0 +1,65 @@
+"""
+Tests for Google Drive file uploads.
+
+Tests that files are streamed from disk as chunked resumable uploads and
+that chunk sizes are validated.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from googleapiclient.http import MediaFileUpload
+from src.drive_sync.gdrive import GoogleDriveService, check_chunk_size
+
+
+def make_gdrive(chunk_size=256 * 1024):
+    """Build a GoogleDriveService whose uploads finish after one chunk."""
+    def create(**params):
+        request = MagicMock()
+        request.resumable = params['media_body']
+        request.next_chunk.return_value = (None, {'id': 'file-1', 'name': params['body']['name']})
+        return request
+
+    service = MagicMock()
+    service.files.return_value.create.side_effect = create
+    gdrive = GoogleDriveService.__new__(GoogleDriveService)
+    gdrive.service = service
+    gdrive.chunk_size = chunk_size
+    return gdrive, service
+
+
+class TestUploadFile:
+    """Test streaming uploads from disk."""
+
+    def test_streams_file_in_chunks(self, tmp_path):
+        """Test that the file is uploaded as a resumable media body read per chunk."""
+        image = tmp_path / 'big.png'
+        image.write_bytes(b'x' * (3 * 256 * 1024 + 10))
+        gdrive, service = make_gdrive()
+
+        result = gdrive.upload_file(image, 'big.png', 'folder-1')
+
+        assert result['id'] == 'file-1'
+        media = service.files.return_value.create.call_args[1]['media_body']
+        assert isinstance(media, MediaFileUpload)
+        assert media.resumable()
+        assert media.chunksize() == 256 * 1024
+        assert media.size() == image.stat().st_size
+        assert service.files.return_value.create.call_args[1]['body'] == {
+            'name': 'big.png', 'parents': ['folder-1']
+        }
+
+
+class TestChunkSize:
+    """Test chunk size validation."""
+
+    def test_multiples_of_256_kib_accepted(self):
+        """Test that 256 KiB multiples are valid."""
+        assert check_chunk_size(256 * 1024) == 256 * 1024
+        assert check_chunk_size(8 * 1024 * 1024) == 8 * 1024 * 1024
+
+    @pytest.mark.parametrize('chunk_size', [0, -256 * 1024, 1000, 256 * 1024 + 1])
+    def test_invalid_sizes_rejected(self, chunk_size):
+        """Test that other sizes raise ValueError."""
+        with pytest.raises(ValueError):
+            check_chunk_size(chunk_size)
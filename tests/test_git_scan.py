@@ -0,0 +1,111 @@
+"""
+Tests for git-based change detection.
+
+Tests the candidate files reported by scan_git_changes in real temporary
+repositories: full listings, diffs against a recorded commit, dirty files
+and .gitignore handling.
+"""
+
+import shutil
+import subprocess
+
+import pytest
+from src.drive_sync.git_scan import GitScanError, scan_git_changes
+from src.drive_sync.walker import PathMatcher
+
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git not installed")
+
+
+def git(repo, *args):
+    subprocess.run(
+        ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+        cwd=repo, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+
+def head(repo):
+    return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo, check=True,
+                          stdout=subprocess.PIPE).stdout.decode().strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repository with docs/{a.md, b.md, guides/c.md}, build/ ignored, one commit."""
+    git(tmp_path, 'init', '-q')
+    docs = tmp_path / "docs"
+    (docs / "guides").mkdir(parents=True)
+    (docs / "build").mkdir()
+    for name in ("a.md", "b.md", "guides/c.md", "build/out.md"):
+        (docs / name).write_text(name)
+    (tmp_path / ".gitignore").write_text("build/\n")
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'initial')
+    return tmp_path
+
+
+def names(scan, docs):
+    return sorted(path.relative_to(docs).as_posix() for path in scan.files)
+
+
+class TestScanGitChanges:
+    """Test the files git reports for a directory."""
+
+    def test_full_listing_honours_gitignore(self, repo):
+        """Test that without a base commit every non-ignored file is listed."""
+        (repo / "docs" / "new.md").write_text("untracked")
+
+        scan = scan_git_changes(repo / "docs")
+
+        assert scan.base is None and scan.head == head(repo)
+        assert names(scan, repo / "docs") == ['a.md', 'b.md', 'guides/c.md', 'new.md']
+
+    def test_only_changes_since_base(self, repo):
+        """Test that committed, unstaged and untracked changes since base are listed."""
+        docs = repo / "docs"
+        base = head(repo)
+        (docs / "a.md").write_text("changed")
+        git(repo, 'commit', '-q', '-am', 'edit a')
+        (docs / "guides" / "c.md").write_text("unstaged")
+        (docs / "new.md").write_text("untracked")
+        (docs / "b.md").unlink()
+        (docs / "build" / "more.md").write_text("ignored")
+
+        scan = scan_git_changes(docs, base)
+
+        assert scan.base == base
+        assert names(scan, docs) == ['a.md', 'guides/c.md', 'new.md']
+        assert sorted(scan.dirty) == ['guides/c.md']
+
+    def test_previously_dirty_files_rechecked(self, repo):
+        """Test that a file dirty at the last sync is checked after being reverted."""
+        base = head(repo)
+
+        scan = scan_git_changes(repo / "docs", base, previously_dirty=['b.md'])
+
+        assert names(scan, repo / "docs") == ['b.md']
+
+    def test_unknown_base_lists_everything(self, repo):
+        """Test that a commit no longer in the repository falls back to a full listing."""
+        scan = scan_git_changes(repo / "docs", '0' * 40)
+
+        assert scan.base is None
+        assert len(scan.files) == 3
+
+    def test_excludes_and_non_recursive(self, repo):
+        """Test that exclude patterns and recursion apply to git candidates."""
+        docs = repo / "docs"
+
+        scan = scan_git_changes(docs, matcher=PathMatcher(['guides/', 'b.md']))
+        assert names(scan, docs) == ['a.md']
+        assert scan.excluded == 2
+
+        scan = scan_git_changes(docs, recursive=False)
+        assert names(scan, docs) == ['a.md', 'b.md']
+
+    def test_outside_work_tree_raises(self, tmp_path_factory):
+        """Test that a directory outside git is reported, not treated as empty."""
+        plain = tmp_path_factory.mktemp("plain")
+
+        with pytest.raises(GitScanError):
+            scan_git_changes(plain)
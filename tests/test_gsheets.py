@@ -0,0 +1,198 @@
+"""
+Tests for incremental Google Sheets updates.
+
+Tests row hashing and diffing, snapshot storage, chunked CSV reading and
+the Sheets requests that apply a diff or stream rows.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from src.drive_sync.gsheets import (
+    GoogleSheetsError, GoogleSheetsService, SheetSnapshots,
+    changed_ranges, hash_csv_rows, iter_csv_chunks, read_row_ranges
+)
+
+
+def write_csv(path, rows):
+    path.write_text(''.join(','.join(row) + '\n' for row in rows))
+    return path
+
+
+class TestRowDiff:
+    """Test hashing, diffing and reading back changed rows."""
+
+    def test_hashes_follow_parsed_rows(self, tmp_path):
+        """Test that quoting differences do not change a row's hash."""
+        plain = hash_csv_rows(write_csv(tmp_path / 'a.csv', [['x', 'y']]))
+        (tmp_path / 'b.csv').write_text('"x","y"\r\n')
+
+        assert hash_csv_rows(tmp_path / 'b.csv') == plain
+        assert plain[1] == 2
+
+    def test_invalid_text_raises_value_error(self, tmp_path):
+        """Test that non-UTF-8 files are reported as unparseable."""
+        (tmp_path / 'bin.csv').write_bytes(b'\xff\xfe\x00a')
+
+        with pytest.raises(ValueError):
+            hash_csv_rows(tmp_path / 'bin.csv')
+
+    def test_changed_ranges(self):
+        """Test that changed and appended rows are grouped into ranges."""
+        old = ['a', 'b', 'c', 'd', 'e']
+
+        assert changed_ranges(old, old) == []
+        assert changed_ranges(old, ['a', 'X', 'Y', 'd', 'Z']) == [(1, 3), (4, 5)]
+        assert changed_ranges(old, old + ['f', 'g']) == [(5, 7)]
+        assert changed_ranges(old, ['a', 'b']) == []
+
+    def test_read_row_ranges_pads_rows(self, tmp_path):
+        """Test that only requested rows are read, padded to the given width."""
+        csv_file = write_csv(tmp_path / 'data.csv', [['h1', 'h2', 'h3'], ['1'], ['2', '2'], ['3'], ['4']])
+
+        blocks = read_row_ranges(csv_file, [(1, 3), (4, 5)], columns=3)
+
+        assert blocks == [(1, [['1', '', ''], ['2', '2', '']]), (4, [['4', '', '']])]
+
+
+class TestCsvChunks:
+    """Test chunked CSV reading with resumable offsets."""
+
+    def test_chunks_resume_at_offsets(self, tmp_path):
+        """Test that reading from any chunk's offset continues with the next row."""
+        csv_file = tmp_path / 'big.csv'
+        csv_file.write_bytes('\ufeffid,note\r\n1,"two\nlines"\r\n2,é\r\n3,x\r\n4,y\r\n'.encode('utf-8'))
+
+        chunks = list(iter_csv_chunks(csv_file, 2))
+
+        assert [rows for rows, _ in chunks] == [
+            [['id', 'note'], ['1', 'two\nlines']], [['2', 'é'], ['3', 'x']], [['4', 'y']]
+        ]
+        assert chunks[-1][1] == csv_file.stat().st_size
+        resumed = list(iter_csv_chunks(csv_file, 2, chunks[0][1]))
+        assert resumed == chunks[1:]
+
+    def test_invalid_text_raises_value_error(self, tmp_path):
+        """Test that non-UTF-8 files are reported as unparseable."""
+        (tmp_path / 'bin.csv').write_bytes(b'a,b\n\xff\xfe\n')
+
+        with pytest.raises(ValueError):
+            list(iter_csv_chunks(tmp_path / 'bin.csv', 10))
+
+
+class TestSheetSnapshots:
+    """Test snapshot persistence."""
+
+    def test_round_trip_and_delete(self, tmp_path):
+        """Test that snapshots are stored per CSV and can be forgotten."""
+        snapshots = SheetSnapshots(str(tmp_path / 'sheets'))
+        csv_file = tmp_path / 'data.csv'
+
+        snapshots.put(csv_file, 'sheet-1', ['h1', 'h2'], 3)
+
+        assert SheetSnapshots(str(tmp_path / 'sheets')).get(csv_file) == {
+            'spreadsheet_id': 'sheet-1', 'columns': 3, 'rows': ['h1', 'h2']
+        }
+        snapshots.delete(csv_file)
+        assert snapshots.get(csv_file) is None
+
+
+class TestUpdateRows:
+    """Test the Sheets requests that apply a row diff."""
+
+    def make_gsheets(self, row_count=1000, column_count=26):
+        sheets = MagicMock()
+        sheets.spreadsheets.return_value.get.return_value.execute.return_value = {
+            'sheets': [{'properties': {
+                'sheetId': 7, 'title': "Q1 'data'",
+                'gridProperties': {'rowCount': row_count, 'columnCount': column_count}
+            }}]
+        }
+        gsheets = GoogleSheetsService.__new__(GoogleSheetsService)
+        gsheets.sheets_service = sheets
+        return gsheets, sheets.spreadsheets.return_value
+
+    def test_changed_blocks_written_in_one_request(self):
+        """Test that all blocks go into one values.batchUpdate."""
+        gsheets, spreadsheets = self.make_gsheets()
+
+        cells = gsheets.update_rows('sheet-1', [(1, [['a', 'b']]), (9, [['c', 'd'], ['e', 'f']])], 10, 10, 2)
+
+        assert cells == 6
+        spreadsheets.batchUpdate.assert_not_called()
+        body = spreadsheets.values.return_value.batchUpdate.call_args[1]['body']
+        assert body['valueInputOption'] == 'USER_ENTERED'
+        assert [d['range'] for d in body['data']] == ["'Q1 ''data'''!A2", "'Q1 ''data'''!A10"]
+
+    def test_large_diff_split_into_bounded_requests(self):
+        """Test that a large diff is written in several requests of at most chunk_rows rows."""
+        gsheets, spreadsheets = self.make_gsheets()
+        blocks = [(0, [['a']] * 3), (10, [['b']] * 6), (20, [['c']])]
+
+        cells = gsheets.update_rows('sheet-1', blocks, 30, 30, 1, chunk_rows=4)
+
+        assert cells == 10
+        bodies = [c[1]['body'] for c in spreadsheets.values.return_value.batchUpdate.call_args_list]
+        assert [sum(len(d['values']) for d in body['data']) for body in bodies] == [4, 4, 2]
+        assert [[d['range'].split('!')[1] for d in body['data']] for body in bodies] == [
+            ['A1', 'A11'], ['A12'], ['A16', 'A21']
+        ]
+
+    def test_grid_grown_and_rows_deleted(self):
+        """Test that grid changes are sent in one structural batchUpdate."""
+        gsheets, spreadsheets = self.make_gsheets(row_count=5, column_count=2)
+
+        gsheets.update_rows('sheet-1', [(4, [['a', 'b', 'c']] * 4)], 8, 5, 3)
+        requests = spreadsheets.batchUpdate.call_args[1]['body']['requests']
+        assert requests == [
+            {'appendDimension': {'sheetId': 7, 'dimension': 'ROWS', 'length': 3}},
+            {'appendDimension': {'sheetId': 7, 'dimension': 'COLUMNS', 'length': 1}},
+        ]
+
+        gsheets.update_rows('sheet-1', [], 3, 5, 2)
+        requests = spreadsheets.batchUpdate.call_args[1]['body']['requests']
+        assert requests == [{'deleteDimension': {'range': {
+            'sheetId': 7, 'dimension': 'ROWS', 'startIndex': 3, 'endIndex': 5
+        }}}]
+
+    def test_api_errors_wrapped(self):
+        """Test that a missing spreadsheet raises GoogleSheetsError."""
+        gsheets, spreadsheets = self.make_gsheets()
+        spreadsheets.get.return_value.execute.return_value = {}
+
+        with pytest.raises(GoogleSheetsError):
+            gsheets.update_rows('sheet-1', [], 1, 1, 1)
+
+    def test_start_spreadsheet_keeps_one_empty_tab(self):
+        """Test that other tabs are deleted and the first is cleared, shrunk and renamed."""
+        gsheets, spreadsheets = self.make_gsheets()
+        spreadsheets.get.return_value.execute.return_value['sheets'].append(
+            {'properties': {'sheetId': 9, 'title': 'Old', 'gridProperties': {}}}
+        )
+
+        assert gsheets.start_spreadsheet('sheet-1', 'Part 1') == 7
+
+        requests = spreadsheets.batchUpdate.call_args[1]['body']['requests']
+        assert requests[0] == {'deleteSheet': {'sheetId': 9}}
+        assert requests[-1]['updateSheetProperties']['properties'] == {
+            'sheetId': 7, 'title': 'Part 1', 'gridProperties': {'rowCount': 1, 'columnCount': 1}
+        }
+
+    def test_add_sheet_reuses_existing_title(self):
+        """Test that a tab added before an interruption is not added twice."""
+        gsheets, spreadsheets = self.make_gsheets()
+
+        assert gsheets.add_sheet('sheet-1', "Q1 'data'") == 7
+        spreadsheets.batchUpdate.assert_not_called()
+
+    def test_write_rows_sizes_grid_then_writes(self):
+        """Test that the grid is set to fit before rows are written at a fixed position."""
+        gsheets, spreadsheets = self.make_gsheets()
+
+        gsheets.write_rows('sheet-1', 7, 'Part 2', 3, [['a'], ['b']], 4)
+
+        grid = spreadsheets.batchUpdate.call_args[1]['body']['requests'][0]['updateSheetProperties']
+        assert grid['properties']['gridProperties'] == {'rowCount': 5, 'columnCount': 4}
+        update = spreadsheets.values.return_value.update.call_args[1]
+        assert update['range'] == "'Part 2'!A4"
+        assert update['body'] == {'values': [['a'], ['b']]}
@@ -0,0 +1,154 @@
+"""
+Tests for mermaid.ink rendering.
+
+A local HTTP server stands in for mermaid.ink (via MERMAID_INK_URL) to test
+connection reuse, retries and concurrent rendering.
+"""
+
+import asyncio
+import base64
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from src.drive_sync import mermaid_api
+from src.drive_sync.mermaid_api import MermaidAPIError, render_many, render_mermaid_api
+
+
+class FakeMermaidInk:
+    """Threaded stand-in server that echoes the decoded diagram code."""
+
+    def __init__(self):
+        self.requests = []
+        self.ports = set()
+        self.fail_next = []
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests.append(self.path)
+                    server.ports.add(self.client_address[1])
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    status = server.fail_next.pop(0) if server.fail_next else 200
+                try:
+                    time.sleep(server.delay)
+                    if status != 200:
+                        body = b'error'
+                    else:
+                        encoded = self.path.split('/img/')[1].split('?')[0]
+                        body = base64.urlsafe_b64decode(encoded)
+                    self.send_response(status)
+                    if status == 429:
+                        self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def mermaid_ink(monkeypatch):
+    """Run a fake mermaid.ink and point the module (and a fresh pool) at it."""
+    server = FakeMermaidInk()
+    monkeypatch.setenv('MERMAID_INK_URL', server.url)
+    monkeypatch.setattr(mermaid_api, 'API_RETRY_BACKOFF', 0.01)
+    monkeypatch.setattr(mermaid_api, '_http_client', None)
+    yield server
+    if mermaid_api._http_client is not None:
+        mermaid_api._http_client.close()
+    server.close()
+
+
+class TestRenderMermaidApi:
+    """Test the synchronous, pooled renderer."""
+
+    def test_renders_and_sends_options(self, mermaid_ink):
+        """Test that the diagram and options reach the server."""
+        result = render_mermaid_api('graph TD', format='svg', theme='dark')
+
+        assert result == b'graph TD'
+        assert 'type=svg' in mermaid_ink.requests[0]
+        assert 'theme=dark' in mermaid_ink.requests[0]
+
+    def test_connection_is_reused(self, mermaid_ink):
+        """Test that consecutive renders share one keep-alive connection."""
+        for i in range(5):
+            render_mermaid_api(f'graph {i}')
+
+        assert len(mermaid_ink.requests) == 5
+        assert len(mermaid_ink.ports) == 1
+
+    def test_retries_server_errors(self, mermaid_ink):
+        """Test that 503 and 429 responses are retried."""
+        mermaid_ink.fail_next = [503, 429]
+
+        assert render_mermaid_api('graph TD') == b'graph TD'
+        assert len(mermaid_ink.requests) == 3
+
+    def test_client_error_not_retried(self, mermaid_ink):
+        """Test that a 400 fails immediately."""
+        mermaid_ink.fail_next = [400]
+
+        with pytest.raises(MermaidAPIError):
+            render_mermaid_api('graph TD')
+
+        assert len(mermaid_ink.requests) == 1
+
+
+class TestRenderMany:
+    """Test concurrent async rendering."""
+
+    def test_results_in_input_order(self, mermaid_ink):
+        """Test that results line up with their diagrams."""
+        codes = [f'graph {i}' for i in range(12)]
+
+        results = asyncio.run(render_many(codes, concurrency=4))
+
+        assert results == [code.encode() for code in codes]
+
+    def test_concurrency_cap(self, mermaid_ink):
+        """Test that no more than `concurrency` requests are in flight."""
+        mermaid_ink.delay = 0.05
+
+        asyncio.run(render_many([f'graph {i}' for i in range(10)], concurrency=3))
+
+        assert 1 < mermaid_ink.max_in_flight <= 3
+
+    def test_failures_are_returned_per_diagram(self, mermaid_ink):
+        """Test that a failing diagram does not fail the batch."""
+        mermaid_ink.fail_next = [400]
+
+        results = asyncio.run(render_many(['graph A'], concurrency=1))
+        results += asyncio.run(render_many(['graph B']))
+
+        assert isinstance(results[0], MermaidAPIError)
+        assert results[1] == b'graph B'
+
+    def test_retries_async(self, mermaid_ink):
+        """Test that async renders retry throttled requests."""
+        mermaid_ink.fail_next = [429]
+
+        assert asyncio.run(render_many(['graph A'])) == [b'graph A']
+        assert len(mermaid_ink.requests) == 2
@@ -0,0 +1,163 @@
+"""
+Tests for the persistent Mermaid render worker pool.
+
+A small Python script stands in for the Node worker and speaks the same
+JSON-lines protocol, so pool lifecycle, health checks and fallbacks can be
+tested without Node or Chromium.
+"""
+
+import base64
+import sys
+import textwrap
+from unittest.mock import patch
+
+import pytest
+from src.drive_sync import mermaid_api
+from src.drive_sync.mermaid_worker import (
+    MermaidWorkerError,
+    MermaidWorkerPool,
+    MermaidWorkerUnavailable,
+)
+
+
+FAKE_WORKER = textwrap.dedent('''
+    import base64, json, os, sys, time
+
+    mode = sys.argv[1]
+    if mode == 'broken':
+        print(json.dumps({'ready': False, 'error': 'no browser'}), flush=True)
+        sys.exit(1)
+    print('some library warning', flush=True)
+    print(json.dumps({'ready': True}), flush=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get('ping'):
+            response = {'id': request['id'], 'ok': mode != 'deaf'}
+        elif request['code'] == 'hang':
+            time.sleep(30)
+        elif request['code'] == 'die':
+            sys.exit(1)
+        elif request['code'] == 'bad':
+            response = {'id': request['id'], 'ok': False, 'error': 'Parse error'}
+        else:
+            data = f"{os.getpid()}:{request['format']}:{request['code']}".encode()
+            response = {'id': request['id'], 'ok': True, 'data': base64.b64encode(data).decode()}
+        print(json.dumps(response), flush=True)
+''')
+
+
+@pytest.fixture
+def make_pool(tmp_path):
+    """Build a pool running the fake worker in the given mode."""
+    script = tmp_path / 'fake_worker.py'
+    script.write_text(FAKE_WORKER)
+    pools = []
+
+    def factory(mode='ok', **kwargs):
+        pool = MermaidWorkerPool(command=[sys.executable, str(script), mode], **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        pool.close()
+
+
+class TestMermaidWorkerPool:
+    """Test worker reuse, failures and health checks."""
+
+    def test_worker_is_reused(self, make_pool):
+        """Test that sequential renders share one warm worker."""
+        pool = make_pool(size=2)
+
+        first = pool.render('graph A', format='png')
+        second = pool.render('graph B', format='svg')
+
+        pid1, _, code1 = first.decode().split(':', 2)
+        pid2, fmt2, code2 = second.decode().split(':', 2)
+        assert (code1, code2, fmt2) == ('graph A', 'graph B', 'svg')
+        assert pid1 == pid2
+
+    def test_render_error_keeps_worker(self, make_pool):
+        """Test that a bad diagram raises without discarding the worker."""
+        pool = make_pool(size=1)
+
+        with pytest.raises(MermaidWorkerError) as exc:
+            pool.render('bad')
+
+        assert not isinstance(exc.value, MermaidWorkerUnavailable)
+        assert pool.render('graph A')
+
+    def test_dead_worker_is_replaced(self, make_pool):
+        """Test that a crashed worker is discarded and a new one started."""
+        pool = make_pool(size=1)
+        pid = pool.render('graph A').decode().split(':')[0]
+
+        with pytest.raises(MermaidWorkerUnavailable):
+            pool.render('die')
+
+        assert pool.render('graph A').decode().split(':')[0] != pid
+
+    def test_timeout_kills_worker(self, make_pool):
+        """Test that a hung render times out and frees the pool slot."""
+        pool = make_pool(size=1)
+
+        with pytest.raises(MermaidWorkerUnavailable):
+            pool.render('hang', timeout=0.5)
+
+        assert pool.render('graph A')
+
+    def test_failed_start_disables_pool(self, make_pool):
+        """Test that workers that cannot start disable the pool."""
+        pool = make_pool('broken')
+
+        with pytest.raises(MermaidWorkerUnavailable):
+            pool.render('graph A')
+
+        assert pool.disabled
+
+    def test_unhealthy_idle_worker_is_restarted(self, make_pool):
+        """Test that an idle worker failing its ping is replaced."""
+        pool = make_pool('deaf', size=1, health_check_interval=0)
+        pid = pool.render('graph A').decode().split(':')[0]
+
+        assert pool.render('graph A').decode().split(':')[0] != pid
+
+
+class TestRenderRouting:
+    """Test that local rendering routes through the pool."""
+
+    def test_uses_pool_when_available(self):
+        """Test that render_mermaid_local uses the pool instead of mmdc."""
+        pool = type('Pool', (), {'render': lambda self, *args: b'png'})()
+
+        with patch.object(mermaid_api, 'MMDC_AVAILABLE', True), \
+                patch.object(mermaid_api, 'get_worker_pool', return_value=pool), \
+                patch.object(mermaid_api, '_render_mermaid_mmdc') as mmdc:
+            assert mermaid_api.render_mermaid_local('graph TD') == b'png'
+
+        mmdc.assert_not_called()
+
+    def test_falls_back_to_mmdc(self):
+        """Test that an unavailable pool falls back to mmdc."""
+        class Pool:
+            def render(self, *args):
+                raise MermaidWorkerUnavailable("gone")
+
+        with patch.object(mermaid_api, 'MMDC_AVAILABLE', True), \
+                patch.object(mermaid_api, 'get_worker_pool', return_value=Pool()), \
+                patch.object(mermaid_api, '_render_mermaid_mmdc', return_value=b'mmdc') as mmdc:
+            assert mermaid_api.render_mermaid_local('graph TD') == b'mmdc'
+
+        mmdc.assert_called_once()
+
+    def test_render_errors_are_cli_errors(self):
+        """Test that diagram errors surface as MermaidCLIError."""
+        class Pool:
+            def render(self, *args):
+                raise MermaidWorkerError("Parse error")
+
+        with patch.object(mermaid_api, 'MMDC_AVAILABLE', True), \
+                patch.object(mermaid_api, 'get_worker_pool', return_value=Pool()):
+            with pytest.raises(mermaid_api.MermaidCLIError):
+                mermaid_api.render_mermaid_local('graph TD')
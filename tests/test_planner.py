@@ -0,0 +1,81 @@
+"""
+Tests for change-set planning.
+
+Tests classification of files against the sync cache and the folders a
+change set needs.
+"""
+
+from unittest.mock import patch
+
+from src.drive_sync.cache import SyncCache
+from src.drive_sync.planner import plan_changes
+
+
+def make_tree(root):
+    """Create docs/{a.md, b.md, guides/c.md, guides/deep/d.pdf, notes.txt}."""
+    (root / "guides" / "deep").mkdir(parents=True)
+    files = [root / "a.md", root / "b.md", root / "guides" / "c.md", root / "guides" / "deep" / "d.pdf"]
+    for path in files:
+        path.write_text(f"content of {path.name}")
+    (root / "notes.txt").write_text("unsupported")
+    return files
+
+
+class TestPlanChanges:
+    """Test classification of a tree against the cache."""
+
+    def test_everything_new_without_cache(self, tmp_path):
+        """Test that without a cache every supported file is new."""
+        files = make_tree(tmp_path)
+
+        plan = plan_changes(tmp_path, files + [tmp_path / "notes.txt"])
+
+        assert plan.new == files
+        assert plan.changed == files
+        assert plan.unsupported == [tmp_path / "notes.txt"]
+
+    def test_classifies_against_cache(self, tmp_path):
+        """Test new, modified, unchanged and deleted classification."""
+        files = make_tree(tmp_path)
+        gone = tmp_path / "gone.md"
+        cache = SyncCache(cache_file=str(tmp_path / "cache.json"))
+        for path in files[:3]:
+            cache.update(path, f"id-{path.name}")
+        cache.cache[str(gone)] = {'hash': 'h', 'drive_id': 'id-gone'}
+        cache.cache['/elsewhere/other.md'] = {'hash': 'h', 'drive_id': 'id-other'}
+        files[1].write_text("changed content")
+
+        plan = plan_changes(tmp_path, files, cache)
+
+        assert plan.unchanged == [files[0], files[2]]
+        assert plan.modified == [files[1]]
+        assert plan.new == [files[3]]
+        assert plan.changed == [files[1], files[3]]
+        assert plan.deleted == [str(gone)]
+        assert plan.summary() == "1 new, 1 modified, 2 unchanged, 1 deleted"
+
+    def test_unchanged_tree_is_not_read(self, tmp_path):
+        """Test that planning an unchanged tree only stats files."""
+        files = make_tree(tmp_path)
+        cache = SyncCache(cache_file=str(tmp_path / "cache.json"))
+        for path in files:
+            cache.update(path, 'id')
+
+        with patch.object(SyncCache, 'get_file_hash') as get_hash:
+            plan = plan_changes(tmp_path, files, cache, workers=2)
+
+        get_hash.assert_not_called()
+        assert plan.changed == []
+        assert plan.folders() == set()
+
+    def test_folders_include_ancestors(self, tmp_path):
+        """Test that only directories of changed files (and their parents) are needed."""
+        files = make_tree(tmp_path)
+        (tmp_path / "unused").mkdir()
+        cache = SyncCache(cache_file=str(tmp_path / "cache.json"))
+        for path in files[:3]:
+            cache.update(path, 'id')
+
+        plan = plan_changes(tmp_path, files, cache)
+
+        assert plan.folders() == {tmp_path / "guides", tmp_path / "guides" / "deep"}
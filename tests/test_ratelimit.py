@@ -0,0 +1,390 @@
+"""
+Tests for API rate limiting.
+
+Tests the shared limiters used by concurrent sync workers and the
+retrying request executor.
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaInMemoryUpload, MediaUploadProgress
+from src.drive_sync.ratelimit import IntervalRateLimiter, TokenBucket, TokenBucketRateLimiter
+from src.drive_sync.executor import BatchExecutor, execute_with_retry, is_throttled
+
+
+def make_http_error(status, content=b'{}', headers=None):
+    """Build an HttpError with the given status and headers."""
+    resp = httplib2.Response(dict(headers or {}, status=status))
+    return HttpError(resp, content)
+
+
+class TestIntervalRateLimiter:
+    """Test the shared min-interval rate limiter."""
+
+    def test_counts_calls(self):
+        """Test that every acquire is counted."""
+        limiter = IntervalRateLimiter(delay=0)
+
+        for _ in range(5):
+            limiter.acquire()
+
+        assert limiter.call_count == 5
+
+    def test_zero_delay_never_sleeps(self):
+        """Test that a zero delay disables throttling."""
+        limiter = IntervalRateLimiter(delay=0)
+
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.acquire()
+
+        assert time.monotonic() - start < 0.5
+
+    def test_spacing_is_shared_across_threads(self):
+        """Test that concurrent callers are spaced by one global interval."""
+        limiter = IntervalRateLimiter(delay=0.05)
+        stamps = []
+        lock = threading.Lock()
+
+        def worker():
+            limiter.acquire()
+            with lock:
+                stamps.append(time.monotonic())
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stamps.sort()
+        gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+        assert limiter.call_count == 5
+        # Four gaps of ~50ms (allow scheduler jitter)
+        assert stamps[-1] - stamps[0] >= 0.15
+        assert all(gap >= 0.03 for gap in gaps)
+
+
+class TestTokenBucket:
+    """Test token bucket refill, burst and AIMD adjustment."""
+
+    def test_burst_is_immediate(self):
+        """Test that a full bucket serves its burst without waiting."""
+        bucket = TokenBucket(rate=1, capacity=5)
+
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+
+        assert time.monotonic() - start < 0.1
+
+    def test_waits_when_empty(self):
+        """Test that callers wait for tokens once the burst is spent."""
+        bucket = TokenBucket(rate=20, capacity=1)
+        bucket.acquire()
+
+        start = time.monotonic()
+        bucket.acquire()
+        bucket.acquire()
+
+        # Two tokens at 20/s → ~100ms
+        assert time.monotonic() - start >= 0.08
+
+    def test_throttle_halves_rate(self):
+        """Test multiplicative decrease on throttling."""
+        bucket = TokenBucket(rate=8, capacity=8)
+
+        bucket.on_throttle()
+        assert bucket.rate == 4
+        bucket.on_throttle()
+        assert bucket.rate == 2
+
+    def test_throttle_respects_min_rate(self):
+        """Test that the rate never drops below min_rate."""
+        bucket = TokenBucket(rate=8, capacity=8, min_rate=3)
+
+        for _ in range(5):
+            bucket.on_throttle()
+
+        assert bucket.rate == 3
+
+    def test_success_recovers_up_to_ceiling(self):
+        """Test additive increase back to max_rate."""
+        bucket = TokenBucket(rate=10, capacity=10, increase=1)
+        bucket.on_throttle()
+        assert bucket.rate == 5
+
+        for _ in range(3):
+            bucket.on_success()
+        assert bucket.rate == 8
+
+        for _ in range(10):
+            bucket.on_success()
+        assert bucket.rate == 10
+
+    def test_retry_after_pauses_bucket(self):
+        """Test that Retry-After blocks the next acquire."""
+        bucket = TokenBucket(rate=100, capacity=100)
+        bucket.on_throttle(retry_after=0.1)
+
+        start = time.monotonic()
+        bucket.acquire()
+
+        assert time.monotonic() - start >= 0.08
+
+    def test_invalid_rate_rejected(self):
+        """Test that non-positive rates are rejected."""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0, capacity=1)
+
+
+class TestTokenBucketRateLimiter:
+    """Test per-API buckets."""
+
+    def test_separate_buckets_per_api(self):
+        """Test that throttling docs does not slow drive."""
+        limiter = TokenBucketRateLimiter({'drive': (10, 10), 'docs': (4, 4)})
+
+        limiter.record_throttle('docs')
+
+        assert limiter.buckets['docs'].rate == 2
+        assert limiter.buckets['drive'].rate == 10
+
+    def test_unknown_api_uses_drive_bucket(self):
+        """Test fallback to the drive bucket."""
+        limiter = TokenBucketRateLimiter()
+
+        limiter.acquire('unknown')
+
+        assert limiter.call_count == 1
+        assert limiter.buckets['drive'].tokens < limiter.buckets['drive'].capacity
+
+
+class TestExecuteWithRetry:
+    """Test retry/backoff around API requests."""
+
+    def test_success_reports_to_limiter(self):
+        """Test that a successful call acquires and records success."""
+        limiter = MagicMock()
+        request = MagicMock()
+        request.execute.return_value = {'id': 'abc'}
+
+        result = execute_with_retry(request, limiter, api='docs')
+
+        assert result == {'id': 'abc'}
+        limiter.acquire.assert_called_once_with('docs')
+        limiter.record_success.assert_called_once_with('docs')
+
+    @patch('src.drive_sync.executor.time.sleep')
+    def test_429_with_retry_after(self, sleep):
+        """Test that 429 honours Retry-After and reports throttling."""
+        limiter = MagicMock()
+        request = MagicMock()
+        request.execute.side_effect = [
+            make_http_error(429, headers={'retry-after': '7'}),
+            {'id': 'abc'},
+        ]
+
+        result = execute_with_retry(request, limiter)
+
+        assert result == {'id': 'abc'}
+        limiter.record_throttle.assert_called_once_with('drive', 7.0)
+        sleep.assert_called_once_with(7.0)
+
+    @patch('src.drive_sync.executor.time.sleep')
+    def test_403_rate_limit_is_retried(self, sleep):
+        """Test that Drive's 403 userRateLimitExceeded counts as throttling."""
+        request = MagicMock()
+        request.execute.side_effect = [
+            make_http_error(403, b'{"error": {"errors": [{"reason": "userRateLimitExceeded"}]}}'),
+            {'id': 'abc'},
+        ]
+
+        assert execute_with_retry(request) == {'id': 'abc'}
+
+    def test_client_error_not_retried(self):
+        """Test that 404 is raised immediately."""
+        request = MagicMock()
+        request.execute.side_effect = make_http_error(404)
+
+        with pytest.raises(HttpError):
+            execute_with_retry(request)
+
+        assert request.execute.call_count == 1
+
+    @patch('src.drive_sync.executor.time.sleep')
+    def test_gives_up_after_max_retries(self, sleep):
+        """Test that persistent server errors are eventually raised."""
+        request = MagicMock()
+        request.execute.side_effect = make_http_error(503)
+
+        with pytest.raises(HttpError):
+            execute_with_retry(request, max_retries=3)
+
+        assert request.execute.call_count == 3
+
+    def test_is_throttled(self):
+        """Test throttle detection."""
+        assert is_throttled(make_http_error(429))
+        assert is_throttled(make_http_error(403, b'{"error": {"errors": [{"reason": "rateLimitExceeded"}]}}'))
+        assert is_throttled(make_http_error(403, b'{"error": {"details": [{"reason": "userRateLimitExceeded"}]}}'))
+        assert not is_throttled(make_http_error(403, b'{"error": {"errors": [{"reason": "insufficientPermissions"}]}}'))
+        assert not is_throttled(make_http_error(500))
+
+    def test_is_throttled_matches_reason_exactly(self):
+        """Test that only the rate-limit reasons count, not text mentioning them."""
+        assert not is_throttled(make_http_error(403, b'rateLimitExceeded'))
+        assert not is_throttled(make_http_error(
+            403, b'{"error": {"errors": [{"reason": "dailyLimitExceeded", "message": "rateLimitExceeded"}]}}'
+        ))
+        assert not is_throttled(make_http_error(403, b'{"error": {"errors": [{"reason": "RateLimitExceeded"}]}}'))
+
+
+def make_batch_service(outcomes):
+    """
+    Build a mock service whose batches answer from `outcomes`.
+
+    Each element of `outcomes` is the list of (response, exception) pairs
+    returned for successive HTTP batches, in the order requests were added.
+    """
+    service = MagicMock()
+    rounds = iter(outcomes)
+    sizes = []
+
+    def new_batch_http_request(callback):
+        batch = MagicMock()
+        added = []
+        batch.add.side_effect = lambda request, request_id: added.append(request_id)
+
+        def execute(http=None):
+            sizes.append(len(added))
+            for request_id, (response, exception) in zip(added, next(rounds)):
+                callback(request_id, response, exception)
+
+        batch.execute.side_effect = execute
+        return batch
+
+    service.new_batch_http_request.side_effect = new_batch_http_request
+    return service, sizes
+
+
+class TestResumableUpload:
+    """Test chunked execution of resumable media uploads."""
+
+    def make_upload(self, *chunks):
+        request = MagicMock()
+        request.resumable = MediaInMemoryUpload(b'x' * 10, resumable=True)
+        request.next_chunk.side_effect = list(chunks)
+        return request
+
+    def test_sent_chunk_by_chunk(self):
+        """Test that every chunk is a separate, rate-limited call."""
+        limiter = MagicMock()
+        request = self.make_upload(
+            (MediaUploadProgress(4, 10), None),
+            (MediaUploadProgress(8, 10), None),
+            (None, {'id': 'abc'}),
+        )
+
+        assert execute_with_retry(request, limiter) == {'id': 'abc'}
+        assert request.next_chunk.call_count == 3
+        assert limiter.acquire.call_count == 3
+        request.execute.assert_not_called()
+
+    @patch('src.drive_sync.executor.time.sleep')
+    def test_resumes_after_transient_errors(self, sleep):
+        """Test that server errors and dropped connections resume the same upload."""
+        request = self.make_upload(
+            (MediaUploadProgress(4, 10), None),
+            make_http_error(503),
+            ConnectionResetError('reset by peer'),
+            (None, {'id': 'abc'}),
+        )
+
+        assert execute_with_retry(request) == {'id': 'abc'}
+        assert request.next_chunk.call_count == 4
+        assert sleep.call_count == 2
+
+    @patch('src.drive_sync.executor.time.sleep')
+    def test_retry_budget_is_per_chunk(self, sleep):
+        """Test that a successful chunk resets the retry count."""
+        request = self.make_upload(
+            make_http_error(503),
+            (MediaUploadProgress(4, 10), None),
+            make_http_error(503),
+            (None, {'id': 'abc'}),
+        )
+
+        assert execute_with_retry(request, max_retries=2) == {'id': 'abc'}
+
+    def test_client_error_not_retried(self):
+        """Test that a 4xx aborts the upload."""
+        request = self.make_upload(make_http_error(400))
+
+        with pytest.raises(HttpError):
+            execute_with_retry(request)
+
+        assert request.next_chunk.call_count == 1
+
+
+class TestBatchExecutor:
+    """Test batched request execution."""
+
+    def test_chunks_and_callbacks(self):
+        """Test that requests are split into 100-call batches with one callback each."""
+        service, sizes = make_batch_service([
+            [({'id': i}, None) for i in range(100)],
+            [({'id': i}, None) for i in range(100, 150)],
+        ])
+        limiter = MagicMock()
+        batch = BatchExecutor(service, limiter)
+        seen = []
+
+        for i in range(150):
+            batch.add(MagicMock(), lambda response, exception: seen.append(response['id']))
+        failures = batch.flush()
+
+        assert failures == 0
+        assert sizes == [100, 50]
+        assert sorted(seen) == list(range(150))
+        assert len(batch) == 0
+        limiter.acquire.assert_any_call('drive', tokens=100)
+        limiter.acquire.assert_any_call('drive', tokens=50)
+
+    @patch('src.drive_sync.executor.time.sleep')
+    def test_throttled_items_are_retried(self, sleep):
+        """Test that only throttled items are resent and the limiter backs off."""
+        service, sizes = make_batch_service([
+            [({'id': 'a'}, None), (None, make_http_error(429))],
+            [({'id': 'b'}, None)],
+        ])
+        limiter = MagicMock()
+        batch = BatchExecutor(service, limiter)
+        results = {}
+
+        batch.add(MagicMock(), lambda response, exception: results.setdefault('a', (response, exception)))
+        batch.add(MagicMock(), lambda response, exception: results.setdefault('b', (response, exception)))
+
+        assert batch.flush() == 0
+        assert sizes == [2, 1]
+        assert results == {'a': ({'id': 'a'}, None), 'b': ({'id': 'b'}, None)}
+        limiter.record_throttle.assert_called_once_with('drive')
+        sleep.assert_called_once()
+
+    def test_client_errors_are_reported(self):
+        """Test that non-retryable errors go to the callback without a retry."""
+        error = make_http_error(404)
+        service, sizes = make_batch_service([[(None, error)]])
+        batch = BatchExecutor(service)
+        results = []
+
+        batch.add(MagicMock(), lambda response, exception: results.append(exception))
+
+        assert batch.flush() == 1
+        assert sizes == [1]
+        assert results == [error]
@@ -0,0 +1,136 @@
+"""
+Tests for the remote Drive folder index.
+
+Tests paginated listing, lookups by (name, mimeType) and in-place updates.
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from src.drive_sync.remote_index import RemoteFolderIndex
+
+DOC = 'application/vnd.google-apps.document'
+FOLDER = 'application/vnd.google-apps.folder'
+
+
+def make_service(pages):
+    """Build a mock Drive service whose files().list returns the given pages."""
+    service = MagicMock()
+    service.files.return_value.list.side_effect = [MagicMock(name=f'page{i}') for i in range(len(pages))]
+    responses = iter(pages)
+    execute = MagicMock(side_effect=lambda request: next(responses))
+    return service, execute
+
+
+class TestRemoteFolderIndex:
+    """Test folder listing and lookups."""
+
+    def test_find_existing_file(self):
+        """Test that a listed file is found by name and type."""
+        service, execute = make_service([
+            {'files': [{'id': 'doc1', 'name': 'README', 'mimeType': DOC}]}
+        ])
+        index = RemoteFolderIndex(service, execute)
+
+        found = index.find('parent', 'README', DOC)
+
+        assert found['id'] == 'doc1'
+
+    def test_mime_type_is_part_of_key(self):
+        """Test that a folder and a doc with the same name are distinct."""
+        service, execute = make_service([
+            {'files': [{'id': 'f1', 'name': 'guides', 'mimeType': FOLDER}]}
+        ])
+        index = RemoteFolderIndex(service, execute)
+
+        assert index.find('parent', 'guides', DOC) is None
+        assert index.find('parent', 'guides', FOLDER)['id'] == 'f1'
+
+    def test_folder_listed_once(self):
+        """Test that repeated lookups reuse the first listing."""
+        service, execute = make_service([
+            {'files': [{'id': 'a', 'name': 'A', 'mimeType': DOC}]}
+        ])
+        index = RemoteFolderIndex(service, execute)
+
+        for _ in range(5):
+            index.find('parent', 'A', DOC)
+            index.find('parent', 'missing', DOC)
+
+        assert execute.call_count == 1
+
+    def test_pagination(self):
+        """Test that all pages of a large folder are indexed."""
+        service, execute = make_service([
+            {'files': [{'id': 'a', 'name': 'A', 'mimeType': DOC}], 'nextPageToken': 'p2'},
+            {'files': [{'id': 'b', 'name': 'B', 'mimeType': DOC}]},
+        ])
+        index = RemoteFolderIndex(service, execute)
+
+        assert index.find('parent', 'B', DOC)['id'] == 'b'
+        assert execute.call_count == 2
+        second_call = service.files.return_value.list.call_args_list[1]
+        assert second_call[1]['pageToken'] == 'p2'
+        assert 'md5Checksum' in second_call[1]['fields']
+
+    def test_first_duplicate_wins(self):
+        """Test that duplicate names resolve to the first listed file."""
+        service, execute = make_service([
+            {'files': [
+                {'id': 'first', 'name': 'Dup', 'mimeType': DOC},
+                {'id': 'second', 'name': 'Dup', 'mimeType': DOC},
+            ]}
+        ])
+        index = RemoteFolderIndex(service, execute)
+
+        assert index.find('parent', 'Dup', DOC)['id'] == 'first'
+
+    def test_add_after_create(self):
+        """Test that created files are visible without relisting."""
+        service, execute = make_service([{'files': []}])
+        index = RemoteFolderIndex(service, execute)
+        assert index.find('parent', 'New', DOC) is None
+
+        index.add('parent', {'id': 'new1', 'name': 'New', 'mimeType': DOC})
+
+        assert index.find('parent', 'New', DOC)['id'] == 'new1'
+        assert execute.call_count == 1
+
+    def test_remove(self):
+        """Test forgetting a file."""
+        service, execute = make_service([
+            {'files': [{'id': 'a', 'name': 'A', 'mimeType': DOC}]}
+        ])
+        index = RemoteFolderIndex(service, execute)
+        index.find('parent', 'A', DOC)
+
+        index.remove('parent', 'A', DOC)
+
+        assert index.find('parent', 'A', DOC) is None
+
+    def test_mark_empty_skips_listing(self):
+        """Test that new folders are never listed."""
+        service, execute = make_service([])
+        index = RemoteFolderIndex(service, execute)
+
+        index.mark_empty('new_folder')
+
+        assert index.find('new_folder', 'A', DOC) is None
+        assert execute.call_count == 0
+
+    def test_concurrent_lookups_list_once(self):
+        """Test that concurrent workers share a single listing."""
+        service, execute = make_service([{'files': []}])
+        index = RemoteFolderIndex(service, execute)
+
+        threads = [
+            threading.Thread(target=index.find, args=('parent', f'f{i}', DOC))
+            for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert execute.call_count == 1
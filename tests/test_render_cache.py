@@ -0,0 +1,209 @@
+"""
+Tests for the Mermaid render cache.
+
+Tests key derivation, persistence of renders and Drive IDs, LRU eviction,
+and how sync reuses and pre-renders diagrams.
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from src.drive_sync.render_cache import RenderCache
+
+
+class TestRenderCache:
+    """Test storage, persistence and eviction."""
+
+    def test_key_covers_render_options(self):
+        """Test that every render option changes the key."""
+        base = RenderCache.make_key('graph TD\n A-->B')
+
+        assert base == RenderCache.make_key('graph TD\n A-->B')
+        assert base != RenderCache.make_key('graph TD\n A-->C')
+        assert base != RenderCache.make_key('graph TD\n A-->B', format='svg')
+        assert base != RenderCache.make_key('graph TD\n A-->B', theme='dark')
+        assert base != RenderCache.make_key('graph TD\n A-->B', background_color='transparent')
+        assert base != RenderCache.make_key('graph TD\n A-->B', renderer='api')
+
+    def test_round_trip_across_instances(self, tmp_path):
+        """Test that renders and Drive IDs persist to disk."""
+        cache = RenderCache(str(tmp_path))
+        cache.put('k1', b'png-bytes')
+        cache.set_drive_id('k1', 'drive-1', 'folder-1')
+        cache.save()
+
+        reloaded = RenderCache(str(tmp_path))
+
+        assert reloaded.get_bytes('k1') == b'png-bytes'
+        entry = reloaded.get('k1')
+        assert entry['drive_id'] == 'drive-1'
+        assert entry['folder_id'] == 'folder-1'
+
+    def test_missing_image_drops_entry(self, tmp_path):
+        """Test that index entries without an image file are ignored on load."""
+        cache = RenderCache(str(tmp_path))
+        cache.put('k1', b'data')
+        cache.save()
+        (tmp_path / 'k1.png').unlink()
+
+        assert RenderCache(str(tmp_path)).get('k1') is None
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entries are evicted first."""
+        cache = RenderCache(str(tmp_path), max_bytes=10)
+        cache.put('a', b'1234')
+        time.sleep(0.01)
+        cache.put('b', b'1234')
+        time.sleep(0.01)
+        cache.get('a')
+        time.sleep(0.01)
+        cache.put('c', b'1234')
+
+        assert cache.get('b') is None
+        assert cache.get_bytes('a') == b'1234'
+        assert cache.get_bytes('c') == b'1234'
+        assert not (tmp_path / 'b.png').exists()
+
+    def test_lookup_does_not_rewrite_index(self, tmp_path):
+        """Test that lookups update recency in memory without dirtying the index."""
+        cache = RenderCache(str(tmp_path))
+        cache.put('k1', b'data')
+        cache.save()
+        index = (tmp_path / 'index.json').read_text()
+
+        cache.get('k1')
+        cache.get_bytes('k1')
+        cache.save()
+
+        assert (tmp_path / 'index.json').read_text() == index
+
+    def test_invalidate_drive_id_keeps_render(self, tmp_path):
+        """Test that a lost Drive copy keeps the rendered bytes."""
+        cache = RenderCache(str(tmp_path))
+        cache.put('k1', b'data')
+        cache.set_drive_id('k1', 'drive-1', 'folder-1')
+
+        cache.invalidate_drive_id('k1')
+
+        assert cache.get('k1')['drive_id'] is None
+        assert cache.get_bytes('k1') == b'data'
+
+
+class TestDiagramReuse:
+    """Test that sync reuses cached diagrams."""
+
+    @pytest.fixture
+    def sync(self, tmp_path, monkeypatch):
+        from src.drive_sync.sync import GoogleDriveSync
+
+        monkeypatch.chdir(tmp_path)
+        with patch('src.drive_sync.sync.GoogleAuthenticator'):
+            sync = GoogleDriveSync(
+                folder_id='root_folder_id', rate_limit_delay=0, enable_mermaid=False,
+                render_cache=RenderCache(str(tmp_path / 'diagrams'))
+            )
+        sync.gdrive_service = MagicMock()
+        sync.gdrive_service.upload_image_bytes.return_value = {'id': 'img-1'}
+        return sync
+
+    def test_unchanged_diagram_not_rendered_or_uploaded(self, sync):
+        """Test that the second sync of a diagram reuses its Drive file."""
+        diagrams = [{'name': 'mermaid_abc', 'code': 'graph TD\n A-->B', 'hash': 'abc'}]
+
+        with patch.object(sync, 'get_or_create_folder', return_value='diagrams-folder'), \
+                patch('src.drive_sync.sync.render_mermaid_diagram', return_value=b'png') as render:
+            first = sync._process_mermaid_diagrams('doc', diagrams, 'folder-1')
+            second = sync._process_mermaid_diagrams('doc', diagrams, 'folder-1')
+
+        assert render.call_count == 1
+        assert sync.gdrive_service.upload_image_bytes.call_count == 1
+        assert first[0]['image_url'] == second[0]['image_url']
+        assert 'img-1' in second[0]['image_url']
+
+    def test_other_folder_uploads_cached_render(self, sync):
+        """Test that a cached render is uploaded again for a new folder without rendering."""
+        diagrams = [{'name': 'mermaid_abc', 'code': 'graph TD\n A-->B', 'hash': 'abc'}]
+
+        with patch.object(sync, 'get_or_create_folder', return_value='diagrams-folder'), \
+                patch('src.drive_sync.sync.render_mermaid_diagram', return_value=b'png') as render:
+            sync._process_mermaid_diagrams('doc', diagrams, 'folder-1')
+            sync._process_mermaid_diagrams('doc', diagrams, 'folder-2')
+
+        assert render.call_count == 1
+        assert sync.gdrive_service.upload_image_bytes.call_count == 2
+
+
+class TestBackgroundRendering:
+    """Test that diagrams render while the document uploads."""
+
+    def test_renders_start_before_upload_and_are_consumed(self, tmp_path, monkeypatch):
+        """Test that renders are submitted at extraction and uploaded as they finish."""
+        from src.drive_sync.sync import GoogleDriveSync
+
+        monkeypatch.chdir(tmp_path)
+        with patch('src.drive_sync.sync.GoogleAuthenticator'), \
+                patch('src.drive_sync.sync.GoogleDocsService'), \
+                patch('src.drive_sync.sync.GoogleDriveService'):
+            sync = GoogleDriveSync(
+                folder_id='root_folder_id', rate_limit_delay=0, render_workers=2,
+                render_cache=RenderCache(str(tmp_path / 'diagrams'))
+            )
+        sync.gdrive_service.upload_image_bytes.side_effect = lambda **kw: {'id': kw['filename']}
+        diagrams = [
+            {'name': 'mermaid_a', 'code': 'graph A', 'hash': 'a'},
+            {'name': 'mermaid_b', 'code': 'graph B', 'hash': 'b'},
+        ]
+        events = []
+
+        def render(code, format='png'):
+            events.append(('render', code))
+            return code.encode()
+
+        with patch('src.drive_sync.sync.render_mermaid_diagram', side_effect=render), \
+                patch.object(sync, 'get_or_create_folder', return_value='diagrams-folder'):
+            renders = sync._start_diagram_renders(diagrams, 'folder-1')
+            for future in renders.values():
+                future.result()
+            events.append(('upload-doc', None))
+            embeds = sync._process_mermaid_diagrams('doc', diagrams, 'folder-1', renders)
+
+        sync.finalize()
+        assert set(renders) == {'mermaid_a', 'mermaid_b'}
+        assert events[-1] == ('upload-doc', None)
+        assert sorted(e['name'] for e in embeds) == ['mermaid_a', 'mermaid_b']
+        uploaded = {c[1]['filename']: c[1]['image_bytes']
+                    for c in sync.gdrive_service.upload_image_bytes.call_args_list}
+        assert uploaded == {'mermaid_a.png': b'graph A', 'mermaid_b.png': b'graph B'}
+
+    def test_cached_diagrams_are_not_submitted(self, tmp_path, monkeypatch):
+        """Test that diagrams with a cached render skip the background pool."""
+        from src.drive_sync.sync import GoogleDriveSync
+
+        monkeypatch.chdir(tmp_path)
+        cache = RenderCache(str(tmp_path / 'diagrams'))
+        cache.put(RenderCache.make_key('graph A'), b'png')
+        with patch('src.drive_sync.sync.GoogleAuthenticator'), \
+                patch('src.drive_sync.sync.GoogleDocsService'), \
+                patch('src.drive_sync.sync.GoogleDriveService'):
+            sync = GoogleDriveSync(folder_id='root_folder_id', rate_limit_delay=0, render_cache=cache)
+
+        renders = sync._start_diagram_renders(
+            [{'name': 'mermaid_a', 'code': 'graph A', 'hash': 'a'}], 'folder-1'
+        )
+
+        sync.finalize()
+        assert renders == {}
+
+    def test_default_cache_uses_configured_size(self, tmp_path, monkeypatch):
+        """Test that the default render cache is bounded by render_cache_max_bytes."""
+        from src.drive_sync.sync import GoogleDriveSync
+
+        monkeypatch.chdir(tmp_path)
+        with patch('src.drive_sync.sync.GoogleAuthenticator'), \
+                patch('src.drive_sync.sync.GoogleDocsService'), \
+                patch('src.drive_sync.sync.GoogleDriveService'):
+            sync = GoogleDriveSync(folder_id='root_folder_id', rate_limit_delay=0, render_cache_max_bytes=1024)
+
+        sync.finalize()
+        assert sync.render_cache.max_bytes == 1024
@@ -0,0 +1,877 @@
+"""
+Tests for the core sync engine.
+
+Google APIs are mocked; these tests cover directory walking, worker
+dispatch and cache bookkeeping in GoogleDriveSync.
+"""
+
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import pytest
+from googleapiclient.http import MediaInMemoryUpload
+from src.drive_sync.git_scan import GitScanError
+from src.drive_sync.gsheets import GoogleSheetsError
+from src.drive_sync.sync import GoogleDriveSync
+
+
+def write_csv(path, rows):
+    path.write_text(''.join(','.join(row) + '\n' for row in rows))
+    return path
+
+
+@pytest.fixture
+def make_sync(tmp_path, monkeypatch):
+    """Build a GoogleDriveSync with a mocked Drive service and a temp cache."""
+    monkeypatch.chdir(tmp_path)
+
+    def factory(**kwargs):
+        kwargs.setdefault('folder_id', 'root_folder_id')
+        kwargs.setdefault('rate_limit_delay', 0)
+        kwargs.setdefault('enable_mermaid', False)
+        with patch('src.drive_sync.sync.GoogleAuthenticator') as auth:
+            auth.return_value.authenticate.return_value = MagicMock()
+            return GoogleDriveSync(**kwargs)
+
+    return factory
+
+
+@pytest.fixture
+def docs_tree(tmp_path):
+    """Create a small docs tree with nested folders."""
+    docs = tmp_path / "docs"
+    (docs / "guides").mkdir(parents=True)
+    for i in range(6):
+        (docs / f"doc{i}.md").write_text(f"# Doc {i}")
+    for i in range(4):
+        (docs / "guides" / f"guide{i}.md").write_text(f"# Guide {i}")
+    return docs
+
+
+class TestConcurrentSync:
+    """Test worker-pool dispatch in sync_directory."""
+
+    def test_all_files_synced_with_workers(self, make_sync, docs_tree):
+        """Test that every file is synced exactly once across workers."""
+        sync = make_sync(workers=4, batch_size=3)
+        calls = []
+        threads = set()
+        lock = threading.Lock()
+
+        def fake_sync_file(file_path, folder_id=None):
+            with lock:
+                calls.append(str(file_path))
+                threads.add(threading.current_thread().name)
+            return f"id-{Path(file_path).name}"
+
+        with patch.object(sync, 'create_folder_structure', return_value={}), \
+                patch.object(sync, 'sync_file', side_effect=fake_sync_file), \
+                patch.object(sync.cache, 'schedule_save') as schedule_save, \
+                patch.object(sync.cache, 'save') as save:
+            result = sync.sync_directory(docs_tree)
+
+        assert len(result) == 10
+        assert sorted(calls) == sorted(set(calls))
+        assert all(name.startswith('sync') for name in threads)
+        # 10 files / batch of 3 → 3 background progress saves + 1 final save
+        assert schedule_save.call_count == 3
+        assert save.call_count == 1
+
+    def test_worker_errors_do_not_stop_sync(self, make_sync, docs_tree):
+        """Test that a failing file is reported without aborting the run."""
+        sync = make_sync(workers=3)
+
+        def fake_sync_file(file_path, folder_id=None):
+            if Path(file_path).name == 'doc2.md':
+                raise RuntimeError("boom")
+            return 'file-id'
+
+        with patch.object(sync, 'create_folder_structure', return_value={}), \
+                patch.object(sync, 'sync_file', side_effect=fake_sync_file), \
+                patch.object(sync.cache, 'save'):
+            result = sync.sync_directory(docs_tree)
+
+        assert len(result) == 9
+        assert not any(path.endswith('doc2.md') for path in result)
+
+    def test_serial_mode_is_default(self, make_sync, docs_tree):
+        """Test that workers=1 syncs in order on the calling thread."""
+        sync = make_sync()
+        seen_threads = set()
+
+        def fake_sync_file(file_path, folder_id=None):
+            seen_threads.add(threading.current_thread().name)
+            return 'file-id'
+
+        with patch.object(sync, 'create_folder_structure', return_value={}), \
+                patch.object(sync, 'sync_file', side_effect=fake_sync_file), \
+                patch.object(sync.cache, 'save'):
+            sync.sync_directory(docs_tree)
+
+        assert seen_threads == {threading.current_thread().name}
+
+
+class TestChangeSetSync:
+    """Test that sync_directory only touches Drive for changed files."""
+
+    def _fake_sync_file(self, sync, calls):
+        def fake_sync_file(file_path, folder_id=None):
+            calls.append((Path(file_path).name, folder_id))
+            sync.cache.update(file_path, f"id-{Path(file_path).name}")
+            return f"id-{Path(file_path).name}"
+        return fake_sync_file
+
+    def test_noop_sync_makes_no_api_calls(self, make_sync, docs_tree):
+        """Test that a second sync of an unchanged tree never calls Drive."""
+        sync = make_sync()
+        calls = []
+        with patch.object(sync, 'create_folder_structure', return_value={}), \
+                patch.object(sync, 'sync_file', side_effect=self._fake_sync_file(sync, calls)):
+            sync.sync_directory(docs_tree)
+        sync.service.reset_mock()
+
+        with patch.object(sync, 'create_folder_structure') as create_folders, \
+                patch.object(sync, 'sync_file') as sync_file:
+            result = sync.sync_directory(docs_tree)
+
+        create_folders.assert_not_called()
+        sync_file.assert_not_called()
+        assert sync.service.mock_calls == []
+        assert sync.api_call_count == 0
+        assert result[str(docs_tree / "doc0.md")] == 'id-doc0.md'
+        assert len(result) == 10
+
+    def test_only_changed_files_and_their_folders(self, make_sync, docs_tree):
+        """Test that a change syncs one file and resolves only its folder."""
+        sync = make_sync()
+        calls = []
+        (docs_tree / "api").mkdir()
+        with patch.object(sync, 'create_folder_structure', return_value={}), \
+                patch.object(sync, 'sync_file', side_effect=self._fake_sync_file(sync, calls)):
+            sync.sync_directory(docs_tree)
+        (docs_tree / "guides" / "guide2.md").write_text("# Changed")
+        calls.clear()
+
+        folders = {str(docs_tree): 'docs-id', str(docs_tree / "guides"): 'guides-id'}
+        with patch.object(sync, 'create_folder_structure', return_value=folders) as create_folders, \
+                patch.object(sync, 'sync_file', side_effect=self._fake_sync_file(sync, calls)):
+            sync.sync_directory(docs_tree)
+
+        assert calls == [('guide2.md', 'guides-id')]
+        assert create_folders.call_args[1]['subdirs'] == {docs_tree / "guides"}
+
+    def test_excluded_subtree_not_synced_or_created(self, make_sync, docs_tree):
+        """Test that an excluded directory yields no files and no Drive folder."""
+        sync = make_sync()
+        calls = []
+        (docs_tree / "temp").mkdir()
+        (docs_tree / "temp" / "scratch.md").write_text("# Scratch")
+        (docs_tree / "draft.draft.md").write_text("# Draft")
+
+        with patch.object(sync, 'create_folder_structure', return_value={}) as create_folders, \
+                patch.object(sync, 'sync_file', side_effect=self._fake_sync_file(sync, calls)):
+            result = sync.sync_directory(docs_tree, exclude=["temp/", "*.draft.md"])
+
+        assert len(result) == 10
+        assert not any(name in ('scratch.md', 'draft.draft.md') for name, _ in calls)
+        assert create_folders.call_args[1]['subdirs'] == {docs_tree / "guides"}
+
+    def test_deleted_files_removed_from_cache(self, make_sync, docs_tree):
+        """Test that cache entries of deleted files are pruned."""
+        sync = make_sync()
+        calls = []
+        with patch.object(sync, 'create_folder_structure', return_value={}), \
+                patch.object(sync, 'sync_file', side_effect=self._fake_sync_file(sync, calls)):
+            sync.sync_directory(docs_tree)
+        (docs_tree / "doc3.md").unlink()
+
+        sync.sync_directory(docs_tree)
+
+        assert sync.cache.get_drive_id(docs_tree / "doc3.md") is None
+        assert sync.cache.get_drive_id(docs_tree / "doc4.md") == 'id-doc4.md'
+
+
+class TestRemoteLookups:
+    """Test that existence checks use the folder index."""
+
+    def test_folder_resolution_lists_parent_once(self, make_sync):
+        """Test that sibling folders cost one listing plus their creates."""
+        sync = make_sync()
+        responses = [
+            {'files': [{'id': 'existing', 'name': 'guides', 'mimeType': 'application/vnd.google-apps.folder'}]},
+            {'id': 'created', 'name': 'api', 'mimeType': 'application/vnd.google-apps.folder'},
+        ]
+
+        execute = MagicMock(side_effect=responses)
+        with patch.object(sync, '_execute_with_retry', execute), \
+                patch.object(sync.remote_index, 'execute', execute):
+            assert sync.get_or_create_folder('guides', 'parent') == 'existing'
+            assert sync.get_or_create_folder('api', 'parent') == 'created'
+            # Created folder is now indexed; no further calls
+            assert sync.get_or_create_folder('api', 'parent') == 'created'
+
+        assert execute.call_count == 2
+
+
+class TestCachedFolders:
+    """Test that folder IDs persist in the sync cache."""
+
+    def test_second_run_skips_folder_resolution(self, make_sync):
+        """Test that a cached folder costs only its parent's listing in the next run."""
+        listing = {'files': [
+            {'id': 'guides-id', 'name': 'guides', 'mimeType': 'application/vnd.google-apps.folder'}
+        ]}
+        first = make_sync()
+        with patch.object(first.remote_index, 'execute', return_value=listing):
+            assert first.get_or_create_folder('guides', 'parent') == 'guides-id'
+        first.finalize()
+
+        second = make_sync()
+        with patch.object(second.remote_index, 'execute', return_value=listing) as execute, \
+                patch.object(second, '_execute_with_retry') as create:
+            assert second.get_or_create_folder('guides', 'parent') == 'guides-id'
+            assert second.get_or_create_folder('guides', 'parent') == 'guides-id'
+
+        assert execute.call_count == 1
+        create.assert_not_called()
+
+    def test_trashed_cached_folder_resolved_again(self, make_sync):
+        """Test that a cached folder missing from its non-trashed parent listing is replaced."""
+        sync = make_sync()
+        sync.cache.set_meta('folders', 'parent/guides', 'trashed-id')
+        sync.cache.set_meta('folders', 'trashed-id/api', 'api-id')
+        folder = {'id': 'new-guides-id', 'name': 'guides', 'mimeType': 'application/vnd.google-apps.folder'}
+
+        with patch.object(sync.remote_index, 'execute', return_value={'files': []}), \
+                patch.object(sync, '_execute_with_retry', return_value=folder) as create:
+            assert sync.get_or_create_folder('guides', 'parent') == 'new-guides-id'
+            assert sync.get_or_create_folder('guides', 'parent') == 'new-guides-id'
+
+        assert create.call_count == 1
+        assert sync.service.files.return_value.create.call_args[1]['body']['parents'] == ['parent']
+        assert sync.cache.get_meta('folders', 'parent/guides') == 'new-guides-id'
+        assert sync.cache.get_meta('folders', 'new-guides-id/api') == 'api-id'
+        assert sync.cache.get_meta('folders', 'trashed-id/api') is None
+
+    def test_stale_folder_resolved_again_on_404(self, make_sync, tmp_path):
+        """Test that an upload into a deleted cached folder re-resolves it and retries."""
+        import httplib2
+        from googleapiclient.errors import HttpError
+
+        sync = make_sync()
+        sync.cache.set_meta('folders', 'parent/guides', 'deleted-id')
+        pdf = tmp_path / "report.pdf"
+        pdf.write_bytes(b"%PDF-1.4 test")
+        not_found = HttpError(httplib2.Response({'status': 404}), b'{}')
+        folder = {'id': 'new-guides-id', 'name': 'guides', 'mimeType': 'application/vnd.google-apps.folder'}
+
+        with patch.object(sync, '_execute_with_retry', side_effect=[not_found, folder, {'id': 'pdf-id'}]), \
+                patch.object(sync.remote_index, 'find', return_value=None):
+            result, created = sync._upload_file(
+                pdf, {'name': 'report.pdf'}, MagicMock(), 'deleted-id', 'application/pdf'
+            )
+
+        assert (result, created) == ({'id': 'pdf-id'}, True)
+        assert sync.cache.get_meta('folders', 'parent/guides') == 'new-guides-id'
+        create_bodies = [c[1]['body'] for c in sync.service.files.return_value.create.call_args_list]
+        assert create_bodies[-1]['parents'] == ['new-guides-id']
+
+    def test_uncached_folder_404_is_raised(self, make_sync, tmp_path):
+        """Test that a 404 for a folder that was not cached is not retried."""
+        import httplib2
+        from googleapiclient.errors import HttpError
+
+        sync = make_sync()
+        not_found = HttpError(httplib2.Response({'status': 404}), b'{}')
+
+        with patch.object(sync, '_execute_with_retry', side_effect=not_found), \
+                patch.object(sync.remote_index, 'find', return_value=None):
+            with pytest.raises(HttpError):
+                sync._upload_file(tmp_path / "x.pdf", {'name': 'x.pdf'}, MagicMock(), 'f', 'application/pdf')
+
+    def test_image_subfolder_cached(self, make_sync):
+        """Test that the diagram subfolder is resolved once and reused across documents."""
+        sync = make_sync()
+        sync.gdrive_service = MagicMock()
+        sync.gdrive_service.upload_image_bytes.return_value = {'id': 'img'}
+        folder = {'id': 'diagrams-id', 'name': 'Diagram Images', 'mimeType': 'application/vnd.google-apps.folder'}
+
+        with patch.object(sync.remote_index, 'find', return_value=None) as find, \
+                patch.object(sync, '_execute_with_retry', return_value=folder) as execute:
+            sync._upload_image("Diagram Images", 'doc-folder', image_bytes=b'1', filename='a.png')
+            sync._upload_image("Diagram Images", 'doc-folder', image_bytes=b'2', filename='b.png')
+
+        assert find.call_count == 1
+        assert execute.call_count == 1
+        assert sync.cache.get_meta('folders', 'doc-folder/Diagram Images') == 'diagrams-id'
+        assert sync.gdrive_service.upload_image_bytes.call_args[1]['folder_id'] == 'diagrams-id'
+
+
+class TestImageRegistry:
+    """Test that images are uploaded once per distinct content."""
+
+    class FakeBatch:
+        def __init__(self, outcome):
+            self.outcome = outcome
+            self.queued = []
+
+        def __len__(self):
+            return len(self.queued)
+
+        def flush(self):
+            for callback in self.queued:
+                callback(*self.outcome)
+            return 0
+
+    @pytest.fixture
+    def sync(self, make_sync, monkeypatch):
+        monkeypatch.setattr('src.drive_sync.sync.time.sleep', lambda seconds: None)
+        sync = make_sync()
+        sync.gdrive_service = MagicMock()
+        sync.gdrive_service.upload_file.side_effect = \
+            lambda **kw: {'id': f"drive-{sync.gdrive_service.upload_file.call_count}"}
+        self.public_outcome = ({}, None)
+        self.batches = []
+
+        def new_batch():
+            outcome = self.public_outcome if len(self.batches) % 2 == 0 else ({}, None)
+            batch = self.FakeBatch(outcome)
+            self.batches.append(batch)
+            return batch
+
+        sync.gdrive_service.new_batch.side_effect = new_batch
+        queue = lambda batch, file_id, callback: batch.queued.append(callback)
+        sync.gdrive_service.queue_public_permissions.side_effect = queue
+        sync.gdrive_service.queue_service_account_reader.side_effect = queue
+        return sync
+
+    def _images(self, tmp_path, *names, content=b'png-bytes'):
+        images = []
+        for name in names:
+            path = tmp_path / f"{name}.png"
+            path.write_bytes(content)
+            images.append({'name': f"image_{name}", 'path': str(path), 'display_name': name})
+        return images
+
+    def test_same_image_uploaded_once_across_documents(self, sync, tmp_path):
+        """Test that identical images in two documents share one upload."""
+        with patch.object(sync, 'get_or_create_folder', return_value='images-folder'):
+            first = sync._process_local_images('doc1', self._images(tmp_path, 'a', 'b'), 'folder-1')
+            second = sync._process_local_images('doc2', self._images(tmp_path, 'c'), 'folder-2')
+
+        assert sync.gdrive_service.upload_file.call_count == 1
+        assert sync.gdrive_service.upload_file.call_args[1]['file_path'] == tmp_path / 'a.png'
+        assert sync.gdrive_service.queue_public_permissions.call_count == 1
+        assert {e['image_url'] for e in first + second} == {
+            'https://drive.google.com/uc?export=view&id=drive-1'
+        }
+
+    def test_registry_persists_across_runs(self, sync, make_sync, tmp_path):
+        """Test that a later run embeds a registered image without uploading."""
+        with patch.object(sync, 'get_or_create_folder', return_value='images-folder'):
+            sync._process_local_images('doc1', self._images(tmp_path, 'a'), 'folder-1')
+        sync.finalize()
+
+        later = make_sync()
+        later.gdrive_service = MagicMock()
+        embeds = later._process_local_images('doc1', self._images(tmp_path, 'a'), 'folder-1')
+
+        later.gdrive_service.upload_file.assert_not_called()
+        assert embeds[0]['image_url'].endswith('id=drive-1')
+
+    def test_public_permission_failure_falls_back(self, sync, tmp_path):
+        """Test that a refused public permission grants service account access instead."""
+        self.public_outcome = (None, Exception('publishing disabled'))
+
+        with patch.object(sync, 'get_or_create_folder', return_value='images-folder'):
+            sync._process_local_images('doc1', self._images(tmp_path, 'a'), 'folder-1')
+
+        sync.gdrive_service.queue_service_account_reader.assert_called_once()
+        assert sync.cache.get_meta('images', sync.cache.meta_keys('images')[0])['drive_id'] == 'drive-1'
+
+    def test_unregistered_when_no_permission_set(self, sync, tmp_path):
+        """Test that an image without any read permission is not registered."""
+        self.public_outcome = (None, Exception('denied'))
+        sync.gdrive_service.queue_service_account_reader.side_effect = None
+
+        with patch.object(sync, 'get_or_create_folder', return_value='images-folder'):
+            sync._process_local_images('doc1', self._images(tmp_path, 'a'), 'folder-1')
+
+        assert sync.cache.meta_keys('images') == []
+
+    def test_failed_embed_unregisters_image(self, sync):
+        """Test that an image whose Drive copy cannot be embedded is forgotten."""
+        from src.drive_sync.gdocs import GoogleDocsError
+
+        sync.cache.set_meta('images', 'key-1', {'drive_id': 'gone'})
+        sync.gdocs_service = MagicMock()
+        sync.gdocs_service.embed_images.side_effect = GoogleDocsError('bad image')
+        sync.gdocs_service.find_markers.return_value = [{'name': 'image_a', 'index': 1, 'length': 5}]
+        sync.gdocs_service.embed_diagram.side_effect = Exception('cannot fetch')
+        embed = {'kind': 'IMAGE', 'name': 'image_a', 'image_url': 'u', 'width_pt': 1,
+                 'height_pt': 1, 'image_key': 'key-1'}
+
+        sync._embed_images('doc', [embed], convert_anchor_links=False)
+
+        assert sync.cache.get_meta('images', 'key-1') is None
+
+
+class TestCachedDriveIds:
+    """Test that cached Drive IDs are updated directly."""
+
+    def _pdf(self, tmp_path):
+        pdf = tmp_path / "report.pdf"
+        pdf.write_bytes(b"%PDF-1.4 test")
+        return pdf
+
+    def test_cached_id_updated_without_lookup(self, make_sync, tmp_path):
+        """Test that a modified file with a cached ID skips the name search."""
+        sync = make_sync()
+        pdf = self._pdf(tmp_path)
+        sync.cache.cache[str(pdf)] = {'hash': 'stale', 'drive_id': 'cached-id'}
+
+        with patch.object(sync, '_execute_with_retry', return_value={'id': 'cached-id'}) as execute, \
+                patch.object(sync.remote_index, 'find') as find, \
+                patch('src.drive_sync.sync.MediaFileUpload'):
+            assert sync.pdf_to_drive(pdf, 'folder') == 'cached-id'
+
+        find.assert_not_called()
+        assert execute.call_count == 1
+        sync.service.files.return_value.update.assert_called_once()
+        assert sync.service.files.return_value.update.call_args[1]['fileId'] == 'cached-id'
+        assert sync.cache.get_drive_id(pdf) == 'cached-id'
+
+    def test_unchanged_csv_skipped(self, make_sync, tmp_path):
+        """Test that CSV files are cached like other file types."""
+        sync = make_sync()
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n1,2\n")
+
+        with patch.object(sync, '_upload_file', return_value=({'id': 'sheet-id'}, True)) as upload, \
+                patch('src.drive_sync.sync.MediaFileUpload'):
+            assert sync.csv_to_sheet(csv_file, 'folder') == 'sheet-id'
+            assert sync.csv_to_sheet(csv_file, 'folder') == 'sheet-id'
+
+        assert upload.call_count == 1
+
+    def test_pdf_streamed_in_configured_chunks(self, make_sync, tmp_path):
+        """Test that PDFs are uploaded resumably in chunks of upload_chunk_size."""
+        sync = make_sync(upload_chunk_size=512 * 1024)
+        pdf = tmp_path / 'doc.pdf'
+        pdf.write_bytes(b'%PDF-1.4')
+
+        with patch.object(sync, '_execute_with_retry', return_value={'id': 'pdf-id'}), \
+                patch.object(sync, '_find_existing', return_value=None), \
+                patch('src.drive_sync.sync.MediaFileUpload') as media:
+            sync.pdf_to_drive(pdf)
+
+        assert media.call_args[1]['chunksize'] == 512 * 1024
+        assert media.call_args[1]['resumable'] is True
+
+    def test_markdown_uploaded_from_memory(self, make_sync, tmp_path):
+        """Test that processed markdown is uploaded without a temporary file."""
+        sync = make_sync()
+        md_file = tmp_path / 'doc.md'
+        md_file.write_text('# Title\n\nSome `code`.\n')
+
+        with patch.object(sync, '_upload_file', return_value=({'id': 'doc-id'}, True)) as upload, \
+                patch('src.drive_sync.converter.tempfile.NamedTemporaryFile') as temp_file, \
+                patch.dict('os.environ', {'ENABLE_ANCHOR_LINKS': 'false'}):
+            assert sync.markdown_to_doc_with_diagrams(md_file) == 'doc-id'
+
+        temp_file.assert_not_called()
+        file_metadata, media = upload.call_args[0][1:3]
+        assert isinstance(media, MediaInMemoryUpload)
+        assert b'\xe2\x9f\xa8 code \xe2\x9f\xa9' in media.getbytes(0, media.size())
+        assert media.resumable()
+        assert 'content' not in file_metadata and 'temp_file' not in file_metadata
+
+    def test_invalid_chunk_size_rejected(self, make_sync):
+        """Test that a chunk size that is not a multiple of 256 KiB is refused."""
+        with pytest.raises(ValueError):
+            make_sync(upload_chunk_size=1000)
+
+    def test_missing_cached_id_falls_back_to_search(self, make_sync, tmp_path):
+        """Test that a 404 on the cached ID falls back to the folder index."""
+        import httplib2
+        from googleapiclient.errors import HttpError
+
+        sync = make_sync()
+        pdf = self._pdf(tmp_path)
+        sync.cache.cache[str(pdf)] = {'hash': 'stale', 'drive_id': 'deleted-id'}
+        not_found = HttpError(httplib2.Response({'status': 404}), b'{}')
+
+        with patch.object(sync, '_execute_with_retry', side_effect=[not_found, {'id': 'found-id'}]), \
+                patch.object(sync.remote_index, 'find', return_value={'id': 'found-id'}) as find, \
+                patch('src.drive_sync.sync.MediaFileUpload'):
+            assert sync.pdf_to_drive(pdf, 'folder') == 'found-id'
+
+        find.assert_called_once_with('folder', 'report.pdf', 'application/pdf')
+        assert sync.cache.get_drive_id(pdf) == 'found-id'
+
+    def test_trashed_cached_id_replaced(self, make_sync, tmp_path):
+        """Test that a cached ID the user trashed is not written into again."""
+        sync = make_sync()
+        pdf = self._pdf(tmp_path)
+        sync.cache.cache[str(pdf)] = {'hash': 'stale', 'drive_id': 'trashed-id'}
+        trashed = {'id': 'trashed-id', 'webViewLink': 'link', 'trashed': True}
+
+        with patch.object(sync, '_execute_with_retry', side_effect=[trashed, {'id': 'new-id'}]), \
+                patch.object(sync.remote_index, 'find', return_value=None) as find, \
+                patch('src.drive_sync.sync.MediaFileUpload'):
+            assert sync.pdf_to_drive(pdf, 'folder') == 'new-id'
+
+        find.assert_called_once_with('folder', 'report.pdf', 'application/pdf')
+        files = sync.service.files.return_value
+        assert 'trashed' in files.update.call_args[1]['fields']
+        assert files.create.call_args[1]['body']['parents'] == ['folder']
+        assert sync.cache.get_drive_id(pdf) == 'new-id'
+
+
+class TestIncrementalCsvSync:
+    """Test how csv_to_sheet chooses between row updates and full uploads."""
+
+    @pytest.fixture
+    def sync(self, make_sync):
+        sync = make_sync()
+        sync.gsheets_service = MagicMock()
+        return sync
+
+    def first_sync(self, sync, csv_file):
+        with patch.object(sync, '_upload_file', return_value=({'id': 'sheet-id'}, True)), \
+                patch('src.drive_sync.sync.MediaFileUpload'):
+            sync.csv_to_sheet(csv_file, 'folder')
+
+    def test_changed_rows_written_without_upload(self, sync, tmp_path):
+        """Test that a one-row edit updates the sheet in place."""
+        rows = [['id', 'value']] + [[str(i), 'x'] for i in range(10)]
+        csv_file = write_csv(tmp_path / 'report.csv', rows)
+        self.first_sync(sync, csv_file)
+
+        rows[4] = ['3', 'changed']
+        write_csv(csv_file, rows + [['10', 'new']])
+        with patch.object(sync, '_upload_file') as upload:
+            assert sync.csv_to_sheet(csv_file, 'folder') == 'sheet-id'
+
+        upload.assert_not_called()
+        args = sync.gsheets_service.update_rows.call_args[0]
+        assert args[0] == 'sheet-id'
+        assert args[1] == [(4, [['3', 'changed']]), (11, [['10', 'new']])]
+        assert args[2:] == (12, 11, 2)
+        assert len(sync.sheet_snapshots.get(csv_file)['rows']) == 12
+
+    def test_mostly_changed_file_uploaded(self, sync, tmp_path):
+        """Test that a rewrite of most rows falls back to a full upload."""
+        csv_file = write_csv(tmp_path / 'report.csv', [['a'], ['b'], ['c']])
+        self.first_sync(sync, csv_file)
+
+        write_csv(csv_file, [['x'], ['y'], ['c']])
+        with patch.object(sync, '_upload_file', return_value=({'id': 'sheet-id'}, False)) as upload, \
+                patch('src.drive_sync.sync.MediaFileUpload'):
+            sync.csv_to_sheet(csv_file, 'folder')
+
+        upload.assert_called_once()
+        sync.gsheets_service.update_rows.assert_not_called()
+
+    def test_failed_row_update_falls_back_to_upload(self, sync, tmp_path):
+        """Test that a Sheets error uploads the whole file and refreshes the snapshot."""
+        rows = [[str(i)] for i in range(10)]
+        csv_file = write_csv(tmp_path / 'report.csv', rows)
+        self.first_sync(sync, csv_file)
+        sync.gsheets_service.update_rows.side_effect = GoogleSheetsError('gone')
+
+        write_csv(csv_file, rows[:-1] + [['changed']])
+        with patch.object(sync, '_upload_file', return_value=({'id': 'new-sheet'}, True)) as upload, \
+                patch('src.drive_sync.sync.MediaFileUpload'):
+            assert sync.csv_to_sheet(csv_file, 'folder') == 'new-sheet'
+
+        upload.assert_called_once()
+        assert sync.sheet_snapshots.get(csv_file)['spreadsheet_id'] == 'new-sheet'
+
+
+class FakeSheets:
+    """In-memory stand-in for GoogleSheetsService's streaming methods."""
+
+    def __init__(self, fail_on_write=None):
+        self.tabs = {}
+        self.writes = 0
+        self.fail_on_write = fail_on_write
+
+    def start_spreadsheet(self, spreadsheet_id, title):
+        self.tabs[spreadsheet_id] = {title: {}}
+        return 0
+
+    def add_sheet(self, spreadsheet_id, title):
+        self.tabs[spreadsheet_id].setdefault(title, {})
+        return len(self.tabs[spreadsheet_id]) - 1
+
+    def write_rows(self, spreadsheet_id, sheet_id, title, start_row, rows, column_count):
+        self.writes += 1
+        if self.writes == self.fail_on_write:
+            raise GoogleSheetsError('quota')
+        tab = self.tabs[spreadsheet_id][title]
+        for index, row in enumerate(rows, start_row):
+            tab[index] = row
+
+    def rows(self, spreadsheet_id, title):
+        tab = self.tabs[spreadsheet_id][title]
+        return [tab[i] for i in sorted(tab)]
+
+
+class TestStreamingCsvImport:
+    """Test chunked, sharded and resumable import of large CSVs."""
+
+    @pytest.fixture
+    def sync(self, make_sync, monkeypatch):
+        monkeypatch.setattr('src.drive_sync.sync.ROWS_PER_TAB', 4)
+        monkeypatch.setattr('src.drive_sync.sync.SHEETS_CELL_LIMIT', 20)
+        sync = make_sync(sheets_stream_threshold=1, sheets_chunk_rows=3)
+        sync.service.files.return_value.create.return_value.execute.side_effect = \
+            [{'id': f'ss-{i}'} for i in range(1, 10)]
+        return sync
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        return write_csv(tmp_path / 'big.csv', [['id', 'v']] + [[str(i), 'x'] for i in range(10)])
+
+    def test_rows_sharded_across_tabs_and_spreadsheets(self, sync, csv_file):
+        """Test that tabs hold ROWS_PER_TAB rows and spreadsheets stay under the cell limit."""
+        sync.gsheets_service = FakeSheets()
+
+        assert sync.csv_to_sheet(csv_file, 'folder') == 'ss-1'
+
+        # 20 cells: two full 4x2 tabs, then a header and one row; the rest in a new spreadsheet
+        sheets = sync.gsheets_service
+        assert sorted(sheets.tabs['ss-1']) == ['Part 1', 'Part 2', 'Part 3']
+        assert sheets.rows('ss-1', 'Part 1') == [['id', 'v'], ['0', 'x'], ['1', 'x'], ['2', 'x']]
+        assert sheets.rows('ss-1', 'Part 3') == [['id', 'v'], ['6', 'x']]
+        assert sheets.rows('ss-2', 'Part 4') == [['id', 'v'], ['7', 'x'], ['8', 'x'], ['9', 'x']]
+        names = [c[1]['body']['name'] for c in sync.service.files.return_value.create.call_args_list if c[1]]
+        assert names == ['big', 'big (part 2)']
+        assert sync.cache.get_drive_id(csv_file) == 'ss-1'
+        assert sync.cache.get_meta('csv_shards', str(csv_file)) == ['ss-1', 'ss-2']
+        assert sync.cache.get_meta('csv_imports', str(csv_file)) is None
+
+    def test_interrupted_import_resumes_without_duplicates(self, sync, csv_file):
+        """Test that a failed chunk leaves a checkpoint the next sync continues from."""
+        # The 4th write is the header of the second tab, midway through the second chunk
+        sheets = FakeSheets(fail_on_write=4)
+        sync.gsheets_service = sheets
+
+        with pytest.raises(Exception, match='quota'):
+            sync.csv_to_sheet(csv_file, 'folder')
+        checkpoint = sync.cache.get_meta('csv_imports', str(csv_file))
+        assert checkpoint['rows'] == 2
+
+        assert sync.csv_to_sheet(csv_file, 'folder') == 'ss-1'
+
+        data = [row for ss in ('ss-1', 'ss-2') for title in sorted(sheets.tabs[ss])
+                for row in sheets.rows(ss, title) if row[0] != 'id']
+        assert data == [[str(i), 'x'] for i in range(10)]
+        assert sync.service.files.return_value.create.return_value.execute.call_count == 2
+
+    def test_reimport_reuses_spreadsheets_and_trashes_extras(self, sync, csv_file):
+        """Test that a changed CSV is written into the spreadsheets of the last import."""
+        sync.gsheets_service = FakeSheets()
+        sync.csv_to_sheet(csv_file, 'folder')
+
+        write_csv(csv_file, [['id', 'v'], ['0', 'y']])
+        assert sync.csv_to_sheet(csv_file, 'folder') == 'ss-1'
+
+        assert sync.gsheets_service.rows('ss-1', 'Part 1') == [['id', 'v'], ['0', 'y']]
+        trashed = sync.service.files.return_value.update.call_args[1]
+        assert trashed['fileId'] == 'ss-2' and trashed['body'] == {'trashed': True}
+        assert sync.cache.get_meta('csv_shards', str(csv_file)) == ['ss-1']
+
+    def test_small_csv_not_streamed(self, make_sync, tmp_path):
+        """Test that files under the threshold keep the Drive conversion path."""
+        sync = make_sync()
+        csv_file = write_csv(tmp_path / 'small.csv', [['a']])
+
+        with patch.object(sync, '_stream_csv_to_sheet') as stream, \
+                patch.object(sync, '_upload_file', return_value=({'id': 'sheet-id'}, True)), \
+                patch('src.drive_sync.sync.MediaFileUpload'):
+            assert sync.csv_to_sheet(csv_file, 'folder') == 'sheet-id'
+
+        stream.assert_not_called()
+
+
+class TestGitScanMode:
+    """Test sync_directory with scan_mode='git'."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        if shutil.which('git') is None:
+            pytest.skip("git not installed")
+        docs = tmp_path / "repo" / "docs"
+        docs.mkdir(parents=True)
+        for i in range(3):
+            (docs / f"doc{i}.md").write_text(f"# Doc {i}")
+        self.git(docs, 'init', '-q')
+        self.git(docs, 'add', '.')
+        self.git(docs, 'commit', '-q', '-m', 'initial')
+        return docs
+
+    @staticmethod
+    def git(repo, *args):
+        subprocess.run(['git', '-c', 'user.name=T', '-c', 'user.email=t@example.com', *args],
+                       cwd=repo, check=True, stdout=subprocess.PIPE)
+
+    def sync_and_record(self, sync, docs, fail=()):
+        checked = []
+
+        def sync_file(file_path, folder_id=None):
+            if file_path.name in fail:
+                raise Exception("upload failed")
+            sync.cache.update(file_path, f"id-{file_path.name}")
+            return f"id-{file_path.name}"
+
+        original = sync.cache.should_sync
+
+        def should_sync(file_path):
+            checked.append(file_path.name)
+            return original(file_path)
+
+        with patch.object(sync, 'create_folder_structure', return_value={}), \
+                patch.object(sync, 'sync_file', side_effect=sync_file), \
+                patch.object(sync.cache, 'should_sync', side_effect=should_sync):
+            self.synced = sync.sync_directory(docs)
+        return checked
+
+    def test_only_changed_files_checked_after_first_sync(self, make_sync, repo):
+        """Test that the second sync checks only the file changed in the new commit."""
+        sync = make_sync(scan_mode='git', hash_workers=1)
+        assert sorted(self.sync_and_record(sync, repo)) == ['doc0.md', 'doc1.md', 'doc2.md']
+
+        (repo / "doc1.md").write_text("# Changed")
+        self.git(repo, 'commit', '-q', '-am', 'edit')
+
+        assert self.sync_and_record(sync, repo) == ['doc1.md']
+        assert sync.cache.get_meta('git', str(repo.resolve()))['commit']
+
+    def test_unreported_files_returned_from_cache(self, make_sync, repo):
+        """Test that files git did not report are returned like unchanged files in a walk."""
+        sync = make_sync(scan_mode='git', hash_workers=1)
+        self.sync_and_record(sync, repo)
+
+        (repo / "doc1.md").write_text("# Changed")
+        self.git(repo, 'commit', '-q', '-am', 'edit')
+
+        assert self.sync_and_record(sync, repo) == ['doc1.md']
+        assert self.synced == {str(repo / f"doc{i}.md"): f"id-doc{i}.md" for i in range(3)}
+
+    def test_unreported_files_follow_walk_rules(self, make_sync, tmp_path):
+        """Test that excluded, nested (non-recursive) and deleted cached files are left out."""
+        sync = make_sync(scan_mode='git')
+        docs = tmp_path / "docs"
+        for key in ('a.md', 'b.md', 'draft.md', 'sub/c.md', 'gone.md'):
+            sync.cache.cache[str(docs / key)] = {'hash': 'h', 'drive_id': key}
+        sync.cache.cache[str(tmp_path / "other" / "d.md")] = {'hash': 'h', 'drive_id': 'd'}
+        matcher = sync._path_matcher(['draft.md'])
+
+        found = sync._unreported_git_files(docs, [docs / 'a.md'], [str(docs / 'gone.md')], False, matcher)
+
+        assert found == [docs / 'b.md']
+        found = sync._unreported_git_files(docs, [docs / 'a.md'], [str(docs / 'gone.md')], True, matcher)
+        assert sorted(found) == [docs / 'b.md', docs / 'sub' / 'c.md']
+
+    def test_failed_file_keeps_last_commit(self, make_sync, repo):
+        """Test that a failed upload is retried by the next git scan."""
+        sync = make_sync(scan_mode='git', hash_workers=1)
+        self.sync_and_record(sync, repo)
+        recorded = sync.cache.get_meta('git', str(repo.resolve()))
+
+        (repo / "doc2.md").write_text("# Changed")
+        self.git(repo, 'commit', '-q', '-am', 'edit')
+        self.sync_and_record(sync, repo, fail=('doc2.md',))
+
+        assert sync.cache.get_meta('git', str(repo.resolve())) == recorded
+        assert self.sync_and_record(sync, repo) == ['doc2.md']
+
+    def test_falls_back_to_walk_outside_git(self, make_sync, docs_tree):
+        """Test that git mode outside a work tree walks the directory."""
+        sync = make_sync(scan_mode='git', hash_workers=1)
+
+        with patch('src.drive_sync.sync.scan_git_changes', side_effect=GitScanError('not a repo')):
+            assert len(self.sync_and_record(sync, docs_tree)) == 10
+
+    def test_unknown_scan_mode_rejected(self, make_sync):
+        """Test that a misspelt scan mode fails at construction."""
+        with pytest.raises(ValueError):
+            make_sync(scan_mode='gti')
+
+
+class TestFolderStructure:
+    """Test batched folder creation."""
+
+    def test_missing_folders_created_per_level(self, make_sync, tmp_path):
+        """Test that sibling folders are created in one batch per depth."""
+        sync = make_sync()
+        docs = tmp_path / "docs"
+        for path in ("a/x", "a/y", "b", "c"):
+            (docs / path).mkdir(parents=True)
+
+        batches = []
+
+        class FakeBatch:
+            def __init__(self, *args, **kwargs):
+                self.requests = []
+                batches.append(self)
+
+            def add(self, request, callback):
+                self.requests.append(callback)
+
+            def flush(self):
+                for i, callback in enumerate(self.requests):
+                    callback({'id': f'new-{len(batches)}-{i}', 'name': 'n',
+                              'mimeType': 'application/vnd.google-apps.folder'}, None)
+                return 0
+
+        def find(parent_id, name, mime_type):
+            return {'id': 'existing-b'} if name == 'b' else None
+
+        with patch.object(sync, 'get_or_create_folder', return_value='docs-id'), \
+                patch.object(sync.remote_index, 'find', side_effect=find), \
+                patch('src.drive_sync.sync.BatchExecutor', FakeBatch):
+            folders = sync.create_folder_structure(docs)
+
+        # Depth 1: a and c created together (b exists); depth 2: x and y
+        assert [len(b.requests) for b in batches] == [2, 2]
+        assert folders[str(docs)] == 'docs-id'
+        assert folders[str(docs / 'b')] == 'existing-b'
+        assert len(folders) == 6
+        parents = [call[1]['body']['parents'][0]
+                   for call in sync.service.files.return_value.create.call_args_list]
+        assert parents[:2] == ['docs-id', 'docs-id']
+        assert set(parents[2:]) == {folders[str(docs / 'a')]}
+
+    def test_parent_listings_fetched_concurrently(self, make_sync, tmp_path):
+        """Test that the parents of one depth are listed at the same time."""
+        sync = make_sync()
+        docs = tmp_path / "docs"
+        for path in ("a/x", "b/y", "c/z"):
+            (docs / path).mkdir(parents=True)
+        existing = {'docs-id': ['a', 'b', 'c'], 'id-a': ['x'], 'id-b': ['y'], 'id-c': ['z']}
+        barrier = threading.Barrier(3, timeout=5)
+        listed = []
+
+        def folder(parent_id):
+            if parent_id != 'docs-id':
+                barrier.wait()
+            listed.append(parent_id)
+            return {}
+
+        def find(parent_id, name, mime_type):
+            return {'id': f'id-{name}'} if name in existing[parent_id] else None
+
+        with patch.object(sync, 'get_or_create_folder', return_value='docs-id'), \
+                patch.object(sync.remote_index, 'folder', side_effect=folder), \
+                patch.object(sync.remote_index, 'find', side_effect=find):
+            folders = sync.create_folder_structure(docs)
+
+        assert sorted(listed) == ['id-a', 'id-b', 'id-c']
+        assert not barrier.broken
+        assert folders[str(docs / 'b' / 'y')] == 'id-y'
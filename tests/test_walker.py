@@ -0,0 +1,109 @@
+"""
+Tests for the single-pass directory walk.
+
+Tests that files and subdirectories come from one walk, that symlinks
+are handled like Path.glob('**/*'), and exclude/ignore matching.
+"""
+
+import os
+from pathlib import PurePosixPath
+from unittest.mock import patch
+
+import pytest
+from src.drive_sync.walker import PathMatcher, scan_tree
+
+
+def make_tree(root):
+    """Create docs/{a.md, .hidden, guides/b.md, guides/deep/c.pdf, empty/}."""
+    (root / "guides" / "deep").mkdir(parents=True)
+    (root / "empty").mkdir()
+    for path in ("a.md", ".hidden", "guides/b.md", "guides/deep/c.pdf"):
+        (root / path).write_text(path)
+
+
+class TestScanTree:
+    """Test files and directories found by scan_tree."""
+
+    def test_matches_glob(self, tmp_path):
+        """Test that the walk finds the same entries as the glob it replaces."""
+        make_tree(tmp_path)
+
+        scan = scan_tree(tmp_path)
+
+        assert sorted(scan.files) == sorted(p for p in tmp_path.glob('**/*') if p.is_file())
+        assert sorted(scan.dirs) == sorted(p for p in tmp_path.rglob('*') if p.is_dir())
+
+    def test_parents_listed_before_children(self, tmp_path):
+        """Test that every directory comes after its parent."""
+        make_tree(tmp_path)
+
+        dirs = scan_tree(tmp_path).dirs
+
+        assert dirs.index(tmp_path / "guides") < dirs.index(tmp_path / "guides" / "deep")
+
+    def test_non_recursive(self, tmp_path):
+        """Test that only the top level is listed without recursion."""
+        make_tree(tmp_path)
+
+        scan = scan_tree(tmp_path, recursive=False)
+
+        assert sorted(f.name for f in scan.files) == ['.hidden', 'a.md']
+        assert sorted(d.name for d in scan.dirs) == ['empty', 'guides']
+
+    @pytest.mark.skipif(not hasattr(os, 'symlink'), reason="symlinks not supported")
+    def test_symlinked_directories_not_followed(self, tmp_path):
+        """Test that symlinked files are synced but symlinked directories are not walked."""
+        make_tree(tmp_path / "docs")
+        (tmp_path / "docs" / "link.md").symlink_to(tmp_path / "docs" / "a.md")
+        (tmp_path / "docs" / "loop").symlink_to(tmp_path / "docs", target_is_directory=True)
+
+        scan = scan_tree(tmp_path / "docs")
+
+        assert tmp_path / "docs" / "link.md" in scan.files
+        assert all("loop" not in p.parts for p in scan.files + scan.dirs)
+
+
+class TestPathMatcher:
+    """Test compiled exclude and ignore rules."""
+
+    @pytest.mark.parametrize('pattern', [
+        '*.md', 'guides/*.md', 'docs/*', 'b.m?', '[ab].md', '[!a].md', '/tmp/*.md', '*/deep/*',
+    ])
+    def test_matches_like_path_match(self, pattern):
+        """Test that file patterns match exactly what Path.match matches."""
+        paths = ['docs/a.md', 'docs/guides/b.md', 'docs/guides/deep/c.pdf', '/tmp/x.md', 'b.md']
+        matcher = PathMatcher([pattern])
+
+        for path in paths:
+            assert matcher.excludes(path) == PurePosixPath(path).match(pattern), path
+
+    def test_trailing_slash_matches_directories_only(self):
+        """Test that 'temp/' excludes a directory but not a file named temp."""
+        matcher = PathMatcher(['temp/'])
+
+        assert matcher.excludes('docs/temp', is_dir=True)
+        assert not matcher.excludes('docs/temp')
+
+    def test_ignore_rules(self):
+        """Test that ignored names and extensions match case-insensitively."""
+        matcher = PathMatcher(ignored_names={'.DS_Store'}, ignored_extensions={'.mp4'})
+
+        assert matcher.ignores('.ds_store')
+        assert matcher.ignores('Clip.MP4')
+        assert not matcher.ignores('notes.md')
+
+    def test_excluded_directories_pruned(self, tmp_path):
+        """Test that nothing below an excluded directory is walked."""
+        make_tree(tmp_path)
+        (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+        (tmp_path / "node_modules" / "pkg" / "README.md").write_text("x")
+        (tmp_path / "clip.mp4").write_text("x")
+        matcher = PathMatcher(['node_modules', 'guides/'], ignored_extensions={'.mp4'})
+
+        with patch('src.drive_sync.walker.os.scandir', wraps=os.scandir) as scandir:
+            scan = scan_tree(tmp_path, matcher=matcher)
+
+        assert sorted(f.name for f in scan.files) == ['.hidden', 'a.md']
+        assert sorted(d.name for d in scan.dirs) == ['empty']
+        assert (scan.excluded, scan.ignored) == (2, 1)
+        assert scandir.call_count == 2